@@ -8,6 +8,7 @@ import logging
 from flask_caching import Cache
 from flask_cors import CORS
 from app.utils.middleware import enforce_allowed_hosts
+from app.utils.tiered_cache import TieredCache
 import os
 
 
@@ -20,15 +21,13 @@ api = Api(spec_kwargs={
     "openapi_version": "3.0.3",
 })
 jwt = JWTManager()
-cache = Cache()
+cache = TieredCache(Cache())
 
 
-def create_app():
+def create_app(env=None):
     app = Flask(__name__)
 
-    env = os.environ.get("FLASK_ENV", "development")
-    print(">>> Running environment:", env)
-    print(">>> DATABASE_URL:", os.environ.get("DATABASE_URL"))
+    env = env or os.environ.get("FLASK_ENV", "development")
 
     if env == "production":
         app.config.from_object(ProdConfig)
@@ -54,21 +53,16 @@ def create_app():
     migrate.init_app(app, db)
     api.init_app(app)
     jwt.init_app(app)
+    from app.utils.identity import init_identity
+    init_identity(jwt)
     cache.init_app(app)
 
     enforce_allowed_hosts(app)
     from app.utils.limiters import limiter
     limiter.init_app(app)
 
-    if app.debug:
-        logging.basicConfig(
-            level=logging.DEBUG,
-            format='%(asctime)s %(levelname)s in %(module)s: %(message)s',
-            handlers=[
-            logging.FileHandler('app.log'),
-            logging.StreamHandler()  
-        ]
-        )
+    from app.utils.logging_setup import configure_logging
+    configure_logging(app)
 
 
     try:
@@ -78,20 +72,34 @@ def create_app():
         api.register_blueprint(subject_bp)
         from app.routes.study_sessions_routes import study_sessions_bp
         api.register_blueprint(study_sessions_bp)
-    except Exception as e:
-        print(f"Error registering blueprints: {e}")
-        import traceback
-        traceback.print_exc()
+        from app.routes.stats_routes import stats_bp
+        api.register_blueprint(stats_bp)
+        if app.config.get("METRICS_ENABLED", True):
+            from app.utils.metrics import init_metrics
+            init_metrics(app)
+            from app.routes.metrics_routes import metrics_bp
+            api.register_blueprint(metrics_bp)
+    except Exception:
+        logging.exception("Error registering blueprints")
 
+    from app.utils.sql_profiler import init_sql_profiler
+    init_sql_profiler(app)
     from app.utils.error_handler import register_error_handlers
     register_error_handlers(app)
-    
-    with app.app_context():
-        try:
-            db.create_all()
-            print(">>> Tablas creadas automáticamente (si no existían).")
-        except Exception as e:
-            print(f"Error creando tablas: {e}")
+    from app.commands import register_commands
+    register_commands(app)
+
+    # Production runs `flask db upgrade` instead: no connection is opened
+    # before gunicorn forks its workers
+    if app.config.get("AUTO_CREATE_TABLES"):
+        with app.app_context():
+            try:
+                db.create_all()
+            except Exception as e:
+                logging.error("Error creating tables: %s", e)
+            finally:
+                db.engine.dispose()
+    logging.debug("App created for the %s environment", env)
     return app
 
 
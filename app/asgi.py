@@ -0,0 +1,278 @@
+"""ASGI serving mode.
+
+The cache-hit and list paths of subjects and sessions (GET only) are served
+by native async handlers: async SQLAlchemy for the database and an async
+Redis client for the cache, so a worker keeps serving other requests while
+it waits on I/O. Every other request goes to the Flask app through
+WsgiToAsgi, the sync mode (`gunicorn "app:create_app()"`) is unchanged.
+
+Run with: uvicorn --factory app.asgi:create_asgi_app --workers 4
+"""
+import json
+import logging
+from urllib.parse import parse_qsl
+from asgiref.wsgi import WsgiToAsgi
+from flask_jwt_extended import decode_token
+from limits import parse
+from limits.aio.strategies import STRATEGIES
+from limits.storage import storage_from_string
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from werkzeug.datastructures import MultiDict
+from werkzeug.exceptions import HTTPException
+from werkzeug.http import parse_accept_header, parse_etags, quote_etag
+from werkzeug.routing import Map, Rule
+from app import create_app, db
+from app.models import Subject, StudySessions, User
+from app.utils.async_cache import get_generation, make_async_cache
+from app.utils.cache_utils import decode_body, encode_body, item_key, list_key, make_etag
+from app.utils.identity import UserIdentity, identity_key
+from app.utils.limiters import shared_storage_uri
+from app.utils.logging_setup import CACHE_LOGGER
+from app.utils.metrics import count_cache
+from app.utils.middleware import ALLOWED_HOSTS
+from app.utils.pagination import (
+    count_stmt, get_list_args, keyset_page_stmt, next_cursor_of, offset_page_stmt, page_count, split_keyset_page,
+)
+from app.utils.serializers import session_serializer, subject_serializer
+
+cache_log = logging.getLogger(CACHE_LOGGER)
+
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+# (list name, item kind, serializer, sort column, id column, 404 message)
+RESOURCES = {
+    "subjects": ("subject", subject_serializer, Subject.created_at, Subject.id, "Subject not found"),
+    "sessions": ("session", session_serializer, StudySessions.start_time, StudySessions.id, "Study session not found"),
+}
+
+native_routes = Map([
+    Rule("/subjects", endpoint=("subjects", False)),
+    Rule("/subjects/<int:id>", endpoint=("subjects", True)),
+    Rule("/sessions", endpoint=("sessions", False)),
+    Rule("/sessions/<int:id>", endpoint=("sessions", True)),
+], strict_slashes=False)
+
+
+def async_database_url(url, config):
+    """Async driver URL for the engine URL of the sync app"""
+    if config.get("ASYNC_DATABASE_URL"):
+        return config["ASYNC_DATABASE_URL"]
+    url = url.set(drivername=ASYNC_DRIVERS[url.get_backend_name()])
+    sslmode = url.query.get("sslmode")
+    if sslmode:
+        # asyncpg takes libpq's sslmode as `ssl`
+        url = url.difference_update_query(["sslmode"]).update_query_dict({"ssl": sslmode})
+    return url
+
+
+def json_response(status, data):
+    return status, [(b"content-type", b"application/json")], json.dumps(data).encode()
+
+
+def async_storage(uri):
+    """limits' async storage for a storage URI.
+
+    Redis goes through redis.asyncio (already a dependency), limits would
+    default to coredis otherwise.
+    """
+    options = {"implementation": "redispy"} if uri.startswith("redis") else {}
+    return storage_from_string(f"async+{uri}", **options)
+
+
+class StudyTrackASGI:
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.config = flask_app.config
+        self.wsgi = WsgiToAsgi(flask_app)
+        with flask_app.app_context():
+            url = async_database_url(db.engine.url, self.config)
+        # Same pool sizing as the sync engine, async engines bring their own pool class
+        options = {name: value for name, value in self.config.get("SQLALCHEMY_ENGINE_OPTIONS", {}).items()
+                   if name != "poolclass"}
+        self.engine = create_async_engine(url, **options)
+        self.sessionmaker = async_sessionmaker(self.engine, expire_on_commit=False)
+        self.cache = make_async_cache(flask_app)
+        # The async limiter talks to the shared storage directly, no local batching
+        storage_uri = shared_storage_uri(self.config.get("RATELIMIT_STORAGE_URI") or "memory://")
+        strategy = STRATEGIES[self.config.get("RATELIMIT_STRATEGY", "fixed-window")]
+        self.rate_limiter = strategy(async_storage(storage_uri))
+        self.read_limit = parse("100/minute")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        response = None
+        if scope["type"] == "http" and scope["method"] == "GET" and self.config.get("ASGI_NATIVE_READS", True):
+            response = await self._native(scope)
+        if response is None:
+            await self.wsgi(scope, receive, send)
+            return
+        status, headers, body = response
+        headers.append((b"content-length", str(len(body)).encode()))
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+    async def aclose(self):
+        await self.engine.dispose()
+        await self.cache.aclose()
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.aclose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _native(self, scope):
+        """Response of a native handler, or None to let the WSGI app answer.
+
+        Anything the handlers do not replicate (CORS, auth errors, unknown
+        hosts) is left to Flask so that both modes answer the same way.
+        """
+        headers = {name.decode("latin-1"): value.decode("latin-1") for name, value in scope["headers"]}
+        if "origin" in headers or headers.get("host", "").split(":")[0] not in ALLOWED_HOSTS:
+            return None
+        try:
+            (resource, is_item), values = native_routes.bind("").match(scope["path"], method="GET")
+        except HTTPException:
+            return None
+        args = MultiDict(parse_qsl(scope["query_string"].decode("latin-1"), keep_blank_values=True))
+        if not is_item and "ids" in args:
+            # Multi-gets (?ids=) are served by the Flask handlers
+            return None
+        user_id = self._identity(headers)
+        if user_id is None or await self._load_user(user_id) is None:
+            return None
+
+        if self.config.get("RATELIMIT_ENABLED", True):
+            if not await self.rate_limiter.hit(self.read_limit, "asgi", resource, f"user:{user_id}"):
+                return json_response(429, {"error": "Too Many Requests"})
+
+        accepts_br = "br" in parse_accept_header(headers.get("accept-encoding"))
+        if_none_match = parse_etags(headers.get("if-none-match"))
+        if is_item:
+            return await self._item(resource, user_id, values["id"], accepts_br, if_none_match)
+        return await self._list(resource, user_id, args, accepts_br, if_none_match)
+
+    def _identity(self, headers):
+        scheme, _, token = headers.get("authorization", "").partition(" ")
+        if scheme != "Bearer" or not token:
+            return None
+        try:
+            with self.flask_app.app_context():
+                claims = decode_token(token)
+        except Exception:
+            return None
+        if claims.get("type") != "access":
+            return None
+        return claims[self.config["JWT_IDENTITY_CLAIM"]]
+
+    async def _load_user(self, user_id):
+        """Async twin of identity.load_user, same cache key; None for deleted users"""
+        key = identity_key(int(user_id))
+        identity = await self.cache.get(key)
+        if identity is None:
+            async with self.sessionmaker() as session:
+                row = (await session.execute(
+                    db.select(User.id, User.username, User.timezone).where(User.id == int(user_id))
+                )).first()
+            if row is None:
+                return None
+            identity = UserIdentity(*row)
+            await self.cache.set(key, identity, timeout=self.config.get("USER_CACHE_TTL", 60))
+        return identity
+
+    async def _list(self, resource, user_id, args, accepts_br, if_none_match):
+        page, per_page, cursor, with_total = get_list_args(args)
+        generation = await get_generation(self.cache, user_id, resource)
+        cache_key = list_key(user_id, resource, generation, page, per_page, cursor, with_total)
+        etag = make_etag(cache_key, accepts_br)
+        if if_none_match.contains_weak(etag):
+            return self._not_modified(etag)
+
+        body = await self.cache.get(cache_key)
+        if body:
+            cache_log.info("Cache HIT for %s (user %s, page %s, async)", resource, user_id, page)
+            count_cache(resource, "hit")
+            return self._body(body, accepts_br, etag)
+
+        cache_log.info("Cache MISS for %s (user %s, page %s, async)", resource, user_id, page)
+        count_cache(resource, "miss")
+        _, serializer, sort_column, id_column, _ = RESOURCES[resource]
+        stmt = serializer.select().where(Subject.user_id == int(user_id))
+        async with self.sessionmaker() as session:
+            if cursor is not None:
+                try:
+                    page_stmt = keyset_page_stmt(stmt, sort_column, id_column, cursor, per_page)
+                except ValueError:
+                    return json_response(400, {"error": "Invalid cursor"})
+                rows, next_cursor = split_keyset_page(
+                    (await session.execute(page_stmt)).all(), sort_column, id_column, per_page
+                )
+                result = {resource: [serializer(row) for row in rows], "next_cursor": next_cursor}
+                if with_total:
+                    result["total"] = await session.scalar(count_stmt(stmt))
+            else:
+                rows = (await session.execute(
+                    offset_page_stmt(stmt, sort_column, id_column, page, per_page)
+                )).all()
+                total = await session.scalar(count_stmt(stmt)) if with_total else None
+                result = {
+                    resource: [serializer(row) for row in rows],
+                    "total": total,
+                    "page": page,
+                    "pages": page_count(total, per_page) if with_total else None,
+                    "next_cursor": next_cursor_of(rows, per_page, sort_column, id_column),
+                }
+        body = encode_body(result, self.config)
+        await self.cache.set(cache_key, body, timeout=300)
+        return self._body(body, accepts_br, etag)
+
+    async def _item(self, resource, user_id, id, accepts_br, if_none_match):
+        kind, serializer, _, id_column, not_found = RESOURCES[resource]
+        cache_key = item_key(user_id, kind, id)
+        generation = await get_generation(self.cache, user_id, resource)
+        etag = make_etag(f"{cache_key}:v{generation}", accepts_br)
+        if if_none_match.contains_weak(etag):
+            return self._not_modified(etag)
+
+        body = await self.cache.get(cache_key)
+        if body:
+            cache_log.info("Cache HIT for %s (user %s, %s %s, async)", resource, user_id, kind, id)
+            count_cache(resource, "hit")
+            return self._body(body, accepts_br, etag)
+
+        cache_log.info("Cache MISS for %s (user %s, %s %s, async)", resource, user_id, kind, id)
+        count_cache(resource, "miss")
+        async with self.sessionmaker() as session:
+            row = (await session.execute(
+                serializer.select().where(id_column == id, Subject.user_id == int(user_id))
+            )).first()
+        if not row:
+            return json_response(404, {"error": not_found})
+        body = encode_body(serializer(row), self.config)
+        await self.cache.set(cache_key, body, timeout=300)
+        return self._body(body, accepts_br, etag)
+
+    def _body(self, body, accepts_br, etag):
+        payload, compressed = decode_body(body, accepts_br)
+        headers = [
+            (b"content-type", b"application/json"),
+            (b"etag", quote_etag(etag).encode()),
+            (b"vary", b"Accept-Encoding"),
+        ]
+        if compressed:
+            headers.append((b"content-encoding", b"br"))
+        return 200, headers, payload
+
+    def _not_modified(self, etag):
+        return 304, [(b"etag", quote_etag(etag).encode()), (b"vary", b"Accept-Encoding")], b""
+
+
+def create_asgi_app(env=None):
+    """ASGI application factory (uvicorn --factory)"""
+    return StudyTrackASGI(create_app(env))
@@ -0,0 +1,19 @@
+import click
+from app.utils.progress import rebuild_progress
+from app.utils.rollups import rebuild_rollups
+
+
+def register_commands(app):
+    @app.cli.command("rebuild-progress")
+    @click.option("--subject-id", type=int, default=None, help="Only rebuild this subject.")
+    def rebuild_progress_command(subject_id):
+        """Recompute subject progress aggregates from the study sessions."""
+        rows = rebuild_progress(subject_id)
+        click.echo(f"Rebuilt progress for {rows} subject(s).")
+
+    @app.cli.command("rebuild-stats")
+    @click.option("--user-id", type=int, default=None, help="Only rebuild this user.")
+    def rebuild_stats_command(user_id):
+        """Backfill the daily study rollups from the study sessions."""
+        rows = rebuild_rollups(user_id)
+        click.echo(f"Rebuilt {rows} daily rollup(s).")
@@ -1,15 +1,49 @@
 import os
 from dotenv import load_dotenv
 from datetime import timedelta
+from app.utils.pool_metrics import InstrumentedQueuePool
 
 load_dotenv()
 
+
+def engine_options(pool_size, max_overflow, pool_timeout, pool_recycle, pool_pre_ping):
+    """SQLAlchemy pool settings, each default can be overridden from the environment.
+
+    Every gunicorn worker gets its own pool: workers * (pool_size + max_overflow)
+    must stay below the database's max_connections.
+    """
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": int(os.environ.get("DB_POOL_SIZE", pool_size)),
+        "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", max_overflow)),
+        "pool_timeout": float(os.environ.get("DB_POOL_TIMEOUT", pool_timeout)),  # seconds
+        "pool_recycle": int(os.environ.get("DB_POOL_RECYCLE", pool_recycle)),  # seconds, -1 never
+        "pool_pre_ping": os.environ.get("DB_POOL_PRE_PING", str(pool_pre_ping)) == "True",
+    }
+
+def redis_uri(host, port, db, password):
+    auth = f":{password}@" if password else ""
+    return f"redis://{auth}{host}:{port}/{db}"
+
+
+def rate_limit_storage_options(uri):
+    """Local batching settings of a batched+ storage (app/utils/limiters.py)"""
+    if not uri.startswith("batched+"):
+        return {}
+    return {
+        "batch_size": int(os.environ.get("RATELIMIT_BATCH_SIZE", 10)),  # hits per key between syncs
+        "sync_interval": float(os.environ.get("RATELIMIT_SYNC_INTERVAL", 1.0)),  # seconds
+    }
+
+
 class Config:
     SECRET_KEY = os.environ.get("SECRET_KEY", "dev-secret")
     SQLALCHEMY_TRACK_MODIFICATIONS = os.environ.get("SQLALCHEMY_TRACK_MODIFICATIONS", "False") == "True"
     JWT_SECRET_KEY = os.environ.get("JWT_SECRET_KEY", "jwt-secret-key")
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=30)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=7)
+    # current_user of a token is cached this long (app/utils/identity.py)
+    USER_CACHE_TTL = int(os.environ.get("USER_CACHE_TTL", 60))  # seconds
 
     CACHE_TYPE = "RedisCache"
     CACHE_REDIS_HOST = os.environ.get("REDIS_HOST", "localhost")
@@ -17,33 +51,110 @@ class Config:
     CACHE_REDIS_DB = int(os.environ.get("REDIS_DB", 0))
     CACHE_REDIS_PASSWORD = os.environ.get("REDIS_PASSWORD", None)
     CACHE_DEFAULT_TIMEOUT = 300  # 5 minutes
+
+    # Per-worker in-process cache in front of Redis
+    CACHE_L1_ENABLED = os.environ.get("CACHE_L1_ENABLED", "True") == "True"
+    CACHE_L1_MAX_BYTES = int(os.environ.get("CACHE_L1_MAX_BYTES", 8 * 1024 * 1024))
+    CACHE_L1_TTL = int(os.environ.get("CACHE_L1_TTL", 30))  # seconds
+    CACHE_INVALIDATION_CHANNEL = os.environ.get("CACHE_INVALIDATION_CHANNEL", "studytrack:cache:invalidate")
+
+    # Cached bodies are stored as encoded JSON, brotli-compressed above a size
+    CACHE_COMPRESSION = os.environ.get("CACHE_COMPRESSION", "True") == "True"
+    CACHE_COMPRESSION_MIN_BYTES = int(os.environ.get("CACHE_COMPRESSION_MIN_BYTES", 512))
+    CACHE_BROTLI_QUALITY = int(os.environ.get("CACHE_BROTLI_QUALITY", 5))
+
+    # POST /sessions/bulk
+    BULK_IMPORT_MAX_ITEMS = int(os.environ.get("BULK_IMPORT_MAX_ITEMS", 10000))
+    BULK_IMPORT_CHUNK_SIZE = int(os.environ.get("BULK_IMPORT_CHUNK_SIZE", 500))
+    # A short end time before the start is read as the next day up to this length
+    SESSION_OVERNIGHT_MAX_HOURS = int(os.environ.get("SESSION_OVERNIGHT_MAX_HOURS", 12))
+    # GET /subjects?ids=... and GET /sessions?ids=...
+    MULTI_GET_MAX_IDS = int(os.environ.get("MULTI_GET_MAX_IDS", 100))
+
+    RATELIMIT_ENABLED = os.environ.get("RATELIMIT_ENABLED", "True") == "True"
+    # Limits are shared by every worker through Redis. batched+ counts hits in
+    # the worker and syncs them in batches instead of a round trip per request;
+    # use redis:// with RATELIMIT_STRATEGY=moving-window for exact limits
+    RATELIMIT_STORAGE_URI = os.environ.get(
+        "RATELIMIT_STORAGE_URI",
+        "batched+" + redis_uri(CACHE_REDIS_HOST, CACHE_REDIS_PORT, CACHE_REDIS_DB, CACHE_REDIS_PASSWORD),
+    )
+    RATELIMIT_STORAGE_OPTIONS = rate_limit_storage_options(RATELIMIT_STORAGE_URI)
+    RATELIMIT_STRATEGY = os.environ.get("RATELIMIT_STRATEGY", "sliding-window-counter")
+    # Per-worker limits while Redis is unreachable
+    RATELIMIT_IN_MEMORY_FALLBACK_ENABLED = True
+
+    # ASGI mode (app/asgi.py): serve cached GETs natively, async driver URL
+    # defaults to the sync one with asyncpg/aiosqlite
+    ASGI_NATIVE_READS = os.environ.get("ASGI_NATIVE_READS", "True") == "True"
+    ASYNC_DATABASE_URL = os.environ.get("ASYNC_DATABASE_URL")
+
+    # Per-request SQL profiling (Server-Timing header + logs), always on with
+    # SQL_PROFILER_ENABLED, or per request with the header outside production
+    SQL_PROFILER_ENABLED = os.environ.get("SQL_PROFILER_ENABLED", "False") == "True"
+    SQL_PROFILER_HEADER = "X-SQL-Profile"
+    SQL_PROFILER_N_PLUS_ONE = int(os.environ.get("SQL_PROFILER_N_PLUS_ONE", 3))  # identical statements
+
+    METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "True") == "True"
+    # /metrics, /metrics/cache and /metrics/pool need "Authorization: Bearer
+    # <METRICS_TOKEN>" unless METRICS_PUBLIC (development and tests only)
+    METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+    METRICS_PUBLIC = os.environ.get("METRICS_PUBLIC", "False") == "True"
+
+    # werkzeug hashing method (short names get werkzeug's defaults), hashes made with other
+    # ones are upgraded on the next login. PASSWORD_HASH_WORKERS > 0 verifies
+    # passwords in a process pool of that size (per worker) instead of inline
+    PASSWORD_HASH_METHOD = os.environ.get("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+    PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", 0))
+    PASSWORD_HASH_TIMEOUT = float(os.environ.get("PASSWORD_HASH_TIMEOUT", 10))  # seconds
+
+    # db.create_all() in create_app, production uses the migrations
+    AUTO_CREATE_TABLES = os.environ.get("AUTO_CREATE_TABLES", "True") == "True"
+
+    # JSON log lines, written by a background thread (app/utils/logging_setup.py).
+    # Cache HIT/MISS lines are kept with this probability
+    LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
+    LOG_CACHE_SAMPLE_RATE = float(os.environ.get("LOG_CACHE_SAMPLE_RATE", 0.01))
     
 class DevConfig(Config):
     DEBUG = os.environ.get("DEBUG", "True") == "True"
     ENV = "development"
+    LOG_LEVEL = os.environ.get("LOG_LEVEL", "DEBUG")
+    METRICS_PUBLIC = os.environ.get("METRICS_PUBLIC", "True") == "True"
     SQLALCHEMY_DATABASE_URI = os.environ.get(
         "DEV_DATABASE_URL",
         "sqlite:///dev.db"
     )
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(5, 10, 30, -1, False)
     CACHE_TYPE = "SimpleCache"
+    RATELIMIT_STORAGE_URI = os.environ.get("RATELIMIT_STORAGE_URI", "memory://")
+    RATELIMIT_STORAGE_OPTIONS = rate_limit_storage_options(RATELIMIT_STORAGE_URI)
 
 
 class TestConfig(Config):
     DEBUG = os.environ.get("DEBUG", "False") == "True"
     TESTING = True
     ENV = "testing"
+    LOG_CACHE_SAMPLE_RATE = 1.0
+    METRICS_PUBLIC = True
     SQLALCHEMY_DATABASE_URI = os.environ.get(
         "TEST_DATABASE_URL",
         "sqlite:///test.db"
     )
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(5, 10, 10, -1, False)
     CACHE_TYPE = "SimpleCache"
+    RATELIMIT_STORAGE_URI = "memory://"
+    RATELIMIT_STORAGE_OPTIONS = {}
 
 
 class ProdConfig(Config):
     DEBUG = os.environ.get("DEBUG", "False") == "True"
     TESTING = False
     ENV = "production"
+    AUTO_CREATE_TABLES = os.environ.get("AUTO_CREATE_TABLES", "False") == "True"
     SQLALCHEMY_DATABASE_URI = os.environ.get(
         "DATABASE_URL"
     )
+    # Recycle before the server/proxy idle timeouts, ping to survive failovers
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(5, 10, 30, 1800, True)
 
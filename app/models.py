@@ -2,10 +2,11 @@ from app import db
 from typing import Optional
 import sqlalchemy as sa
 import sqlalchemy.orm as so
-from datetime import datetime, timezone
+from datetime import date, datetime
 from enum import Enum
 from sqlalchemy import Enum as SqlEnum
-from werkzeug.security import generate_password_hash, check_password_hash
+from app.utils.db_utils import utc_now
+from app.utils.passwords import hash_password, verify_password
 from flask_login import UserMixin
 
 
@@ -16,6 +17,8 @@ class User(UserMixin, db.Model):
     username: so.Mapped[str] = so.mapped_column(sa.String(64), index=True, unique=True)
     email: so.Mapped[str] = so.mapped_column(sa.String(120), index=True, unique=True)
     password_hash: so.Mapped[Optional[str]] = so.mapped_column(sa.String(256))
+    # IANA name, short session times are resolved in it (stored times are UTC)
+    timezone: so.Mapped[str] = so.mapped_column(sa.String(64), default="UTC", server_default="UTC")
 
     subjects: so.Mapped[list["Subject"]] = so.relationship(
         "Subject",
@@ -24,10 +27,10 @@ class User(UserMixin, db.Model):
     )
     
     def set_password(self, password: str) -> None:
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
 
     def check_password(self, password: str) -> bool:
-        return check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
 
 
 class PriorityLevel(Enum):
@@ -52,8 +55,9 @@ class Subject(db.Model):
     total_hours_goal: so.Mapped[int] = so.mapped_column(sa.Integer, default=0)
     total_hours_completed: so.Mapped[int] = so.mapped_column(sa.Integer, default=0)
 
-    created_at: so.Mapped[datetime] = so.mapped_column(sa.DateTime, default=datetime.now(timezone.utc), index=True)
-    updated_at: so.Mapped[datetime] = so.mapped_column(sa.DateTime, default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
+    # Set by the database per row and read back with RETURNING (eager_defaults)
+    created_at: so.Mapped[datetime] = so.mapped_column(sa.DateTime, server_default=utc_now(), index=True)
+    updated_at: so.Mapped[datetime] = so.mapped_column(sa.DateTime, server_default=utc_now(), onupdate=utc_now())
 
     priority_level: so.Mapped[PriorityLevel] = so.mapped_column(SqlEnum(PriorityLevel), default=PriorityLevel.MEDIUM, index=True)
     status: so.Mapped[SubjectStatus] = so.mapped_column(SqlEnum(SubjectStatus), default=SubjectStatus.ACTIVE)
@@ -63,19 +67,30 @@ class Subject(db.Model):
 
     __table_args__ = (
         sa.Index("idx_subject_user_status", "user_id", "status"), 
+        sa.Index("idx_subject_user_created", "user_id", "created_at", "id"),
     )
+    __mapper_args__ = {"eager_defaults": True}
     study_sessions: so.Mapped[list["StudySessions"]] = so.relationship(
         "StudySessions",
         back_populates="subject",
         cascade="all, delete-orphan"
     )
+    progress: so.Mapped[Optional["SubjectProgress"]] = so.relationship(
+        "SubjectProgress",
+        cascade="all, delete-orphan",
+        uselist=False
+    )
+    daily_rollups: so.Mapped[list["StudyDailyRollup"]] = so.relationship(
+        "StudyDailyRollup",
+        cascade="all, delete-orphan"
+    )
 
 
 class StudySessions(db.Model):
     __tablename__ = "study_sessions"
 
     id: so.Mapped[int] = so.mapped_column(primary_key=True)
-    start_time: so.Mapped[datetime] = so.mapped_column(sa.DateTime, default=datetime.now(timezone.utc))
+    start_time: so.Mapped[datetime] = so.mapped_column(sa.DateTime, server_default=utc_now())
     end_time: so.Mapped[Optional[datetime]] = so.mapped_column(sa.DateTime, nullable=True, index=True)
     duration_minutes: so.Mapped[Optional[int]] = so.mapped_column(sa.Integer, nullable=True)
     notes: so.Mapped[str] = so.mapped_column(sa.String(2048), default="")
@@ -84,3 +99,34 @@ class StudySessions(db.Model):
     subject_id: so.Mapped[int] = so.mapped_column(sa.ForeignKey("subject.id"), nullable=False, index=True)
     subject: so.Mapped[Subject] = so.relationship("Subject", back_populates="study_sessions")
 
+    __table_args__ = (
+        sa.Index("idx_session_subject_start", "subject_id", "start_time", "id"),
+    )
+    __mapper_args__ = {"eager_defaults": True}
+
+
+
+class SubjectProgress(db.Model):
+    """Per subject aggregates of its study sessions, kept up to date by the session handlers"""
+    __tablename__ = "subject_progress"
+
+    subject_id: so.Mapped[int] = so.mapped_column(sa.ForeignKey("subject.id"), primary_key=True)
+    total_minutes: so.Mapped[int] = so.mapped_column(sa.Integer, default=0, nullable=False)
+    session_count: so.Mapped[int] = so.mapped_column(sa.Integer, default=0, nullable=False)
+    first_session_at: so.Mapped[Optional[datetime]] = so.mapped_column(sa.DateTime, nullable=True)
+    last_session_at: so.Mapped[Optional[datetime]] = so.mapped_column(sa.DateTime, nullable=True)
+
+
+class StudyDailyRollup(db.Model):
+    """Study time per subject and local day of the user, kept up to date by the session handlers"""
+    __tablename__ = "study_daily_rollup"
+
+    subject_id: so.Mapped[int] = so.mapped_column(sa.ForeignKey("subject.id"), primary_key=True)
+    day: so.Mapped[date] = so.mapped_column(sa.Date, primary_key=True)
+    user_id: so.Mapped[int] = so.mapped_column(sa.ForeignKey("user.id"), nullable=False)
+    minutes: so.Mapped[int] = so.mapped_column(sa.Integer, default=0, nullable=False)
+    session_count: so.Mapped[int] = so.mapped_column(sa.Integer, default=0, nullable=False)
+
+    __table_args__ = (
+        sa.Index("idx_rollup_user_day", "user_id", "day"),
+    )
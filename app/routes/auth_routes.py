@@ -4,9 +4,13 @@ from app import db
 from flask_smorest import Blueprint
 from flask_jwt_extended import create_access_token, create_refresh_token
 from flask.views import MethodView
-from app.schemas.user_schema import RegisterSchema, LoginSchema
+from app.schemas.user_schema import RegisterSchema, LoginSchema, TimezoneSchema
 from app.utils.limiters import limiter
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.utils.passwords import needs_rehash
+from flask_jwt_extended import current_user, jwt_required, get_jwt_identity
+from app.utils.identity import forget_user
+from app.utils.cache_utils import invalidate_user_sessions_cache
+from app.utils.rollups import rebuild_rollups
 import logging
 
 auth_bp = Blueprint("auth", "auth", url_prefix="/auth")
@@ -18,16 +22,23 @@ class RegisterResource(MethodView):
     @auth_bp.response(201)
     @limiter.limit("10 per minute")
     def post(self, user_data):
-        if User.query.filter_by(username=user_data["username"]).first():
-            logging.error(f"Registration error: Username '{user_data['username']}' already exists")
+        # Both uniqueness checks in one query
+        taken = db.session.execute(
+            db.select(User.username, User.email).where(
+                (User.username == user_data["username"]) | (User.email == user_data["email"])
+            )
+        ).all()
+        if any(row.username == user_data["username"] for row in taken):
+            logging.error("Registration error: Username '%s' already exists", user_data['username'])
             return {"error": "This username already exists"}, 400
-        if User.query.filter_by(email=user_data["email"]).first():
-            logging.error(f"Registration error: Email '{user_data['email']}' already in use")
+        if taken:
+            logging.error("Registration error: Email '%s' already in use", user_data['email'])
             return {"error": "This email is already in use"}, 400
 
         new_user = User(
             username=user_data["username"],
-            email=user_data["email"]
+            email=user_data["email"],
+            timezone=user_data["timezone"]
         )
         new_user.set_password(user_data["password"])
 
@@ -36,10 +47,10 @@ class RegisterResource(MethodView):
             db.session.commit()
         except Exception as e:
             db.session.rollback()
-            logging.error(f"Error creating user: {e}")
+            logging.error("Error creating user: %s", e)
             return {"error": "An error occurred while creating the user"}, 500
 
-        logging.info(f"A new user has been created. Username: '{user_data['username']}' Email: '{user_data['email']}'")
+        logging.info("A new user has been created. Username: '%s' Email: '%s'", user_data['username'], user_data['email'])
         return {"message": "User created successfully"}, 201
 
 @auth_bp.route("/login")
@@ -49,10 +60,19 @@ class LoginResource(MethodView):
     @limiter.limit("10 per minute")
     def post(self, user_data):
         user = User.query.filter_by(username=user_data["username"]).first()
-        if not user or not user.check_password(user_data["password"]):
-            logging.warning(f"Failed login attempt for username: {user_data['username']}")
+        try:
+            valid = user is not None and user.check_password(user_data["password"])
+        except TimeoutError:
+            logging.error("Password verification timed out for username: %s", user_data['username'])
+            return {"error": "Login temporarily unavailable, try again"}, 503
+        if not valid:
+            logging.warning("Failed login attempt for username: %s", user_data['username'])
             return {"error": "Invalid username or password"}, 401
 
+        if needs_rehash(user.password_hash):
+            user.set_password(user_data["password"])
+            db.session.commit()
+
         access_token = create_access_token(identity=str(user.id))
         refresh_token = create_refresh_token(identity=str(user.id))
 
@@ -74,4 +94,28 @@ class RefreshResource(MethodView):
     def post(self):
         user_id = get_jwt_identity()
         access_token = create_access_token(identity=user_id)
-        return {"access_token": access_token}, 200
\ No newline at end of file
+        return {"access_token": access_token}, 200
+
+
+@auth_bp.route("/timezone")
+class TimezoneResource(MethodView):
+    @jwt_required()
+    def get(self):
+        return {"timezone": current_user.timezone}, 200
+
+    @jwt_required()
+    @auth_bp.arguments(TimezoneSchema)
+    @auth_bp.response(200)
+    @limiter.limit("10 per minute")
+    def put(self, timezone_data):
+        """Set the timezone short session times are resolved in"""
+        db.session.execute(
+            db.update(User).where(User.id == current_user.id).values(timezone=timezone_data["timezone"])
+        )
+        # The stats days follow the timezone, rebuild commits both
+        rebuild_rollups(current_user.id)
+        invalidate_user_sessions_cache()
+        # The cached identity carries the timezone
+        forget_user(current_user.id)
+        logging.info("User %s timezone set to %s", current_user.id, timezone_data["timezone"])
+        return {"message": "Timezone updated", "timezone": timezone_data["timezone"]}, 200
@@ -0,0 +1,42 @@
+import hmac
+from flask import current_app, request
+from app import cache, db
+from app.utils.pool_metrics import pool_stats
+from app.utils.metrics import metrics_response
+from flask_smorest import Blueprint
+from flask.views import MethodView
+
+metrics_bp = Blueprint("metrics", "metrics", url_prefix="/metrics")
+
+
+@metrics_bp.before_request
+def require_metrics_token():
+    """Traffic, pool state and pids are not for the public hosts"""
+    if current_app.config.get("METRICS_PUBLIC"):
+        return None
+    token = current_app.config.get("METRICS_TOKEN")
+    scheme, _, given = request.headers.get("Authorization", "").partition(" ")
+    if token and scheme == "Bearer" and hmac.compare_digest(given.encode(), token.encode()):
+        return None
+    return {"error": "Unauthorized"}, 401
+
+
+@metrics_bp.route("")
+class PrometheusMetrics(MethodView):
+    def get(self):
+        """Request latency, status, cache and per-request DB metrics (Prometheus text format)"""
+        return metrics_response()
+
+
+@metrics_bp.route("/cache")
+class CacheMetrics(MethodView):
+    def get(self):
+        """L1/L2 hit ratios and L1 usage of the worker serving the request"""
+        return cache.stats(), 200
+
+
+@metrics_bp.route("/pool")
+class PoolMetrics(MethodView):
+    def get(self):
+        """Connection pool usage, waits and timeouts of the worker serving the request"""
+        return pool_stats.as_dict(db.engine.pool), 200
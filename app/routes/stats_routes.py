@@ -0,0 +1,115 @@
+import re
+from datetime import datetime, timedelta
+from flask import request
+from app.models import StudyDailyRollup, Subject
+from app import db, cache
+from flask_smorest import Blueprint
+from flask_jwt_extended import current_user, jwt_required
+from flask.views import MethodView
+from app.utils.limiters import limiter
+from app.utils.cache_utils import body_response, cache_body, etag_for, etag_matches, not_modified, cache_key_user_stats
+from app.utils.metrics import count_cache
+from app.utils.timezones import current_zone
+import logging
+from app.utils.logging_setup import CACHE_LOGGER
+
+cache_log = logging.getLogger(CACHE_LOGGER)
+
+stats_bp = Blueprint("stats", "stats", url_prefix="/stats")
+
+RANGE_PATTERN = re.compile(r"^(\d{1,4})d$")
+MAX_RANGE_DAYS = 3660
+
+
+def streaks(days, today):
+    """Current and longest runs of consecutive study days.
+
+    The current streak is still alive if the last study day was yesterday.
+    """
+    longest = run = 0
+    previous = None
+    for day in days:
+        run = run + 1 if previous is not None and day - previous == timedelta(days=1) else 1
+        longest = max(longest, run)
+        previous = day
+    current = run if previous is not None and today - previous <= timedelta(days=1) else 0
+    return current, longest
+
+
+@stats_bp.route("")
+class StudyStats(MethodView):
+    @jwt_required()
+    @limiter.limit("100 per minute")
+    def get(self):
+        """Daily, weekly and per subject study totals and streaks for the current user.
+
+        Days, weeks and streaks follow the user's timezone, like the rollups.
+        """
+        current_user_id = current_user.id
+        match = RANGE_PATTERN.match(request.args.get("range", "30d"))
+        if not match or not 1 <= int(match.group(1)) <= MAX_RANGE_DAYS:
+            return {"error": f"Invalid range, use between 1d and {MAX_RANGE_DAYS}d"}, 400
+        days = int(match.group(1))
+        today = datetime.now(current_zone()).date()
+        since = today - timedelta(days=days - 1)
+
+        cache_key = cache_key_user_stats(days, today)
+        etag = etag_for(cache_key)
+        if etag_matches(etag):
+            return not_modified(etag)
+        cached_result = cache.get(cache_key)
+        if cached_result:
+            cache_log.info("Cache HIT for stats (user %s, %sd)", current_user_id, days)
+            count_cache("stats", "hit")
+            return body_response(cached_result, etag=etag)
+
+        cache_log.info("Cache MISS for stats (user %s, %sd)", current_user_id, days)
+        count_cache("stats", "miss")
+        in_range = (StudyDailyRollup.user_id == current_user_id) & (StudyDailyRollup.day >= since)
+        daily = db.session.execute(
+            db.select(
+                StudyDailyRollup.day,
+                db.func.sum(StudyDailyRollup.minutes).label("minutes"),
+                db.func.sum(StudyDailyRollup.session_count).label("sessions"),
+            )
+            .where(in_range)
+            .group_by(StudyDailyRollup.day)
+            .order_by(StudyDailyRollup.day)
+        ).all()
+        per_subject = db.session.execute(
+            db.select(
+                StudyDailyRollup.subject_id,
+                Subject.name,
+                db.func.sum(StudyDailyRollup.minutes).label("minutes"),
+                db.func.sum(StudyDailyRollup.session_count).label("sessions"),
+            )
+            .join(Subject, StudyDailyRollup.subject_id == Subject.id)
+            .where(in_range)
+            .group_by(StudyDailyRollup.subject_id, Subject.name)
+            .order_by(db.desc("minutes"))
+        ).all()
+
+        weekly = {}
+        for row in daily:
+            week_start = row.day - timedelta(days=row.day.weekday())
+            week = weekly.setdefault(week_start, {"week_start": week_start.isoformat(), "minutes": 0, "sessions": 0})
+            week["minutes"] += row.minutes
+            week["sessions"] += row.sessions
+        current_streak, longest_streak = streaks([row.day for row in daily if row.sessions > 0], today)
+
+        result = {
+            "range": {"from": since.isoformat(), "to": today.isoformat(), "days": days},
+            "total_minutes": sum(row.minutes for row in daily),
+            "session_count": sum(row.sessions for row in daily),
+            "daily": [
+                {"date": row.day.isoformat(), "minutes": row.minutes, "sessions": row.sessions}
+                for row in daily
+            ],
+            "weekly": list(weekly.values()),
+            "subjects": [
+                {"subject_id": row.subject_id, "subject_name": row.name, "minutes": row.minutes, "sessions": row.sessions}
+                for row in per_subject
+            ],
+            "streak": {"current": current_streak, "longest": longest_streak},
+        }
+        return body_response(cache_body(cache_key, result, timeout=300), etag=etag)
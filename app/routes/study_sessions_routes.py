@@ -1,17 +1,114 @@
-from flask import request
+import csv
+import io
+import json
+from flask import Response, current_app, request, stream_with_context
+from marshmallow import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
 from app.models import StudySessions, Subject
 from app import db, cache
 from flask_smorest import Blueprint
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import current_user, jwt_required
 from flask.views import MethodView
 from app.schemas.study_sessions_schema import StudySessionsSchema, EditStudySessionsSchema # Fixed import
 from app.utils.limiters import limiter
-from app.utils.cache_utils import cache_key_user_sessions, invalidate_user_sessions_cache, cache_key_user_single_session
+from app.utils.cache_utils import body_response, cache_body, etag_for, etag_matches, not_modified, cache_key_user_sessions, invalidate_user_sessions_cache, cache_key_user_single_session, cache_key_user_multi_get, multi_get_body, parse_ids
+from app.utils.serializers import session_serializer
+from app.utils.pagination import get_list_args, paginate_keyset, paginate_offset, next_cursor_of
+from app.utils.progress import add_session_to_progress, add_sessions_to_progress, remove_session_from_progress
+from app.utils.rollups import add_session_to_rollup, add_sessions_to_rollup, remove_session_from_rollup
+from app.utils.metrics import count_cache
+from app.utils.identity import owned_session, owned_subject
+from app.utils.timezones import current_zone
 import logging
-from sqlalchemy.orm import joinedload
+from app.utils.logging_setup import CACHE_LOGGER
+
+cache_log = logging.getLogger(CACHE_LOGGER)
 
 study_sessions_bp = Blueprint("sessions", "sessions", url_prefix="/sessions")
 
+NDJSON_MIMETYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl"}
+# Items are validated one by one: a pre_load error would fail a whole many=True load
+bulk_session_schema = StudySessionsSchema()
+
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+}
+EXPORT_BATCH_SIZE = 1000
+
+
+def export_rows(user_id, format):
+    """Yield the user's sessions encoded as CSV or NDJSON, one batch at a time.
+
+    Rows come from a server-side cursor (yield_per), so memory use does not
+    depend on the number of sessions.
+    """
+    stmt = (
+        session_serializer.select()
+        .where(Subject.user_id == user_id)
+        .order_by(StudySessions.start_time, StudySessions.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    result = db.session.execute(stmt)
+    if format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(session_serializer.names)
+        for batch in result.partitions():
+            for row in batch:
+                writer.writerow(session_serializer(row).values())
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+    else:
+        for batch in result.partitions():
+            yield "".join(json.dumps(session_serializer(row), separators=(",", ":")) + "\n" for row in batch)
+
+
+def read_bulk_items(limit):
+    """Items of a JSON array body or of an NDJSON stream.
+
+    Returns None when the body is neither. Undecodable NDJSON lines are kept
+    as None so that they still get an index in the error report. Stops
+    reading after limit + 1 items.
+    """
+    if request.mimetype in NDJSON_MIMETYPES:
+        items = []
+        for line in request.stream:
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError:
+                items.append(None)
+            if len(items) > limit:
+                break
+        return items
+    data = request.get_json(silent=True)
+    return data if isinstance(data, list) else None
+
+
+def get_many_sessions(user_id, ids_arg):
+    """Sessions in the order of ids_arg, one cache MGET plus one IN query for the misses"""
+    try:
+        ids = parse_ids(ids_arg, current_app.config.get("MULTI_GET_MAX_IDS", 100))
+    except ValueError:
+        return {"error": "Invalid ids, use a comma separated list of session ids"}, 400
+    etag = etag_for(cache_key_user_multi_get("session", ids), "sessions")
+    if etag_matches(etag):
+        return not_modified(etag)
+
+    def fetch(missing):
+        rows = db.session.execute(
+            session_serializer.select().where(StudySessions.id.in_(missing), Subject.user_id == user_id)
+        )
+        return {row.id: session_serializer(row) for row in rows}
+
+    return body_response(multi_get_body("sessions", "session", ids, fetch), etag=etag)
+
 
 @study_sessions_bp.route("")
 class StudySessionListCreate(MethodView):
@@ -21,15 +118,15 @@ class StudySessionListCreate(MethodView):
     @limiter.limit("20 per minute")
     def post(self, session_data):
         """Create a new session for the subject for the current user"""
-        current_user_id = int(get_jwt_identity())
+        current_user_id = current_user.id
 
         # Extract subject_id from the payload
         subject_id = session_data["subject_id"]
 
         # Verify subject belongs to the user
-        subject = Subject.query.filter_by(id=subject_id, user_id=current_user_id).first()
+        subject = owned_subject(subject_id, current_user_id)
         if not subject:
-            logging.error(f"The subject '{subject}' was not found in the database or it's unauthorized.")
+            logging.error("The subject '%s' was not found in the database or it's unauthorized.", subject_id)
             return {"error": "Subject not found or unauthorized"}, 403
 
         
@@ -46,111 +143,206 @@ class StudySessionListCreate(MethodView):
         )
 
         db.session.add(new_session)
+        db.session.flush()
+        # Read before commit expires the instance, saves a SELECT
+        session_id = new_session.id
+        add_session_to_progress(subject_id, duration, start, end)
+        add_session_to_rollup(current_user_id, subject_id, duration, start, current_zone())
         db.session.commit()
 
         invalidate_user_sessions_cache()
         logging.info("Study session was added successfully.")
         return {
             "message": "Session added successfully",
-            "id": new_session.id,
-            "subject_id": new_session.subject_id
+            "id": session_id,
+            "subject_id": subject_id
         }, 201
 
     @jwt_required()
     @limiter.limit("100 per minute")
     def get(self):
-        """Get all sessions for the current subject"""
-        current_user_id = int(get_jwt_identity())
-        page = request.args.get('page', 1, type=int)
-        per_page = min(request.args.get('per_page', 10, type=int), 100)        
+        """Get all sessions for the current subject, or the ones in ?ids=1,2,3"""
+        current_user_id = current_user.id
+        if "ids" in request.args:
+            return get_many_sessions(current_user_id, request.args["ids"])
+        page, per_page, cursor, with_total = get_list_args()
         # Generate cache key
-        cache_key = cache_key_user_sessions(page, per_page)
+        cache_key = cache_key_user_sessions(page, per_page, cursor, with_total)
+        etag = etag_for(cache_key)
+        if etag_matches(etag):
+            return not_modified(etag)
         
         # Try to get from cache
         cached_result = cache.get(cache_key)
         if cached_result:
-            logging.info(f"Cache HIT for sessions (user {current_user_id}, page {page})")
-            return cached_result, 200
+            cache_log.info("Cache HIT for sessions (user %s, page %s)", current_user_id, page)
+            count_cache("sessions", "hit")
+            return body_response(cached_result, etag=etag)
         
-        logging.info(f"Cache MISS for sessions (user {current_user_id}, page {page})")
+        cache_log.info("Cache MISS for sessions (user %s, page %s)", current_user_id, page)
+        count_cache("sessions", "miss")
         
-        user_subjects = Subject.query.filter_by(user_id=current_user_id).all()
-        subject_ids = [s.id for s in user_subjects]
-
-        sessions = (
-            db.session.query(StudySessions)
-            .options(joinedload(StudySessions.subject))   
-            .filter(StudySessions.subject_id.in_(subject_ids))
-            .paginate(page=page, per_page=per_page, error_out=False)
-        )
-
-        result = {
-            "sessions": [
-                {
-                    "session_id": ses.id,
-                    "subject_id": ses.subject_id,
-                    "subject_name": ses.subject.name,
-                    "start_time": ses.start_time.isoformat() if ses.start_time else None,
-                    "end_time": ses.end_time.isoformat() if ses.end_time else None,
-                    "duration_minutes": ses.duration_minutes,
-                    "notes": ses.notes
-                }
-                for ses in sessions.items
-            ],
-            "total": sessions.total,
-            "page": sessions.page,
-            "pages": sessions.pages
-        }
+        # One query joining on the owner, backed by idx_session_subject_start
+        stmt = session_serializer.select().where(Subject.user_id == current_user_id)
+        if cursor is not None:
+            try:
+                rows, next_cursor, total = paginate_keyset(
+                    stmt, StudySessions.start_time, StudySessions.id, cursor, per_page, with_total
+                )
+            except ValueError:
+                return {"error": "Invalid cursor"}, 400
+            result = {
+                "sessions": [session_serializer(row) for row in rows],
+                "next_cursor": next_cursor,
+            }
+            if with_total:
+                result["total"] = total
+        else:
+            rows, total, pages = paginate_offset(
+                stmt, StudySessions.start_time, StudySessions.id, page, per_page, with_total
+            )
+            result = {
+                "sessions": [session_serializer(row) for row in rows],
+                "total": total,
+                "page": page,
+                "pages": pages,
+                "next_cursor": next_cursor_of(rows, per_page, StudySessions.start_time, StudySessions.id),
+            }
         
         # Store in cache for 5 minutes
-        cache.set(cache_key, result, timeout=300)
-        
-        return result, 200
+        return body_response(cache_body(cache_key, result, timeout=300), etag=etag)
 
     
+@study_sessions_bp.route("/bulk")
+class StudySessionBulkImport(MethodView):
+    @jwt_required()
+    @study_sessions_bp.response(201)
+    @limiter.limit("5 per minute")
+    def post(self):
+        """Import many sessions at once from a JSON array or an NDJSON stream"""
+        current_user_id = current_user.id
+        max_items = current_app.config.get("BULK_IMPORT_MAX_ITEMS", 10000)
+        chunk_size = current_app.config.get("BULK_IMPORT_CHUNK_SIZE", 500)
+
+        items = read_bulk_items(max_items)
+        if items is None:
+            return {"error": "Expected a JSON array or an NDJSON body"}, 400
+        if len(items) > max_items:
+            return {"error": f"At most {max_items} sessions can be imported at once"}, 413
+
+        errors = {}
+        valid = []
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                errors[index] = {"_schema": ["Expected a JSON object"]}
+                continue
+            try:
+                valid.append((index, bulk_session_schema.load(item)))
+            except ValidationError as e:
+                errors[index] = e.messages
+
+        # One IN query for the ownership of every referenced subject
+        subject_ids = {data["subject_id"] for _, data in valid}
+        owned = set(db.session.scalars(
+            db.select(Subject.id).where(Subject.user_id == current_user_id, Subject.id.in_(subject_ids))
+        )) if subject_ids else set()
+
+        rows = []
+        for index, data in valid:
+            if data["subject_id"] not in owned:
+                errors[index] = {"subject_id": ["Subject not found or unauthorized"]}
+                continue
+            rows.append((index, {
+                "subject_id": data["subject_id"],
+                "start_time": data["start_time"],
+                "end_time": data["end_time"],
+                "duration_minutes": int((data["end_time"] - data["start_time"]).total_seconds() // 60),
+                "notes": data.get("notes", ""),
+            }))
+
+        # Each chunk runs in a savepoint: a failing chunk is reported and
+        # rolled back without losing the others, all of them commit together
+        inserted = 0
+        zone = current_zone()
+        for offset in range(0, len(rows), chunk_size):
+            chunk = [row for _, row in rows[offset:offset + chunk_size]]
+            try:
+                with db.session.begin_nested():
+                    db.session.execute(db.insert(StudySessions).values(chunk))
+                    add_sessions_to_progress(chunk)
+                    add_sessions_to_rollup(current_user_id, chunk, zone)
+                inserted += len(chunk)
+            except SQLAlchemyError as e:
+                logging.error("Bulk import chunk at offset %s failed: %s", offset, e)
+                for index, _ in rows[offset:offset + chunk_size]:
+                    errors[index] = {"_schema": ["Could not be stored"]}
+        db.session.commit()
+
+        if inserted:
+            invalidate_user_sessions_cache()
+        logging.info("Bulk import for user %s: %s inserted, %s failed.", current_user_id, inserted, len(errors))
+        status = 201 if not errors else 207 if inserted else 400
+        return {
+            "message": "Sessions imported" if inserted else "No session imported",
+            "inserted": inserted,
+            "failed": len(errors),
+            "errors": [{"index": index, "errors": errors[index]} for index in sorted(errors)],
+        }, status
+
+
+@study_sessions_bp.route("/export")
+class StudySessionExport(MethodView):
+    @jwt_required()
+    @limiter.limit("10 per minute")
+    def get(self):
+        """Stream the full study history of the current user as CSV or NDJSON"""
+        current_user_id = current_user.id
+        format = request.args.get("format", "csv")
+        if format not in EXPORT_FORMATS:
+            return {"error": "Invalid format, use csv or ndjson"}, 400
+        mimetype, extension = EXPORT_FORMATS[format]
+        logging.info("Exporting sessions of user %s as %s", current_user_id, format)
+        return Response(
+            stream_with_context(export_rows(current_user_id, format)),
+            mimetype=mimetype,
+            headers={"Content-Disposition": f"attachment; filename=studytrack-sessions.{extension}"},
+        )
+
+
 @study_sessions_bp.route("/<int:id>")
 class StudySessionDetail(MethodView):
     @jwt_required()
     @limiter.limit("100 per minute")
     def get(self,id):
         """Get a single session for the current subject"""
-        current_user_id = int(get_jwt_identity())
+        current_user_id = current_user.id
         
         # Generate cache key
         cache_key = cache_key_user_single_session(id)
+        etag = etag_for(cache_key, "sessions")
+        if etag_matches(etag):
+            return not_modified(etag)
         
         # Try to get from cache
         cached_result = cache.get(cache_key)
         if cached_result:
-            logging.info(f"Cache HIT for sessions (user {current_user_id}, session {id})")
-            return cached_result, 200
+            cache_log.info("Cache HIT for sessions (user %s, session %s)", current_user_id, id)
+            count_cache("sessions", "hit")
+            return body_response(cached_result, etag=etag)
         
-        logging.info(f"Cache MISS for sessions (user {current_user_id}, session {id})")
+        cache_log.info("Cache MISS for sessions (user %s, session %s)", current_user_id, id)
+        count_cache("sessions", "miss")
         
-        session = (
-            db.session.query(StudySessions)
-            .options(joinedload(StudySessions.subject))
-            .join(Subject)
-            .filter(StudySessions.id == id, Subject.user_id == current_user_id)
-            .first()
-        )
+        row = db.session.execute(
+            session_serializer.select().where(StudySessions.id == id, Subject.user_id == current_user_id)
+        ).first()
 
-        if not session:
+        if not row:
             return {"error": "Study session not found"}, 404
 
-        result = {
-            "session_id": session.id,
-            "subject_id": session.subject_id,
-            "subject_name": session.subject.name,
-            "start_time": session.start_time.isoformat() if session.start_time else None,
-            "end_time": session.end_time.isoformat() if session.end_time else None,
-            "duration_minutes": session.duration_minutes,
-            "notes": session.notes
-        }
-
-        cache.set(cache_key, result, timeout=300)
+        result = session_serializer(row)
 
-        return result, 200
+        return body_response(cache_body(cache_key, result, timeout=300), etag=etag)
     
     @jwt_required()
     @study_sessions_bp.arguments(EditStudySessionsSchema)
@@ -158,56 +350,56 @@ class StudySessionDetail(MethodView):
     @limiter.limit("20 per minute")
     def put(self, session_data, id):
         """Update a study session"""
-        current_user_id = int(get_jwt_identity())
+        current_user_id = current_user.id
 
-        session = StudySessions.query.get(id)
+        session, is_owner = owned_session(id, current_user_id)
         if not session:
             logging.error("Session was not found in the database.")
             return {"error": "Session not found"}, 404
-
-        subject = Subject.query.filter_by(
-            id=session.subject_id,
-            user_id=current_user_id
-        ).first()
-
-        if not subject:
+        if not is_owner:
             logging.error("Unauthorized attempt to update session.")
             return {"error": "Unauthorized"}, 403
         
         start = session_data["start_time"]
         end = session_data["end_time"]
         duration = int((end - start).total_seconds() // 60)
+        old_values = (session.duration_minutes, session.start_time, session.end_time)
+        zone = current_zone()
 
         session.start_time = start
         session.end_time = end
         session.duration_minutes = duration
         session.notes = session_data.get("notes", None)
+        remove_session_from_progress(session.subject_id, *old_values)
+        add_session_to_progress(session.subject_id, duration, start, end)
+        remove_session_from_rollup(session.subject_id, old_values[0], old_values[1], zone)
+        add_session_to_rollup(current_user_id, session.subject_id, duration, start, zone)
         db.session.commit()
 
         invalidate_user_sessions_cache()
-        logging.info(f"Session with id {id} updated successfully.")
+        # Write-through: the next GET is served from the fresh cache entry
+        row = db.session.execute(session_serializer.select().where(StudySessions.id == id)).first()
+        cache_body(cache_key_user_single_session(id), session_serializer(row), timeout=300)
+        logging.info("Session with id %s updated successfully.", id)
         return {"message": "Session updated successfully"}, 200
     
     @jwt_required()
     @limiter.limit("20 per minute")
     def delete(self, id):
-        current_user_id = int(get_jwt_identity())
+        current_user_id = current_user.id
 
-        session = StudySessions.query.get(id)
+        session, is_owner = owned_session(id, current_user_id)
         if not session:
             logging.error("Session was not found in the database.")
             return {"error": "Session not found"}, 404
-        
-        subject = Subject.query.filter_by(
-            id=session.subject_id,
-            user_id=current_user_id
-        ).first()
-
-        if not subject:
+        if not is_owner:
             return {"error": "Unauthorized"}, 403
         
         db.session.delete(session)
+        remove_session_from_progress(session.subject_id, session.duration_minutes, session.start_time, session.end_time)
+        remove_session_from_rollup(session.subject_id, session.duration_minutes, session.start_time, current_zone())
         db.session.commit()
         invalidate_user_sessions_cache()
+        cache.delete(cache_key_user_single_session(id))
         logging.info("Session was deleted succesfully.")
         return {"message": "Session deleted"}, 200
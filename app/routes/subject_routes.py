@@ -1,17 +1,43 @@
-from flask import request
-from app.models import Subject
+from flask import current_app, request
+from app.models import Subject, StudySessions, SubjectProgress
 from app import db, cache
 from flask_smorest import Blueprint
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import current_user, jwt_required
 from flask.views import MethodView
 from app.schemas.subject_schema import SubjectSchema, EditSubjectSchema  # Fixed import
-from datetime import datetime, timezone
 from app.utils.limiters import limiter
-from app.utils.cache_utils import cache_key_user_subjects, invalidate_user_subjects_cache, cache_key_user_single_subject
+from app.utils.cache_utils import body_response, cache_body, etag_for, etag_matches, not_modified, cache_key_user_subjects, invalidate_user_subjects_cache, cache_key_user_single_subject, invalidate_user_sessions_cache, evict_user_sessions, cache_key_user_multi_get, multi_get_body, parse_ids
+from app.utils.serializers import subject_serializer
+from app.utils.pagination import get_list_args, paginate_keyset, paginate_offset, next_cursor_of
+from app.utils.metrics import count_cache
+from app.utils.identity import owned_subject
 import logging
+from app.utils.logging_setup import CACHE_LOGGER
+
+cache_log = logging.getLogger(CACHE_LOGGER)
+
 subject_bp = Blueprint("subject", "subject", url_prefix="/subjects")
 
 
+def get_many_subjects(user_id, ids_arg):
+    """Subjects in the order of ids_arg, one cache MGET plus one IN query for the misses"""
+    try:
+        ids = parse_ids(ids_arg, current_app.config.get("MULTI_GET_MAX_IDS", 100))
+    except ValueError:
+        return {"error": "Invalid ids, use a comma separated list of subject ids"}, 400
+    etag = etag_for(cache_key_user_multi_get("subject", ids), "subjects")
+    if etag_matches(etag):
+        return not_modified(etag)
+
+    def fetch(missing):
+        rows = db.session.execute(
+            subject_serializer.select().where(Subject.id.in_(missing), Subject.user_id == user_id)
+        )
+        return {row.id: subject_serializer(row) for row in rows}
+
+    return body_response(multi_get_body("subjects", "subject", ids, fetch), etag=etag)
+
+
 @subject_bp.route("")
 class SubjectListCreate(MethodView):
     @jwt_required()
@@ -20,7 +46,7 @@ class SubjectListCreate(MethodView):
     @limiter.limit("20 per minute")
     def post(self, user_data):
         """Create a new subject for the current user"""
-        current_user_id = int(get_jwt_identity())
+        current_user_id = current_user.id
 
         new_subject = Subject(
             name=user_data["name"],
@@ -33,57 +59,68 @@ class SubjectListCreate(MethodView):
         )
 
         db.session.add(new_subject)
+        db.session.flush()
+        # Read before commit expires the instance, saves a SELECT
+        subject_id = new_subject.id
         db.session.commit()
         invalidate_user_subjects_cache()
 
-        logging.info(f"New subject with id {new_subject.id} was created successfully.")
+        logging.info("New subject with id %s was created successfully.", subject_id)
         return {
             "message": "Subject added successfully",
-            "id": new_subject.id,
-            "name": new_subject.name
+            "id": subject_id,
+            "name": user_data["name"]
         }, 201
 
     @jwt_required()
     @limiter.limit("100 per minute")
     def get(self):
-        """Get all subjects for the current user"""
-        current_user_id = int(get_jwt_identity())
-        page = request.args.get('page', 1, type=int)
-        per_page = min(request.args.get('per_page', 10, type=int), 100)
-        cache_key = cache_key_user_subjects(page, per_page)
+        """Get all subjects for the current user, or the ones in ?ids=1,2,3"""
+        current_user_id = current_user.id
+        if "ids" in request.args:
+            return get_many_subjects(current_user_id, request.args["ids"])
+        page, per_page, cursor, with_total = get_list_args()
+        cache_key = cache_key_user_subjects(page, per_page, cursor, with_total)
+        etag = etag_for(cache_key)
+        if etag_matches(etag):
+            return not_modified(etag)
 
         cached_result = cache.get(cache_key)
         if cached_result:
-            logging.info(f"Cache HIT for subjects (user {current_user_id}, page {page})")
-            return cached_result, 200
+            cache_log.info("Cache HIT for subjects (user %s, page %s)", current_user_id, page)
+            count_cache("subjects", "hit")
+            return body_response(cached_result, etag=etag)
         
-        logging.info(f"Cache MISS for subjects (user {current_user_id}, page {page})")
-        #pagination object
-        subjects = Subject.query.filter_by(user_id=current_user_id).paginate(page=page, per_page=per_page, error_out=False)
-        result = {
-            "subjects": [
-                {
-                    "id": s.id,
-                    "name": s.name,
-                    "description": s.description,
-                    "total_hours_goal": s.total_hours_goal,
-                    "total_hours_completed": s.total_hours_completed,
-                    "priority_level": s.priority_level.value,
-                    "status": s.status.value,
-                    "created_at": s.created_at.isoformat() if s.created_at else None,
-                    "updated_at": s.updated_at.isoformat() if s.updated_at else None,
-                }
-                for s in subjects.items
-            ],
-            "total": subjects.total,
-            "page": subjects.page,
-            "pages": subjects.pages
-        }
+        cache_log.info("Cache MISS for subjects (user %s, page %s)", current_user_id, page)
+        count_cache("subjects", "miss")
+        stmt = subject_serializer.select().where(Subject.user_id == current_user_id)
+        if cursor is not None:
+            try:
+                rows, next_cursor, total = paginate_keyset(
+                    stmt, Subject.created_at, Subject.id, cursor, per_page, with_total
+                )
+            except ValueError:
+                return {"error": "Invalid cursor"}, 400
+            result = {
+                "subjects": [subject_serializer(row) for row in rows],
+                "next_cursor": next_cursor,
+            }
+            if with_total:
+                result["total"] = total
+        else:
+            rows, total, pages = paginate_offset(
+                stmt, Subject.created_at, Subject.id, page, per_page, with_total
+            )
+            result = {
+                "subjects": [subject_serializer(row) for row in rows],
+                "total": total,
+                "page": page,
+                "pages": pages,
+                "next_cursor": next_cursor_of(rows, per_page, Subject.created_at, Subject.id),
+            }
         
         # Store in cache for 5 minutes
-        cache.set(cache_key, result, timeout=300)
-        
-        return result, 200
+        return body_response(cache_body(cache_key, result, timeout=300), etag=etag)
 
 
 @subject_bp.route("/<int:id>")
@@ -92,34 +129,29 @@ class SubjectDetail(MethodView):
     @limiter.limit("100 per minute")
     def get(self, id):
         """Get a single subject for the current user"""
-        current_user_id = int(get_jwt_identity())
+        current_user_id = current_user.id
         cache_key = cache_key_user_single_subject(id)
+        etag = etag_for(cache_key, "subjects")
+        if etag_matches(etag):
+            return not_modified(etag)
 
         cached_result = cache.get(cache_key)
         if cached_result:
-            logging.info(f"Cache HIT for subjects (user {current_user_id}, subject {id})")
-            return cached_result, 200
+            cache_log.info("Cache HIT for subjects (user %s, subject %s)", current_user_id, id)
+            count_cache("subjects", "hit")
+            return body_response(cached_result, etag=etag)
         
-        logging.info(f"Cache MISS for subjects (user {current_user_id}, subject {id})")
-        subject = Subject.query.filter_by(id=id,user_id=current_user_id).first()
-        if not subject:
+        cache_log.info("Cache MISS for subjects (user %s, subject %s)", current_user_id, id)
+        count_cache("subjects", "miss")
+        row = db.session.execute(
+            subject_serializer.select().where(Subject.id == id, Subject.user_id == current_user_id)
+        ).first()
+        if not row:
             return {"error": "Subject not found"}, 404
 
-        result = {
-            "id": subject.id,
-            "name": subject.name,
-            "description": subject.description,
-            "total_hours_goal": subject.total_hours_goal,
-            "total_hours_completed": subject.total_hours_completed,
-            "priority_level": subject.priority_level.value,
-            "status": subject.status.value,
-            "created_at": subject.created_at.isoformat() if subject.created_at else None,
-            "updated_at": subject.updated_at.isoformat() if subject.updated_at else None,
-        }
-
-        cache.set(cache_key, result, timeout=300)
-
-        return result, 200
+        result = subject_serializer(row)
+
+        return body_response(cache_body(cache_key, result, timeout=300), etag=etag)
     
     @jwt_required()
     @subject_bp.arguments(EditSubjectSchema)
@@ -127,9 +159,9 @@ class SubjectDetail(MethodView):
     @limiter.limit("20 per minute") 
     def put(self, user_data, id):
         """Update a subject (only owner can update)"""
-        current_user_id = int(get_jwt_identity())
+        current_user_id = current_user.id
 
-        subject = Subject.query.filter_by(id=id, user_id=current_user_id).first()
+        subject = owned_subject(id, current_user_id)
         if not subject:
             logging.error("Subject was not found in the database.")
             return {"error": "Subject not found or unauthorized"}, 404
@@ -141,26 +173,72 @@ class SubjectDetail(MethodView):
         subject.total_hours_completed = user_data["total_hours_completed"]
         subject.priority_level = user_data["priority_level"]
         subject.status = user_data["status"]
-        subject.updated_at = datetime.now(timezone.utc)
 
         db.session.commit()
         invalidate_user_subjects_cache()
-        logging.info(f"Subject with id {id} updated successfully.")
+        # Write-through: the next GET is served from the fresh cache entry
+        row = db.session.execute(subject_serializer.select().where(Subject.id == id)).first()
+        cache_body(cache_key_user_single_subject(id), subject_serializer(row), timeout=300)
+        # Sessions embed the subject name
+        session_ids = db.session.scalars(db.select(StudySessions.id).filter_by(subject_id=id)).all()
+        evict_user_sessions(session_ids)
+        invalidate_user_sessions_cache()
+        logging.info("Subject with id %s updated successfully.", id)
         return {"message": "Subject updated successfully"}, 200
 
     @jwt_required()
     @limiter.limit("20 per minute")
     def delete(self, id):
         """Delete a subject (only owner can delete)"""
-        current_user_id = int(get_jwt_identity())
+        current_user_id = current_user.id
 
-        subject = Subject.query.filter_by(id=id, user_id=current_user_id).first()
+        subject = owned_subject(id, current_user_id)
         if not subject:
             logging.error("Subject was not found in the database.")
             return {"error": "Subject not found or unauthorized"}, 404
 
+        session_ids = db.session.scalars(db.select(StudySessions.id).filter_by(subject_id=id)).all()
         db.session.delete(subject)
         db.session.commit()
         invalidate_user_subjects_cache()
+        cache.delete(cache_key_user_single_subject(id))
+        # Sessions are deleted along with their subject
+        evict_user_sessions(session_ids)
+        invalidate_user_sessions_cache()
         logging.info("Subject was deleted succesfully.")
-        return {"message": "Subject deleted successfully"}, 200
\ No newline at end of file
+        return {"message": "Subject deleted successfully"}, 200
+
+@subject_bp.route("/<int:id>/progress")
+class SubjectProgressResource(MethodView):
+    @jwt_required()
+    @limiter.limit("100 per minute")
+    def get(self, id):
+        """Study progress of a subject, read from its materialized aggregates"""
+        current_user_id = current_user.id
+
+        row = db.session.execute(
+            db.select(
+                Subject.id,
+                Subject.total_hours_goal,
+                SubjectProgress.total_minutes,
+                SubjectProgress.session_count,
+                SubjectProgress.first_session_at,
+                SubjectProgress.last_session_at,
+            )
+            .outerjoin(SubjectProgress, SubjectProgress.subject_id == Subject.id)
+            .where(Subject.id == id, Subject.user_id == current_user_id)
+        ).first()
+        if not row:
+            return {"error": "Subject not found"}, 404
+
+        total_minutes = row.total_minutes or 0
+        goal_minutes = (row.total_hours_goal or 0) * 60
+        return {
+            "subject_id": row.id,
+            "total_minutes": total_minutes,
+            "session_count": row.session_count or 0,
+            "first_session_at": row.first_session_at.isoformat() if row.first_session_at else None,
+            "last_session_at": row.last_session_at.isoformat() if row.last_session_at else None,
+            "total_hours_goal": row.total_hours_goal,
+            "goal_completion": round(total_minutes / goal_minutes, 4) if goal_minutes else None,
+        }, 200
@@ -0,0 +1,131 @@
+import re
+import threading
+from datetime import datetime, time, timedelta
+from functools import lru_cache
+from bleach.sanitizer import Cleaner
+from flask import current_app, has_app_context
+from marshmallow import Schema, fields, validates_schema, ValidationError, pre_load, post_load
+from app.utils.timezones import current_zone, to_utc
+
+# The characters bleach would change: markup, entities and the control
+# characters html5lib drops or rewrites. Text without them is returned as is.
+_NEEDS_BLEACH = re.compile(r"[<>&\x00-\x08\x0b-\x1f]")
+_CLOCK = re.compile(r"(\d{1,2}):(\d{1,2})([AaPp][Mm])?")
+_cleaners = threading.local()
+DEFAULT_OVERNIGHT_MAX_HOURS = 12
+
+
+def clean_text(value):
+    """bleach.clean(value, tags=[], strip=True), skipped when it cannot change anything"""
+    if not _NEEDS_BLEACH.search(value):
+        return value
+    # A Cleaner builds its html5lib parser once, parsers are not thread-safe
+    cleaner = getattr(_cleaners, "cleaner", None)
+    if cleaner is None:
+        cleaner = _cleaners.cleaner = Cleaner(tags=[], strip=True)
+    return cleaner.clean(value)
+
+
+@lru_cache(maxsize=1024)
+def parse_clock(value):
+    """Time of day of "03:00PM" / "15:00" (same rules as strptime %I:%M%p and %H:%M)"""
+    match = _CLOCK.fullmatch(value)
+    if match is None:
+        raise ValueError(value)
+    hour, minute, meridiem = int(match[1]), int(match[2]), match[3]
+    if meridiem:
+        if not 1 <= hour <= 12:
+            raise ValueError(value)
+        hour = hour % 12 + (12 if meridiem in ("PM", "pm", "Pm", "pM") else 0)
+    return time(hour, minute)
+
+
+def parse_iso(value, zone):
+    """Aware datetime of an ISO string, naive ones are taken as local to zone; None if not ISO"""
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=zone)
+
+
+class SanitizedSchema(Schema):
+    """Strips HTML from TEXT_FIELDS before validation and whitespace after it"""
+
+    TEXT_FIELDS = ()
+
+    @pre_load
+    def sanitize_input(self, data, **kwargs):
+        if not isinstance(data, dict):
+            return data  # marshmallow answers "Invalid input type."
+        for field in self.TEXT_FIELDS:
+            if field in data and isinstance(data[field], str):
+                data[field] = clean_text(data[field])
+        return data
+
+    @post_load
+    def final_cleanup(self, data, **kwargs):
+        for field in self.TEXT_FIELDS:
+            if field in data:
+                data[field] = data[field].strip()
+        return data
+
+
+class SessionTimesSchema(SanitizedSchema):
+    """start_time/end_time as 03:00PM, 15:00 or a full ISO datetime (bulk imports)
+
+    Short times and naive ISO datetimes are local to the user's timezone.
+    """
+
+    start_time = fields.DateTime(required=True)
+    end_time = fields.DateTime(required=True)
+
+    def timezone(self):
+        return current_zone()
+
+    def overnight_max(self):
+        """Longest session a short end time before the start may roll over into"""
+        hours = DEFAULT_OVERNIGHT_MAX_HOURS
+        if has_app_context():
+            hours = current_app.config.get("SESSION_OVERNIGHT_MAX_HOURS", hours)
+        return timedelta(hours=hours)
+
+    @pre_load
+    def parse_hour_minute(self, data, **kwargs):
+        """Resolve both bounds in the user's zone and store them as naive UTC.
+
+        A clock start time is on today's local date, a clock end time on the
+        start's local date, or the day after when that would not be later and
+        the session stays under overnight_max() (a session crossing midnight).
+        Anything else is left for validate_time_order to reject.
+        """
+        if not isinstance(data, dict):
+            return data
+        zone = self.timezone()
+        start = None
+        for field in ("start_time", "end_time"):
+            value = data.get(field)
+            if not isinstance(value, str):
+                continue
+            value = value.strip()
+            parsed = parse_iso(value, zone)
+            if parsed is None:
+                try:
+                    clock = parse_clock(value)
+                except ValueError:
+                    raise ValidationError({field: "Invalid time format"})
+                day = start.astimezone(zone).date() if start is not None else datetime.now(zone).date()
+                parsed = datetime.combine(day, clock, zone)
+                if start is not None and parsed <= start:
+                    next_day = datetime.combine(day + timedelta(days=1), clock, zone)
+                    if next_day - start < self.overnight_max():
+                        parsed = next_day
+            if field == "start_time":
+                start = parsed
+            data[field] = to_utc(parsed).isoformat()
+        return data
+
+    @validates_schema
+    def validate_time_order(self, data, **kwargs):
+        if data["end_time"] <= data["start_time"]:
+            raise ValidationError({"end_time": "The end time must be later than the start time"})
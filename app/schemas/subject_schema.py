@@ -1,7 +1,10 @@
-from marshmallow import Schema, fields, validates, ValidationError, pre_load, post_load
-import bleach
+from marshmallow import fields, validates, ValidationError
+from app.schemas.base import SanitizedSchema
+
+
+class SubjectSchema(SanitizedSchema):
+    TEXT_FIELDS = ("name", "description", "priority_level", "status")
 
-class SubjectSchema(Schema):
     name = fields.Str(required=True)
     description = fields.Str(required=True)
     total_hours_goal = fields.Int(required=True)
@@ -9,14 +12,6 @@ class SubjectSchema(Schema):
     priority_level = fields.Str(required=True)
     status = fields.Str(required=True)
 
-    @pre_load
-    def sanitize_input(self, data, **kwargs):
-        text_fields = ["name", "description", "priority_level", "status"] 
-        for field in text_fields:
-            if field in data and isinstance(data[field], str):
-                data[field] = bleach.clean( data[field], tags=[],strip=True ) 
-        return data
-    
     @validates("name")
     def validate_name(self, value, **kwargs):
         if len(value) > 100:
@@ -31,55 +26,13 @@ class SubjectSchema(Schema):
     def validate_hours_goal(self, value, **kwargs):
         if value < 0:
             raise ValidationError("Total hours goal must be non-negative.")
-    
-    @post_load
-    def final_cleanup(self, data, **kwargs):
-        text_fields = ["name", "description", "priority_level", "status"] 
-        for field in text_fields:
-            if field in data:
-                data[field] = data[field].strip()
-        return data
 
-class EditSubjectSchema(Schema):
-    name = fields.Str(required=True)
-    description = fields.Str(required=True)
-    total_hours_goal = fields.Int(required=True)
-    total_hours_completed = fields.Int(required=True)
-    priority_level = fields.Str(required=True)
-    status = fields.Str(required=True)
 
-    @pre_load
-    def sanitize_input(self, data, **kwargs):
-        text_fields = ["name", "description", "priority_level", "status"] 
-        for field in text_fields:
-            if field in data and isinstance(data[field], str):
-                data[field] = bleach.clean( data[field], tags=[],strip=True ) 
-        return data
-    
-    @validates("name")
-    def validate_name(self, value, **kwargs):
-        if len(value) > 100:
-            raise ValidationError("The name of the subject must be at most 100 characters long.")
-        
-    @validates("description")
-    def validate_description(self, value, **kwargs):
-        if len(value) > 512:
-            raise ValidationError("The description of the subject must be at most 512 characters long.")
-
-    @validates("total_hours_goal")
-    def validate_hours_goal(self, value, **kwargs):
-        if value < 0:
-            raise ValidationError("Total hours goal must be non-negative.")
+class EditSubjectSchema(SubjectSchema):
+    total_hours_completed = fields.Int(required=True)
 
     @validates("total_hours_completed")
     def validate_hours_completed(self, value, **kwargs):
         if value < 0:
             raise ValidationError("Total hours completed must be non-negative.")
 
-    @post_load
-    def final_cleanup(self, data, **kwargs):
-        text_fields = ["name", "description", "priority_level", "status"] 
-        for field in text_fields:
-            if field in data:
-                data[field] = data[field].strip()
-        return data
\ No newline at end of file
@@ -1,24 +1,28 @@
 from marshmallow import Schema, fields, validates, validates_schema, ValidationError, pre_load, post_load
-import bleach
 import re
+from app.schemas.base import clean_text
+from app.utils.timezones import DEFAULT_TIMEZONE, is_valid_timezone
+
+_USERNAME = re.compile(r"^[A-Za-z0-9]+$")
 
 class RegisterSchema(Schema):
     username = fields.Str(required=True)
     email = fields.Email(required=True)
     password = fields.Str(required=True)
     confirm_password = fields.Str(required=True)
+    timezone = fields.Str(required=False, load_default=DEFAULT_TIMEZONE)
     
     @pre_load
     def sanitize_input(self, data, **kwargs):
         text_fields = ["username", "email"] 
         for field in text_fields:
             if field in data and isinstance(data[field], str):
-                data[field] = bleach.clean( data[field], tags=[],strip=True ) 
+                data[field] = clean_text(data[field])
         return data
 
     @validates("username")
     def validate_username(self, value, **kwargs):
-        if not re.match(r"^[A-Za-z0-9]+$", value):
+        if not _USERNAME.match(value):
             raise ValidationError("The username must contain only letters and numbers.")
 
         if not (re.search(r"[A-Za-z]", value) and re.search(r"[0-9]", value)):
@@ -27,6 +31,11 @@ class RegisterSchema(Schema):
         if len(value) > 15:
             raise ValidationError("The username must be at most 15 characters long.")
 
+    @validates("timezone")
+    def validate_timezone(self, value, **kwargs):
+        if not is_valid_timezone(value):
+            raise ValidationError("Unknown timezone, use an IANA name such as Europe/Madrid.")
+
 
     @validates("password")
     def validate_password_length(self, value, **kwargs):
@@ -57,7 +66,14 @@ class LoginSchema(Schema):
     @pre_load
     def sanitize_input(self, data, **kwargs):
         if "username" in data:
-            data["username"] = bleach.clean(data["username"], tags=[], strip=True)
+            data["username"] = clean_text(data["username"])
         return data
 
 
+class TimezoneSchema(Schema):
+    timezone = fields.Str(required=True)
+
+    @validates("timezone")
+    def validate_timezone(self, value, **kwargs):
+        if not is_valid_timezone(value):
+            raise ValidationError("Unknown timezone, use an IANA name such as Europe/Madrid.")
@@ -0,0 +1,112 @@
+import pickle
+import time
+from app import cache
+from app.utils.cache_utils import generation_key
+
+
+def _dumps(value):
+    """cachelib's RedisSerializer format: ints as digits, anything else pickled"""
+    if type(value) is int:
+        return str(value).encode("ascii")
+    return b"!" + pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+
+def _loads(value):
+    if value is None:
+        return None
+    if value.startswith(b"!"):
+        return pickle.loads(value[1:])
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+
+class AsyncRedisCache:
+    """Async access to the keys written by Flask-Caching's RedisCache.
+
+    Same key prefix and value encoding as cachelib, so the ASGI and WSGI
+    modes share one cache. Writes are announced on the invalidation channel
+    like TieredCache does, workers holding the key in L1 drop it.
+    """
+
+    def __init__(self, client, key_prefix, channel, default_timeout=300):
+        self.client = client
+        self.key_prefix = key_prefix
+        self.channel = channel
+        self.default_timeout = default_timeout
+
+    @classmethod
+    def from_config(cls, config):
+        import redis.asyncio
+        client = redis.asyncio.Redis(
+            host=config["CACHE_REDIS_HOST"],
+            port=config["CACHE_REDIS_PORT"],
+            db=config["CACHE_REDIS_DB"],
+            password=config["CACHE_REDIS_PASSWORD"],
+        )
+        return cls(
+            client,
+            config.get("CACHE_KEY_PREFIX", "flask_cache_"),
+            config.get("CACHE_INVALIDATION_CHANNEL", "studytrack:cache:invalidate"),
+            config.get("CACHE_DEFAULT_TIMEOUT", 300),
+        )
+
+    def _expiry(self, timeout):
+        timeout = self.default_timeout if timeout is None else timeout
+        return timeout if timeout > 0 else None
+
+    async def get(self, key):
+        return _loads(await self.client.get(self.key_prefix + key))
+
+    async def set(self, key, value, timeout=None):
+        await self.client.set(self.key_prefix + key, _dumps(value), ex=self._expiry(timeout))
+        await self.client.publish(self.channel, key)
+
+    async def add(self, key, value, timeout=None):
+        return bool(await self.client.set(self.key_prefix + key, _dumps(value), ex=self._expiry(timeout), nx=True))
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+class AppCacheAdapter:
+    """Async facade over the app's TieredCache for in-process backends.
+
+    Used when the cache is not Redis (development, tests): those backends do
+    no I/O, so calling them from the event loop does not block it.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def get(self, key):
+        with self.app.app_context():
+            return cache.get(key)
+
+    async def set(self, key, value, timeout=None):
+        with self.app.app_context():
+            cache.set(key, value, timeout=timeout)
+
+    async def add(self, key, value, timeout=None):
+        with self.app.app_context():
+            return cache.add(key, value, timeout=timeout)
+
+    async def aclose(self):
+        pass
+
+
+def make_async_cache(app):
+    if app.config.get("CACHE_TYPE") == "RedisCache":
+        return AsyncRedisCache.from_config(app.config)
+    return AppCacheAdapter(app)
+
+
+async def get_generation(async_cache, user_id, resource):
+    """Async twin of cache_utils.get_user_generation"""
+    key = generation_key(user_id, resource)
+    generation = await async_cache.get(key)
+    if generation is None:
+        await async_cache.add(key, time.time_ns() // 1000, timeout=0)
+        generation = await async_cache.get(key)
+    return int(generation)
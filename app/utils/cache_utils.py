@@ -1,40 +1,211 @@
 # Step 5: Create app/utils/cache_utils.py
+import hashlib
+import json
+import time
+import brotli
+from flask import Response, current_app, request
 from flask_jwt_extended import get_jwt_identity
 from app import cache
+from app.utils.metrics import count_cache
 
-def cache_key_user_subjects(page=1, per_page=10):
-    """Generate cache key for user's subjects"""
+# First byte of a cached body tells how the rest of it is encoded
+_PLAIN = b"j"
+_BROTLI = b"b"
+
+
+def generation_key(user_id, resource):
+    """Cache key holding the generation counter of a user's resource lists"""
+    return f"user:{user_id}:{resource}:gen"
+
+def seed_generation(key):
+    """Create a missing counter with the current time instead of 0, so that
+    keys built before the counter was evicted can never be reused"""
+    cache.add(key, time.time_ns() // 1000, timeout=0)
+
+def get_user_generation(resource):
+    """Return the current generation of the user's cached lists"""
     user_id = get_jwt_identity()
-    return f"user:{user_id}:subjects:page:{page}:per_page:{per_page}"
+    key = generation_key(user_id, resource)
+    generation = cache.get(key)
+    if generation is None:
+        seed_generation(key)
+        generation = cache.get(key)
+    return int(generation)
+
+def bump_user_generation(resource):
+    """Atomically move the user's lists to a new generation.
+
+    On Redis a SETNX (a no-op once the counter exists) then one INCR; an
+    evicted counter restarts from the time seed, not from 1.
+    """
+    user_id = get_jwt_identity()
+    key = generation_key(user_id, resource)
+    count_cache(resource, "invalidation")
+    seed_generation(key)
+    return cache.inc(key)
+
+
+def _list_key_suffix(cursor, with_total):
+    suffix = f":cursor:{cursor}" if cursor is not None else ""
+    return suffix if with_total else f"{suffix}:nototal"
+
+def list_key(user_id, resource, generation, page, per_page, cursor=None, with_total=True):
+    """Cache key of one page of a user's resource list (shared with the ASGI mode)"""
+    return (f"user:{user_id}:{resource}:v{generation}:page:{page}:per_page:{per_page}"
+            f"{_list_key_suffix(cursor, with_total)}")
+
+def item_key(user_id, kind, id):
+    """Cache key of a single subject or session (shared with the ASGI mode)"""
+    return f"user:{user_id}:{kind}:{id}"
+
+def cache_key_user_subjects(page=1, per_page=10, cursor=None, with_total=True):
+    """Generate cache key for user's subjects"""
+    return list_key(get_jwt_identity(), "subjects", get_user_generation("subjects"),
+                    page, per_page, cursor, with_total)
 
 def cache_key_user_single_subject(id):
     """Generate cache key for user's subjects"""
-    user_id = get_jwt_identity()
-    return f"user:{user_id}:subject:{id}"
+    return item_key(get_jwt_identity(), "subject", id)
 
 
-def cache_key_user_sessions(page=1, per_page=10):
+def cache_key_user_sessions(page=1, per_page=10, cursor=None, with_total=True):
     """Generate cache key for user's sessions"""
+    return list_key(get_jwt_identity(), "sessions", get_user_generation("sessions"),
+                    page, per_page, cursor, with_total)
+
+def cache_key_user_stats(days, today):
+    """Generate cache key for user's stats, versioned with the sessions"""
     user_id = get_jwt_identity()
-    return f"user:{user_id}:sessions:page:{page}:per_page:{per_page}"
+    generation = get_user_generation("sessions")
+    return f"user:{user_id}:stats:v{generation}:days:{days}:today:{today.isoformat()}"
 
 def cache_key_user_single_session(id):
     """Generate cache key for user's subjects"""
-    user_id = get_jwt_identity()
-    return f"user:{user_id}:session:{id}"
+    return item_key(get_jwt_identity(), "session", id)
 
 def invalidate_user_subjects_cache():
-    """Delete all subject cache entries for current user"""
-    user_id = get_jwt_identity()
-    for page in range(1, 11): # Assuming max 10 pages for simplicity
-        for per_page in [10, 20, 50]:
-            key = f"user:{user_id}:subjects:page:{page}:per_page:{per_page}"
-            cache.delete(key)
+    """Invalidate every cached subjects page of the current user.
+
+    Old pages are never deleted, they just stop being addressed and expire
+    through their own TTL.
+    """
+    bump_user_generation("subjects")
 
 def invalidate_user_sessions_cache():
-    """Delete all session cache entries for current user"""
+    """Invalidate every cached sessions page of the current user"""
+    bump_user_generation("sessions")
+
+def evict_user_sessions(session_ids):
+    """Drop the single-session cache entries of the given sessions"""
+    if session_ids:
+        cache.delete_many(*[cache_key_user_single_session(id) for id in session_ids])
+
+
+def encode_body(result, config=None):
+    """Encode a response body once, brotli-compressed when it is large enough"""
+    raw = json.dumps(result, separators=(",", ":")).encode()
+    config = current_app.config if config is None else config
+    if config.get("CACHE_COMPRESSION", True) and len(raw) >= config.get("CACHE_COMPRESSION_MIN_BYTES", 512):
+        return _BROTLI + brotli.compress(raw, quality=config.get("CACHE_BROTLI_QUALITY", 5))
+    return _PLAIN + raw
+
+def etag_for(cache_key, resource=None):
+    """Strong ETag of the response cached under cache_key.
+
+    List keys already embed the user's generation; single item keys are
+    combined with the generation of `resource`. Either way the tag changes
+    exactly when the cache is invalidated. br and identity responses get
+    distinct tags.
+    """
+    if resource is not None:
+        cache_key = f"{cache_key}:v{get_user_generation(resource)}"
+    return make_etag(cache_key, "br" in request.accept_encodings)
+
+def make_etag(cache_key, accepts_br):
+    tag = hashlib.blake2b(cache_key.encode(), digest_size=12).hexdigest()
+    return f"{tag}-br" if accepts_br else tag
+
+def etag_matches(etag):
+    return request.if_none_match.contains_weak(etag)
+
+def not_modified(etag):
+    """304 answer for a matching If-None-Match, no cache or DB access needed"""
+    response = Response(status=304)
+    response.set_etag(etag)
+    response.vary.add("Accept-Encoding")
+    return response
+
+def body_response(body, status=200, etag=None):
+    """Stream a cached body to the client without decoding it.
+
+    Compressed bodies are only decompressed for clients that do not accept br.
+    """
+    payload, compressed = decode_body(body, "br" in request.accept_encodings)
+    response = Response(payload, status=status, mimetype="application/json")
+    if etag is not None:
+        response.set_etag(etag)
+    if compressed:
+        response.headers["Content-Encoding"] = "br"
+    response.vary.add("Accept-Encoding")
+    return response
+
+def decode_body(body, accepts_br):
+    """(payload, is_brotli) of a cached body, decompressed unless br is accepted"""
+    marker, payload = body[:1], body[1:]
+    if marker != _BROTLI:
+        return payload, False
+    if accepts_br:
+        return payload, True
+    return brotli.decompress(payload), False
+
+def parse_ids(value, limit):
+    """Unique ids of an `ids=1,2,3` argument in request order.
+
+    Raises ValueError for anything but 1 to `limit` integers.
+    """
+    ids = list(dict.fromkeys(int(part) for part in value.split(",")))
+    if not 1 <= len(ids) <= limit:
+        raise ValueError(value)
+    return ids
+
+def cache_key_user_multi_get(kind, ids):
+    """Key the ETag of a multi-get is derived from (nothing is stored under it)"""
+    return item_key(get_jwt_identity(), kind, "ids:" + ",".join(map(str, ids)))
+
+def multi_get_body(resource, kind, ids, fetch, timeout=300):
+    """Body (for body_response) of the user's items with the given ids, in request order.
+
+    Cached items come from one get_many (MGET on Redis) and the misses from
+    fetch(ids) -> {id: item}, one IN query, written back with one set_many
+    (a pipeline on Redis). Cached JSON is spliced in as bytes, never decoded.
+    Ids that do not exist or are not the user's are listed under "missing".
+    """
     user_id = get_jwt_identity()
-    for page in range(1, 11):
-        for per_page in [10, 20, 50]:
-            key = f"user:{user_id}:sessions:page:{page}:per_page:{per_page}"
-            cache.delete(key)
\ No newline at end of file
+    keys = [item_key(user_id, kind, id) for id in ids]
+    bodies = cache.get_many(*keys)
+    misses = [id for id, body in zip(ids, bodies) if body is None]
+    count_cache(resource, "hit" if not misses else "miss")
+    if misses:
+        items = fetch(misses)
+        filled = {}
+        for index, (id, body) in enumerate(zip(ids, bodies)):
+            if body is None and id in items:
+                bodies[index] = filled[keys[index]] = encode_body(items[id])
+        if filled:
+            cache.set_many(filled, timeout=timeout)
+
+    found = []
+    missing = []
+    for id, body in zip(ids, bodies):
+        if body is None:
+            missing.append(id)
+        else:
+            found.append(decode_body(body, False)[0])
+    return (_PLAIN + b'{"' + resource.encode() + b'":[' + b",".join(found) + b'],"missing":'
+            + json.dumps(missing, separators=(",", ":")).encode() + b"}")
+
+def cache_body(cache_key, result, timeout=300):
+    """Encode a result, store the bytes under cache_key and return them"""
+    body = encode_body(result)
+    cache.set(cache_key, body, timeout=timeout)
+    return body
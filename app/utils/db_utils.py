@@ -0,0 +1,38 @@
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+from app import db
+
+
+def upsert_insert(table):
+    """INSERT supporting ON CONFLICT DO UPDATE for the dialect in use"""
+    if db.session.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(table)
+    return sqlite.insert(table)
+
+
+class utc_now(FunctionElement):
+    """Current UTC time computed by the database, for naive DateTime columns.
+
+    func.now() is session-local time on PostgreSQL and whole seconds on
+    SQLite, this renders UTC with sub-second precision on both.
+    """
+    type = sa.DateTime()
+    inherit_cache = True
+
+
+@compiles(utc_now)
+def _utc_now_default(element, compiler, **kw):
+    return "CURRENT_TIMESTAMP"
+
+
+@compiles(utc_now, "sqlite")
+def _utc_now_sqlite(element, compiler, **kw):
+    # Padded to the microseconds SQLAlchemy writes, so stored values compare as strings
+    return "STRFTIME('%Y-%m-%d %H:%M:%f', 'now') || '000'"
+
+
+@compiles(utc_now, "postgresql")
+def _utc_now_postgresql(element, compiler, **kw):
+    return "TIMEZONE('utc', CLOCK_TIMESTAMP())"
@@ -0,0 +1,58 @@
+from typing import NamedTuple
+from flask import current_app
+from app import cache, db
+from app.models import StudySessions, Subject, User
+
+
+class UserIdentity(NamedTuple):
+    """What requests need to know about the user of a token, cheap to cache"""
+    id: int
+    username: str
+    timezone: str = "UTC"
+
+
+def identity_key(user_id):
+    return f"user:{user_id}:identity"
+
+
+def load_user(_jwt_header, jwt_data):
+    """`current_user` of a token, cached for USER_CACHE_TTL seconds.
+
+    Returning None (deleted user) makes flask-jwt-extended answer 401.
+    """
+    user_id = int(jwt_data[current_app.config["JWT_IDENTITY_CLAIM"]])
+    key = identity_key(user_id)
+    identity = cache.get(key)
+    if identity is None:
+        row = db.session.execute(db.select(User.id, User.username, User.timezone).where(User.id == user_id)).first()
+        if row is None:
+            return None
+        identity = UserIdentity(*row)
+        cache.set(key, identity, timeout=current_app.config.get("USER_CACHE_TTL", 60))
+    return identity
+
+
+def init_identity(jwt_manager):
+    jwt_manager.user_lookup_loader(load_user)
+
+
+def forget_user(user_id):
+    """Drop the cached identity after the user row changes"""
+    cache.delete(identity_key(user_id))
+
+
+def owned_subject(id, user_id):
+    """The subject if it belongs to the user, else None (one query)"""
+    return db.session.scalar(db.select(Subject).where(Subject.id == id, Subject.user_id == user_id))
+
+
+def owned_session(id, user_id):
+    """(session, is_owner) in one query joining on the subject; (None, False) if missing"""
+    row = db.session.execute(
+        db.select(StudySessions, Subject.user_id)
+        .join(Subject, Subject.id == StudySessions.subject_id)
+        .where(StudySessions.id == id)
+    ).first()
+    if row is None:
+        return None, False
+    return row[0], row[1] == user_id
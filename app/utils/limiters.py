@@ -1,4 +1,181 @@
+import threading
+import time
+from math import floor
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
+from limits.storage import SlidingWindowCounterSupport, Storage, storage_from_string
+from limits.storage.base import TimestampedSlidingWindow
 
-limiter = Limiter(key_func=get_remote_address)
+BATCHED_PREFIX = "batched+"
+
+
+def rate_limit_key():
+    """JWT identity for authenticated requests, client address otherwise.
+
+    Keying by user keeps users behind one NAT from sharing a budget, and one
+    user from getting a fresh budget per address.
+    """
+    try:
+        verify_jwt_in_request(optional=True)
+        identity = get_jwt_identity()
+    except Exception:
+        identity = None
+    if identity is not None:
+        return f"user:{identity}"
+    return f"ip:{get_remote_address()}"
+
+
+def shared_storage_uri(uri):
+    """The URI of the shared storage behind a batched+ URI"""
+    return uri[len(BATCHED_PREFIX):] if uri.startswith(BATCHED_PREFIX) else uri
+
+
+class _Counter:
+    __slots__ = ("synced", "pending", "synced_at", "expires_at")
+
+    def __init__(self, expires_at):
+        self.synced = 0
+        self.pending = 0
+        self.synced_at = 0.0
+        self.expires_at = expires_at
+
+
+class BatchedStorage(Storage, SlidingWindowCounterSupport, TimestampedSlidingWindow):
+    """Rate limit counters kept in the worker and pushed to a shared storage in batches.
+
+    `batched+redis://host:6379/0` counts hits locally and sends them with one
+    INCRBY every `batch_size` hits or `sync_interval` seconds per key, reading
+    back the fleet-wide total at the same time. Between two syncs a worker
+    only knows its own hits, so a limit can be overshot by up to
+    `workers * (batch_size - 1)` hits per window. Supports the fixed-window
+    and sliding-window-counter strategies.
+    """
+
+    STORAGE_SCHEME = ["batched+redis", "batched+rediss", "batched+valkey", "batched+memory"]
+    MAX_KEYS = 10000  # expired counters are dropped past this
+
+    def __init__(self, uri, wrap_exceptions=False, batch_size=10, sync_interval=1.0, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions)
+        self.shared = storage_from_string(shared_storage_uri(uri), wrap_exceptions=wrap_exceptions, **options)
+        self.batch_size = int(batch_size)
+        self.sync_interval = float(sync_interval)
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    @property
+    def base_exceptions(self):
+        return self.shared.base_exceptions
+
+    def _counter(self, key, now):
+        counter = self._counters.get(key)
+        if counter is None or counter.expires_at <= now:
+            return None
+        return counter
+
+    def _sync(self, key, counter, expiry, now):
+        if counter.pending:
+            counter.synced = self.shared.incr(key, expiry, amount=counter.pending)
+        else:
+            counter.synced = self.shared.get(key)
+        if not counter.synced_at:
+            # Another worker may have opened the window earlier, a key that
+            # is not there yet is read again after sync_interval
+            counter.expires_at = max(self.shared.get_expiry(key), now + self.sync_interval)
+        counter.pending = 0
+        counter.synced_at = now
+
+    def _new_counter(self, key, expires_at, now):
+        if len(self._counters) >= self.MAX_KEYS:
+            self._counters = {name: counter for name, counter in self._counters.items() if counter.expires_at > now}
+        counter = self._counters[key] = _Counter(expires_at)
+        return counter
+
+    def incr(self, key, expiry, amount=1):
+        now = time.time()
+        with self._lock:
+            counter = self._counter(key, now)
+            if counter is None:
+                counter = self._new_counter(key, now + expiry, now)
+            counter.pending += amount
+            if counter.pending >= self.batch_size or now - counter.synced_at >= self.sync_interval:
+                self._sync(key, counter, expiry, now)
+            return counter.synced + counter.pending
+
+    def decr(self, key, amount=1):
+        with self._lock:
+            counter = self._counter(key, time.time())
+            if counter is None:
+                return 0
+            counter.pending -= amount
+            return counter.synced + counter.pending
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            counter = self._counter(key, now)
+            if counter is None:
+                # Only the hits of other workers, once per key and window
+                counter = self._new_counter(key, now + self.sync_interval, now)
+                self._sync(key, counter, self.sync_interval, now)
+            return counter.synced + counter.pending
+
+    def get_expiry(self, key):
+        with self._lock:
+            counter = self._counter(key, time.time())
+            return counter.expires_at if counter else time.time()
+
+    def clear(self, key):
+        with self._lock:
+            self._counters.pop(key, None)
+        self.shared.clear(key)
+
+    def check(self):
+        return self.shared.check()
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+        return self.shared.reset()
+
+    def flush(self):
+        """Push every pending hit, e.g. before a worker exits"""
+        now = time.time()
+        with self._lock:
+            for key, counter in list(self._counters.items()):
+                if counter.pending and counter.expires_at > now:
+                    self._sync(key, counter, int(counter.expires_at - now) or 1, now)
+
+    def _sliding_window(self, key, expiry, now):
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        previous_count = self.get(previous_key)
+        current_count = self.get(current_key)
+        previous_ttl = (1 - (((now - expiry) / expiry) % 1)) * expiry if previous_count else 0.0
+        current_ttl = (1 - ((now / expiry) % 1)) * expiry + expiry
+        return previous_count, previous_ttl, current_count, current_ttl
+
+    def acquire_sliding_window_entry(self, key, limit, expiry, amount=1):
+        if amount > limit:
+            return False
+        now = time.time()
+        previous_count, previous_ttl, current_count, _ = self._sliding_window(key, expiry, now)
+        if floor(previous_count * previous_ttl / expiry + current_count) + amount > limit:
+            return False
+        _, current_key = self.sliding_window_keys(key, expiry, now)
+        current_count = self.incr(current_key, 2 * expiry, amount=amount)
+        if floor(previous_count * previous_ttl / expiry + current_count) > limit:
+            # Another worker's hits arrived with this sync
+            self.decr(current_key, amount)
+            return False
+        return True
+
+    def get_sliding_window(self, key, expiry):
+        return self._sliding_window(key, expiry, time.time())
+
+    def clear_sliding_window(self, key, expiry):
+        previous_key, current_key = self.sliding_window_keys(key, expiry, time.time())
+        self.clear(previous_key)
+        self.clear(current_key)
+
+
+limiter = Limiter(key_func=rate_limit_key)
@@ -0,0 +1,111 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+# Attributes every LogRecord has, anything else was passed through `extra=`
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+CACHE_LOGGER = "studytrack.cache"
+
+_listener = None
+_queue_handler = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, `extra=` fields included"""
+
+    def format(self, record):
+        data = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "module": record.module,
+            "message": record.getMessage(),
+        }
+        for name, value in vars(record).items():
+            if name not in _RECORD_ATTRIBUTES:
+                data[name] = value
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(data, default=str)
+
+
+class LazyQueueHandler(QueueHandler):
+    """QueueHandler that leaves the formatting to the listener thread.
+
+    The stock prepare() formats the message on the calling (request) thread;
+    records never leave the process here, so they can be queued as they are.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class SamplingFilter(logging.Filter):
+    """Let through a `rate` fraction of the records of a high-volume logger"""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno >= logging.WARNING or random.random() < self.rate
+
+
+def configure_logging(app):
+    """Route the root logger through a queue, handlers run on a listener thread.
+
+    Cache HIT/MISS lines ("studytrack.cache") are sampled with
+    LOG_CACHE_SAMPLE_RATE. The handlers are installed once per process, and
+    not at all under tests, where pytest captures the records itself.
+    """
+    global _queue_handler
+    cache_logger = logging.getLogger(CACHE_LOGGER)
+    cache_logger.filters = [SamplingFilter(app.config.get("LOG_CACHE_SAMPLE_RATE", 1.0))]
+    if _listener is not None or app.testing:
+        return
+
+    formatter = JsonFormatter()
+    handlers = [logging.StreamHandler()]
+    if app.debug:
+        handlers.append(logging.FileHandler("app.log"))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    _queue_handler = LazyQueueHandler(queue.SimpleQueue())
+    _start_listener(handlers)
+    atexit.register(_stop_listener)
+
+    root = logging.getLogger()
+    root.addHandler(_queue_handler)
+    root.setLevel(app.config.get("LOG_LEVEL", "INFO"))
+
+
+def _start_listener(handlers):
+    global _listener
+    log_queue = queue.SimpleQueue()
+    _queue_handler.queue = log_queue
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def _stop_listener():
+    """Flush and stop the listener (QueueListener.stop is not idempotent)"""
+    if _listener is not None and _listener._thread is not None:
+        _listener.stop()
+
+
+def _restart_listener_in_child():
+    """Threads do not survive fork (gunicorn preload_app): a forked worker
+    gets its own queue and listener thread, records queued by the parent
+    stay with the parent"""
+    if _listener is not None:
+        _start_listener(_listener.handlers)
+
+
+os.register_at_fork(after_in_child=_restart_listener_in_child)
@@ -0,0 +1,79 @@
+import os
+import time
+from flask import Response, g, has_request_context, request
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, REGISTRY, generate_latest
+from prometheus_client import multiprocess
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# With gunicorn, set PROMETHEUS_MULTIPROC_DIR to an empty directory shared by
+# the workers (see gunicorn.conf.py): every worker writes its samples there
+# and /metrics aggregates them, whichever worker serves it.
+
+REQUEST_LATENCY = Histogram(
+    "studytrack_request_duration_seconds", "Request latency", ["method", "endpoint"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+REQUESTS = Counter("studytrack_requests_total", "Requests by status", ["method", "endpoint", "status"])
+CACHE_EVENTS = Counter("studytrack_cache_events_total", "Cache hits, misses and invalidations", ["resource", "event"])
+DB_QUERIES = Histogram(
+    "studytrack_db_queries_per_request", "SQL statements per request", ["endpoint"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+DB_TIME = Histogram(
+    "studytrack_db_time_per_request_seconds", "Time spent in SQL per request", ["endpoint"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1),
+)
+
+
+def count_cache(resource, event_name):
+    """Count a cache `hit`, `miss` or `invalidation` for a resource"""
+    CACHE_EVENTS.labels(resource, event_name).inc()
+
+
+def _endpoint():
+    return request.url_rule.rule if request.url_rule is not None else "unmatched"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    if has_request_context() and "db_queries" in g:
+        g.db_queries += 1
+        g.db_time += elapsed
+
+
+def init_metrics(app):
+    """Time every request and count the SQL statements it runs"""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+    @app.before_request
+    def _start_timer():
+        g.request_start = time.perf_counter()
+        g.db_queries = 0
+        g.db_time = 0.0
+
+    @app.after_request
+    def _record_request(response):
+        if "request_start" not in g:
+            return response
+        endpoint = _endpoint()
+        REQUEST_LATENCY.labels(request.method, endpoint).observe(time.perf_counter() - g.request_start)
+        REQUESTS.labels(request.method, endpoint, str(response.status_code)).inc()
+        DB_QUERIES.labels(endpoint).observe(g.db_queries)
+        DB_TIME.labels(endpoint).observe(g.db_time)
+        return response
+
+
+def metrics_response():
+    """Prometheus exposition of this process, or of every worker in multiprocess mode"""
+    registry = REGISTRY
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
@@ -0,0 +1,101 @@
+import base64
+import json
+from datetime import datetime
+from flask import request
+import sqlalchemy as sa
+from app import db
+
+
+def encode_cursor(sort_value, id):
+    """Opaque cursor pointing right after the row (sort_value, id)"""
+    raw = json.dumps([sort_value.isoformat() if sort_value else None, id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor, raises ValueError on a malformed cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(sort_value), int(id)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def get_list_args(args=None):
+    """Read page, per_page, cursor and with_total from the query string.
+
+    `page` is clamped to 1 and up, `per_page` to 1..100. `cursor` is None in
+    offset mode, an empty cursor asks for the first page in cursor mode.
+    `args` defaults to the current request's arguments.
+    """
+    args = request.args if args is None else args
+    page = max(args.get('page', 1, type=int), 1)
+    per_page = max(min(args.get('per_page', 10, type=int), 100), 1)
+    cursor = args.get('cursor')
+    with_total = args.get('with_total', 'true').lower() != 'false'
+    return page, per_page, cursor, with_total
+
+
+def count_stmt(stmt):
+    return sa.select(sa.func.count()).select_from(stmt.order_by(None).subquery())
+
+
+def count_rows(stmt):
+    return db.session.scalar(count_stmt(stmt))
+
+
+def next_cursor_of(rows, per_page, sort_column, id_column):
+    """Cursor after the last row of a full page, None otherwise"""
+    if len(rows) < per_page or not rows:
+        return None
+    last = rows[-1]
+    return encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key))
+
+
+def page_count(total, per_page):
+    return -(-total // per_page)
+
+
+def offset_page_stmt(stmt, sort_column, id_column, page, per_page):
+    return stmt.order_by(sort_column, id_column).limit(per_page).offset((page - 1) * per_page)
+
+
+def keyset_page_stmt(stmt, sort_column, id_column, cursor, per_page):
+    """Rows after the cursor plus one, raises ValueError on a malformed cursor"""
+    if cursor:
+        sort_value, last_id = decode_cursor(cursor)
+        stmt = stmt.where(sa.tuple_(sort_column, id_column) > sa.tuple_(sort_value, last_id))
+    return stmt.order_by(sort_column, id_column).limit(per_page + 1)
+
+
+def split_keyset_page(rows, sort_column, id_column, per_page):
+    """(items, next_cursor) out of the per_page + 1 rows of keyset_page_stmt"""
+    items = rows[:per_page]
+    next_cursor = next_cursor_of(items, per_page, sort_column, id_column) if len(rows) > per_page else None
+    return items, next_cursor
+
+
+def paginate_offset(stmt, sort_column, id_column, page, per_page, with_total=True):
+    """OFFSET pagination of a select() ordered by (sort_column, id_column).
+
+    Returns (rows, total, pages), total and pages are None without with_total.
+    """
+    rows = db.session.execute(offset_page_stmt(stmt, sort_column, id_column, page, per_page)).all()
+    if not with_total:
+        return rows, None, None
+    total = count_rows(stmt)
+    return rows, total, page_count(total, per_page)
+
+
+def paginate_keyset(stmt, sort_column, id_column, cursor, per_page, with_total=True):
+    """Seek pagination of a select() on (sort_column, id_column).
+
+    Returns (rows, next_cursor, total). Fetches one extra row to know whether
+    there is a next page, and only runs COUNT(*) when with_total is set.
+    """
+    page_stmt = keyset_page_stmt(stmt, sort_column, id_column, cursor, per_page)
+    total = count_rows(stmt) if with_total else None
+    rows = db.session.execute(page_stmt).all()
+    items, next_cursor = split_keyset_page(rows, sort_column, id_column, per_page)
+    return items, next_cursor, total
@@ -0,0 +1,73 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from flask import current_app, has_app_context
+from werkzeug.security import check_password_hash, generate_password_hash
+
+# werkzeug's own default
+DEFAULT_HASH_METHOD = "scrypt:32768:8:1"
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def hash_method():
+    if has_app_context():
+        return current_app.config.get("PASSWORD_HASH_METHOD", DEFAULT_HASH_METHOD)
+    return DEFAULT_HASH_METHOD
+
+
+def hash_password(password):
+    return generate_password_hash(password, method=hash_method())
+
+
+@lru_cache(maxsize=8)
+def stored_method(method):
+    """The method as werkzeug writes it in the hash, defaults filled in.
+
+    "scrypt" is stored as "scrypt:32768:8:1", "pbkdf2:sha256" with its
+    iteration count; hashed once per method.
+    """
+    return generate_password_hash("", method=method).split("$", 1)[0]
+
+
+def needs_rehash(password_hash):
+    """True when the hash was made with other parameters than PASSWORD_HASH_METHOD"""
+    return password_hash.split("$", 1)[0] != stored_method(hash_method())
+
+
+def _get_pool(workers):
+    """Per-process pool, created on first use (pools do not survive fork)"""
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool_pid != os.getpid():
+            # spawn: forking a threaded worker could copy held locks
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def verify_password(password_hash, password):
+    """check_password_hash, in the hashing pool when PASSWORD_HASH_WORKERS is set.
+
+    The pool bounds the CPU spent on hashing: a login storm queues there
+    while the request threads wait without holding the GIL.
+    """
+    if not password_hash:
+        return False
+    workers = current_app.config.get("PASSWORD_HASH_WORKERS", 0) if has_app_context() else 0
+    if not workers:
+        return check_password_hash(password_hash, password)
+    future = _get_pool(workers).submit(check_password_hash, password_hash, password)
+    return future.result(timeout=current_app.config.get("PASSWORD_HASH_TIMEOUT", 10))
+
+
+def shutdown_pool():
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.shutdown(cancel_futures=True)
+        _pool = _pool_pid = None
@@ -0,0 +1,96 @@
+import os
+import threading
+import time
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+
+class PoolStats:
+    """Connection pool counters of this process, fed by pool events"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.connects = 0
+            self.checkouts = 0
+            self.checkins = 0
+            self.invalidations = 0
+            self.timeouts = 0
+            self.waits = 0
+            self.wait_seconds_total = 0.0
+            self.wait_seconds_max = 0.0
+            self.overflow_max = 0
+
+    def increment(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def record_wait(self, seconds, overflow):
+        with self._lock:
+            self.waits += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+            self.overflow_max = max(self.overflow_max, overflow)
+
+    def as_dict(self, pool):
+        data = {
+            "pid": os.getpid(),
+            "pool": type(pool).__name__,
+            "connects": self.connects,
+            "checkouts": self.checkouts,
+            "checkins": self.checkins,
+            "invalidations": self.invalidations,
+            "timeouts": self.timeouts,
+            "wait_ms_avg": self.wait_seconds_total / self.waits * 1000 if self.waits else 0.0,
+            "wait_ms_max": self.wait_seconds_max * 1000,
+            "overflow_max": self.overflow_max,
+        }
+        if isinstance(pool, QueuePool):
+            data.update({
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "max_overflow": pool._max_overflow,
+                "timeout": pool.timeout(),
+            })
+        return data
+
+
+pool_stats = PoolStats()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that times how long a checkout waits for a connection.
+
+    Pool events only fire once a connection was obtained, the wait itself
+    (and the TimeoutError when the pool is exhausted) is measured here.
+    """
+
+    # Log under sqlalchemy.pool like the stock pools (WARNING unless enabled)
+    _sqla_logger_namespace = "sqlalchemy.pool.impl.InstrumentedQueuePool"
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_stats.increment("timeouts")
+            raise
+        finally:
+            pool_stats.record_wait(time.perf_counter() - start, max(self.overflow(), 0))
+
+
+def _count(name):
+    def listener(*args):
+        pool_stats.increment(name)
+    return listener
+
+
+event.listen(InstrumentedQueuePool, "connect", _count("connects"))
+event.listen(InstrumentedQueuePool, "checkout", _count("checkouts"))
+event.listen(InstrumentedQueuePool, "checkin", _count("checkins"))
+event.listen(InstrumentedQueuePool, "invalidate", _count("invalidations"))
@@ -0,0 +1,123 @@
+import sqlalchemy as sa
+from app import db
+from app.models import StudySessions, SubjectProgress
+from app.utils.db_utils import upsert_insert
+
+progress_table = SubjectProgress.__table__
+
+
+def _earliest(column, value):
+    return sa.case((column.is_(None), value), (column > value, value), else_=column)
+
+
+def _latest(column, value):
+    return sa.case((column.is_(None), value), (column < value, value), else_=column)
+
+
+def _upsert_progress(rows):
+    """Add pre-aggregated rows (one per subject) to the subjects' aggregates"""
+    stmt = upsert_insert(progress_table).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[progress_table.c.subject_id],
+        set_={
+            "total_minutes": progress_table.c.total_minutes + stmt.excluded.total_minutes,
+            "session_count": progress_table.c.session_count + stmt.excluded.session_count,
+            "first_session_at": _earliest(progress_table.c.first_session_at, stmt.excluded.first_session_at),
+            "last_session_at": _latest(progress_table.c.last_session_at, stmt.excluded.last_session_at),
+        },
+    )
+    db.session.execute(stmt)
+
+
+def add_session_to_progress(subject_id, minutes, start, end):
+    """Add one session to the subject's aggregates, in the caller's transaction"""
+    _upsert_progress([{
+        "subject_id": subject_id,
+        "total_minutes": minutes or 0,
+        "session_count": 1,
+        "first_session_at": start,
+        "last_session_at": end,
+    }])
+
+
+def add_sessions_to_progress(sessions):
+    """Add many sessions (dicts as inserted) with one upsert statement.
+
+    Sessions are folded per subject first, a single statement cannot update
+    the same row twice.
+    """
+    per_subject = {}
+    for session in sessions:
+        row = per_subject.get(session["subject_id"])
+        if row is None:
+            per_subject[session["subject_id"]] = {
+                "subject_id": session["subject_id"],
+                "total_minutes": session["duration_minutes"] or 0,
+                "session_count": 1,
+                "first_session_at": session["start_time"],
+                "last_session_at": session["end_time"],
+            }
+            continue
+        row["total_minutes"] += session["duration_minutes"] or 0
+        row["session_count"] += 1
+        row["first_session_at"] = min(row["first_session_at"], session["start_time"])
+        row["last_session_at"] = max(row["last_session_at"], session["end_time"])
+    if per_subject:
+        _upsert_progress(list(per_subject.values()))
+
+
+def remove_session_from_progress(subject_id, minutes, start, end):
+    """Subtract one session from the subject's aggregates.
+
+    Totals are updated in place. The first/last times are only recomputed,
+    with one indexed query, when the removed session was one of them.
+    """
+    minutes = minutes or 0
+    progress = db.session.execute(
+        sa.update(progress_table)
+        .where(progress_table.c.subject_id == subject_id)
+        .values(
+            total_minutes=progress_table.c.total_minutes - minutes,
+            session_count=progress_table.c.session_count - 1,
+        )
+        .returning(progress_table.c.first_session_at, progress_table.c.last_session_at)
+    ).first()
+    if progress is None:
+        return
+    if progress.first_session_at == start or progress.last_session_at == end:
+        first, last = db.session.execute(
+            sa.select(sa.func.min(StudySessions.start_time), sa.func.max(StudySessions.end_time))
+            .where(StudySessions.subject_id == subject_id)
+        ).one()
+        db.session.execute(
+            sa.update(progress_table)
+            .where(progress_table.c.subject_id == subject_id)
+            .values(first_session_at=first, last_session_at=last)
+        )
+
+
+def rebuild_progress(subject_id=None):
+    """Recompute the aggregates from study_sessions in bulk (repair tool)"""
+    delete = sa.delete(progress_table)
+    source = (
+        sa.select(
+            StudySessions.subject_id,
+            sa.func.coalesce(sa.func.sum(StudySessions.duration_minutes), 0),
+            sa.func.count(),
+            sa.func.min(StudySessions.start_time),
+            sa.func.max(StudySessions.end_time),
+        )
+        .group_by(StudySessions.subject_id)
+    )
+    if subject_id is not None:
+        delete = delete.where(progress_table.c.subject_id == subject_id)
+        source = source.where(StudySessions.subject_id == subject_id)
+    db.session.execute(delete)
+    result = db.session.execute(
+        sa.insert(progress_table).from_select(
+            ["subject_id", "total_minutes", "session_count", "first_session_at", "last_session_at"],
+            source,
+        )
+    )
+    db.session.commit()
+    return result.rowcount
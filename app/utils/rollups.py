@@ -0,0 +1,118 @@
+from datetime import timezone
+import sqlalchemy as sa
+from app import db
+from app.models import StudySessions, StudyDailyRollup, Subject, User
+from app.utils.db_utils import upsert_insert
+from app.utils.timezones import get_zone
+
+rollup_table = StudyDailyRollup.__table__
+REBUILD_BATCH = 1000
+
+
+def local_day(start, zone):
+    """Day a session starting at a naive UTC time falls on in the given zone"""
+    return start.replace(tzinfo=timezone.utc).astimezone(zone).date()
+
+
+def _upsert_rollup(rows):
+    """Add pre-aggregated rows (one per subject and day) to the day buckets"""
+    stmt = upsert_insert(rollup_table).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[rollup_table.c.subject_id, rollup_table.c.day],
+        set_={
+            "minutes": rollup_table.c.minutes + stmt.excluded.minutes,
+            "session_count": rollup_table.c.session_count + stmt.excluded.session_count,
+        },
+    )
+    db.session.execute(stmt)
+
+
+def add_session_to_rollup(user_id, subject_id, minutes, start, zone):
+    """Add one session to its day bucket, in the caller's transaction.
+
+    A session counts for the day it starts on in the user's timezone.
+    """
+    _upsert_rollup([{
+        "subject_id": subject_id,
+        "day": local_day(start, zone),
+        "user_id": user_id,
+        "minutes": minutes or 0,
+        "session_count": 1,
+    }])
+
+
+def add_sessions_to_rollup(user_id, sessions, zone):
+    """Add many sessions (dicts as inserted) with one upsert statement"""
+    buckets = {}
+    for session in sessions:
+        key = (session["subject_id"], local_day(session["start_time"], zone))
+        row = buckets.setdefault(key, {
+            "subject_id": key[0],
+            "day": key[1],
+            "user_id": user_id,
+            "minutes": 0,
+            "session_count": 0,
+        })
+        row["minutes"] += session["duration_minutes"] or 0
+        row["session_count"] += 1
+    if buckets:
+        _upsert_rollup(list(buckets.values()))
+
+
+def remove_session_from_rollup(subject_id, minutes, start, zone):
+    """Subtract one session from its day bucket, dropping the bucket once empty"""
+    bucket = (rollup_table.c.subject_id == subject_id) & (rollup_table.c.day == local_day(start, zone))
+    db.session.execute(
+        sa.update(rollup_table)
+        .where(bucket)
+        .values(
+            minutes=rollup_table.c.minutes - (minutes or 0),
+            session_count=rollup_table.c.session_count - 1,
+        )
+    )
+    db.session.execute(sa.delete(rollup_table).where(bucket, rollup_table.c.session_count <= 0))
+
+
+def rebuild_rollups(user_id=None):
+    """Recompute the day buckets from study_sessions (backfill tool).
+
+    The databases have no common way to shift times to a timezone, so the
+    sessions are streamed and bucketed here by each user's local day.
+    """
+    delete = sa.delete(rollup_table)
+    source = (
+        sa.select(
+            StudySessions.subject_id,
+            Subject.user_id,
+            User.timezone,
+            StudySessions.start_time,
+            StudySessions.duration_minutes,
+        )
+        .join(Subject, StudySessions.subject_id == Subject.id)
+        .join(User, Subject.user_id == User.id)
+    )
+    if user_id is not None:
+        delete = delete.where(rollup_table.c.user_id == user_id)
+        source = source.where(Subject.user_id == user_id)
+
+    buckets = {}
+    for subject_id, owner_id, zone_name, start, minutes in db.session.execute(
+        source.execution_options(yield_per=REBUILD_BATCH)
+    ):
+        key = (subject_id, local_day(start, get_zone(zone_name)))
+        row = buckets.setdefault(key, {
+            "subject_id": subject_id,
+            "day": key[1],
+            "user_id": owner_id,
+            "minutes": 0,
+            "session_count": 0,
+        })
+        row["minutes"] += minutes or 0
+        row["session_count"] += 1
+
+    db.session.execute(delete)
+    rows = list(buckets.values())
+    for offset in range(0, len(rows), REBUILD_BATCH):
+        db.session.execute(sa.insert(rollup_table), rows[offset:offset + REBUILD_BATCH])
+    db.session.commit()
+    return len(rows)
@@ -0,0 +1,67 @@
+import sqlalchemy as sa
+from app.models import Subject, StudySessions
+
+
+def _iso(value):
+    return value.isoformat()
+
+def _enum_value(value):
+    return value.value
+
+
+class RowSerializer:
+    """Serializer compiled once per resource from (name, column, converter) specs.
+
+    `select()` builds a statement that loads only those columns, and calling
+    the serializer turns one of its rows into the response dict without
+    hydrating ORM instances.
+    """
+
+    __slots__ = ("names", "columns", "joins", "_conversions")
+
+    def __init__(self, fields, joins=()):
+        self.names = tuple(field[0] for field in fields)
+        self.columns = tuple(field[1] for field in fields)
+        self.joins = joins
+        self._conversions = tuple(
+            (field[0], index, field[2])
+            for index, field in enumerate(fields)
+            if len(field) > 2
+        )
+
+    def select(self):
+        stmt = sa.select(*self.columns)
+        for target, onclause in self.joins:
+            stmt = stmt.join(target, onclause)
+        return stmt
+
+    def __call__(self, row):
+        data = dict(zip(self.names, row))
+        for name, index, convert in self._conversions:
+            value = row[index]
+            if value is not None:
+                data[name] = convert(value)
+        return data
+
+
+subject_serializer = RowSerializer((
+    ("id", Subject.id),
+    ("name", Subject.name),
+    ("description", Subject.description),
+    ("total_hours_goal", Subject.total_hours_goal),
+    ("total_hours_completed", Subject.total_hours_completed),
+    ("priority_level", Subject.priority_level, _enum_value),
+    ("status", Subject.status, _enum_value),
+    ("created_at", Subject.created_at, _iso),
+    ("updated_at", Subject.updated_at, _iso),
+))
+
+session_serializer = RowSerializer((
+    ("session_id", StudySessions.id),
+    ("subject_id", StudySessions.subject_id),
+    ("subject_name", Subject.name),
+    ("start_time", StudySessions.start_time, _iso),
+    ("end_time", StudySessions.end_time, _iso),
+    ("duration_minutes", StudySessions.duration_minutes),
+    ("notes", StudySessions.notes),
+), joins=((Subject, StudySessions.subject_id == Subject.id),))
@@ -0,0 +1,136 @@
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_NUMBERS = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = r"(?:\?|%s|%\(\w+\)s|\$(?:\d+|\?)|:\w+)"
+_IN_LISTS = re.compile(rf"\bIN\s*\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})*\s*\)", re.IGNORECASE)
+_SPACES = re.compile(r"\s+")
+
+
+def normalize(statement):
+    """Statement with literals and IN lists collapsed, to group identical queries"""
+    statement = _SPACES.sub(" ", statement.strip())
+    statement = _STRINGS.sub("?", statement)
+    statement = _NUMBERS.sub("?", statement)
+    return _IN_LISTS.sub("IN (...)", statement)
+
+
+class QueryProfile:
+    """Statements run while profiling, with their durations"""
+
+    def __init__(self):
+        self.queries = []
+
+    def record(self, statement, seconds):
+        self.queries.append((normalize(statement), seconds))
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def total_time(self):
+        return sum(seconds for _, seconds in self.queries)
+
+    @property
+    def statements(self):
+        return [statement for statement, _ in self.queries]
+
+    def repeated(self, threshold):
+        """Statements run at least `threshold` times: likely N+1 queries"""
+        return [(statement, count) for statement, count in Counter(self.statements).most_common() if count >= threshold]
+
+    def as_dict(self, threshold):
+        totals = {}
+        for statement, seconds in self.queries:
+            entry = totals.setdefault(statement, {"statement": statement, "count": 0, "total_ms": 0.0})
+            entry["count"] += 1
+            entry["total_ms"] += seconds * 1000
+        return {
+            "count": self.count,
+            "total_ms": round(self.total_time * 1000, 3),
+            "statements": list(totals.values()),
+            "n_plus_one": [{"statement": statement, "count": count} for statement, count in self.repeated(threshold)],
+        }
+
+    def server_timing(self, threshold):
+        timings = [f'db;dur={self.total_time * 1000:.2f};desc="{self.count} queries"']
+        for statement, count in self.repeated(threshold):
+            summary = statement[:60].replace('"', "'")
+            timings.append(f'n-plus-one;desc="{count}x {summary}"')
+        return ", ".join(timings)
+
+    def report(self):
+        return "\n".join(f"{index}: {statement}" for index, statement in enumerate(self.statements, 1))
+
+
+@contextmanager
+def capture_queries(engine):
+    """Profile every statement run on `engine` inside the block"""
+    profile = QueryProfile()
+
+    def before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("capture_start", []).append(time.perf_counter())
+
+    def after(conn, cursor, statement, parameters, context, executemany):
+        profile.record(statement, time.perf_counter() - conn.info["capture_start"].pop())
+
+    event.listen(engine, "before_cursor_execute", before)
+    event.listen(engine, "after_cursor_execute", after)
+    try:
+        yield profile
+    finally:
+        event.remove(engine, "before_cursor_execute", before)
+        event.remove(engine, "after_cursor_execute", after)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("profiler_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["profiler_start"].pop()
+    if has_request_context() and g.get("sql_profile") is not None:
+        g.sql_profile.record(statement, elapsed)
+
+
+def init_sql_profiler(app):
+    """Opt-in per-request SQL profiling.
+
+    Enabled for every request with SQL_PROFILER_ENABLED, or per request with
+    the SQL_PROFILER_HEADER header outside production.
+    """
+    enabled = app.config.get("SQL_PROFILER_ENABLED", False)
+    by_header = app.config.get("ENV") != "production"
+    if not enabled and not by_header:
+        return
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    header = app.config.get("SQL_PROFILER_HEADER", "X-SQL-Profile")
+    threshold = app.config.get("SQL_PROFILER_N_PLUS_ONE", 3)
+
+    @app.before_request
+    def _start_profile():
+        if enabled or (by_header and request.headers.get(header)):
+            g.sql_profile = QueryProfile()
+
+    @app.after_request
+    def _report_profile(response):
+        profile = g.get("sql_profile")
+        if profile is None:
+            return response
+        response.headers.add("Server-Timing", profile.server_timing(threshold))
+        data = profile.as_dict(threshold)
+        logging.info("SQL profile %s %s: %s", request.method, request.path, json.dumps(data))
+        if data["n_plus_one"]:
+            logging.warning("Possible N+1 queries in %s %s: %s", request.method, request.path, json.dumps(data['n_plus_one']))
+        return response
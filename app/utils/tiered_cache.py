@@ -0,0 +1,357 @@
+import os
+import pickle
+import threading
+import time
+import logging
+from collections import OrderedDict
+from flask import current_app
+
+
+class LocalLRUCache:
+    """Per-process LRU cache bounded by total bytes and by a TTL"""
+
+    def __init__(self, max_bytes, ttl):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.current_bytes = 0
+        # Bumped on every eviction caused by an invalidation, lets readers
+        # detect that the value they fetched from L2 may already be stale
+        self.epoch = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return (found, value) for a key, dropping it if it has expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            expires_at, size, value = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def set(self, key, value, timeout=None, epoch=None):
+        """Store a value unless an invalidation happened since `epoch`"""
+        size = _size_of(value)
+        if size > self.max_bytes:
+            return False
+        ttl = self.ttl if not timeout else min(self.ttl, timeout)
+        with self._lock:
+            if epoch is not None and epoch != self.epoch:
+                return False
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, size, value)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+        return True
+
+    def invalidate(self, key):
+        with self._lock:
+            self.epoch += 1
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self.epoch += 1
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self.current_bytes -= size
+
+
+def _size_of(value):
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, int):
+        return 8
+    return len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+
+
+class InMemoryBus:
+    """Invalidation bus for a single process (development and tests)"""
+
+    def __init__(self):
+        self._subscribers = []
+
+    def publish(self, key):
+        for callback in list(self._subscribers):
+            callback(key)
+
+    def on_gap(self, callback):
+        """Nothing can be missed in-process"""
+
+    def publish_many(self, keys):
+        for key in keys:
+            self.publish(key)
+
+    def subscribe(self, callback):
+        self._subscribers.append(callback)
+
+    def start(self):
+        pass
+
+
+class RedisBus:
+    """Invalidation bus shared by every worker through a Redis pub/sub channel"""
+
+    def __init__(self, client, channel):
+        self.client = client
+        self.channel = channel
+        self._subscribers = []
+        self._gap_callbacks = []
+        self._thread = None
+        self._pid = None
+
+    def publish(self, key):
+        self.client.publish(self.channel, key)
+
+    def on_gap(self, callback):
+        """Call `callback()` when messages may have been missed (lost connection)"""
+        self._gap_callbacks.append(callback)
+
+    def publish_many(self, keys):
+        """One round trip for all the keys"""
+        pipe = self.client.pipeline(transaction=False)
+        for key in keys:
+            pipe.publish(self.channel, key)
+        pipe.execute()
+
+    def subscribe(self, callback):
+        self._subscribers.append(callback)
+
+    def start(self):
+        """Start the listener thread once per process (threads do not survive fork),
+        and again if it ever died"""
+        if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            return
+        self._pid = os.getpid()
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{self.channel: self._on_message})
+        self._thread = pubsub.run_in_thread(sleep_time=1, daemon=True, exception_handler=self._on_error)
+
+    def _on_error(self, error, pubsub, thread):
+        """Keep listening: the next get_message reconnects and resubscribes.
+
+        Invalidations published meanwhile are lost, so the subscribers are
+        told to drop what they hold.
+        """
+        logging.error("Cache invalidation listener lost its connection: %s", error)
+        for callback in self._gap_callbacks:
+            callback()
+        time.sleep(1)
+
+    def _on_message(self, message):
+        key = message["data"]
+        if isinstance(key, bytes):
+            key = key.decode()
+        for callback in self._subscribers:
+            callback(key)
+
+
+class CacheStats:
+    def __init__(self):
+        self.l1_hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def as_dict(self, l1):
+        lookups = self.l1_hits + self.l2_hits + self.misses
+        l2_lookups = self.l2_hits + self.misses
+        return {
+            "pid": os.getpid(),
+            "l1_hits": self.l1_hits,
+            "l2_hits": self.l2_hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "l1_hit_ratio": self.l1_hits / lookups if lookups else 0.0,
+            "l2_hit_ratio": self.l2_hits / l2_lookups if l2_lookups else 0.0,
+            "l1_entries": len(l1) if l1 else 0,
+            "l1_bytes": l1.current_bytes if l1 else 0,
+            "l1_max_bytes": l1.max_bytes if l1 else 0,
+        }
+
+
+class _TierState:
+    def __init__(self, l1, bus):
+        self.l1 = l1
+        self.bus = bus
+        self.stats = CacheStats()
+
+
+class TieredCache:
+    """In-process LRU (L1) in front of a Flask-Caching backend (L2).
+
+    Writes and deletes go through to L2 and are broadcast on the invalidation
+    bus so every worker drops its L1 copy of the key.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def init_app(self, app):
+        self.backend.init_app(app)
+        l1 = None
+        if app.config.get("CACHE_L1_ENABLED", True):
+            l1 = LocalLRUCache(
+                app.config.get("CACHE_L1_MAX_BYTES", 8 * 1024 * 1024),
+                app.config.get("CACHE_L1_TTL", 30),
+            )
+        state = _TierState(l1, _make_bus(app))
+        if l1 is not None:
+            state.bus.subscribe(l1.invalidate)
+            state.bus.on_gap(l1.clear)
+        app.extensions["tiered_cache"] = state
+
+    @property
+    def _state(self):
+        return current_app.extensions["tiered_cache"]
+
+    @property
+    def cache(self):
+        """The L2 backend (cachelib) of the current app"""
+        return self.backend.cache
+
+    def get(self, key):
+        state = self._state
+        if state.l1 is None:
+            return self._get_l2(state, key)
+        state.bus.start()
+        found, value = state.l1.get(key)
+        if found:
+            state.stats.l1_hits += 1
+            return value
+        epoch = state.l1.epoch
+        value = self._get_l2(state, key)
+        if value is not None:
+            state.l1.set(key, value, epoch=epoch)
+        return value
+
+    def set(self, key, value, timeout=None):
+        state = self._state
+        result = self.backend.set(key, value, timeout=timeout)
+        self._invalidate(state, key)
+        if state.l1 is not None:
+            state.l1.set(key, value, timeout=timeout)
+        return result
+
+    def get_many(self, *keys):
+        """Values of the keys in order (None when missing), L2 misses in one MGET"""
+        state = self._state
+        if state.l1 is None:
+            return self._get_many_l2(state, keys)
+        state.bus.start()
+        values = [None] * len(keys)
+        missing = []
+        for index, key in enumerate(keys):
+            found, value = state.l1.get(key)
+            if found:
+                state.stats.l1_hits += 1
+                values[index] = value
+            else:
+                missing.append(index)
+        if missing:
+            epoch = state.l1.epoch
+            l2_values = self._get_many_l2(state, [keys[index] for index in missing])
+            for index, value in zip(missing, l2_values):
+                values[index] = value
+                if value is not None:
+                    state.l1.set(keys[index], value, epoch=epoch)
+        return values
+
+    def set_many(self, mapping, timeout=None):
+        """Write many keys to L2 in one pipeline, then invalidate them everywhere"""
+        state = self._state
+        result = self.backend.set_many(mapping, timeout=timeout)
+        state.stats.invalidations += len(mapping)
+        if state.l1 is not None:
+            for key, value in mapping.items():
+                state.l1.invalidate(key)
+                state.l1.set(key, value, timeout=timeout)
+            try:
+                state.bus.publish_many(list(mapping))
+            except Exception as e:
+                logging.error("Could not publish cache invalidation for %s keys: %s", len(mapping), e)
+        return result
+
+    def add(self, key, value, timeout=None):
+        return self.backend.add(key, value, timeout=timeout)
+
+    def delete(self, key):
+        result = self.backend.delete(key)
+        self._invalidate(self._state, key)
+        return result
+
+    def delete_many(self, *keys):
+        result = self.backend.delete_many(*keys)
+        state = self._state
+        for key in keys:
+            self._invalidate(state, key)
+        return result
+
+    def inc(self, key, delta=1):
+        """Atomic increment on L2, then drop the stale counter everywhere"""
+        value = self.backend.cache.inc(key, delta)
+        self._invalidate(self._state, key)
+        return value
+
+    def clear(self):
+        state = self._state
+        if state.l1 is not None:
+            state.l1.clear()
+        return self.backend.clear()
+
+    def stats(self):
+        state = self._state
+        return state.stats.as_dict(state.l1)
+
+    def _get_l2(self, state, key):
+        value = self.backend.get(key)
+        if value is None:
+            state.stats.misses += 1
+        else:
+            state.stats.l2_hits += 1
+        return value
+
+    def _get_many_l2(self, state, keys):
+        values = self.backend.get_many(*keys) if keys else []
+        hits = sum(value is not None for value in values)
+        state.stats.l2_hits += hits
+        state.stats.misses += len(values) - hits
+        return values
+
+    def _invalidate(self, state, key):
+        state.stats.invalidations += 1
+        if state.l1 is None:
+            return
+        state.l1.invalidate(key)
+        try:
+            state.bus.publish(key)
+        except Exception as e:
+            logging.error("Could not publish cache invalidation for '%s': %s", key, e)
+
+
+def _make_bus(app):
+    if app.config.get("CACHE_TYPE") != "RedisCache":
+        return InMemoryBus()
+
+    import redis
+    client = redis.Redis(
+        host=app.config["CACHE_REDIS_HOST"],
+        port=app.config["CACHE_REDIS_PORT"],
+        db=app.config["CACHE_REDIS_DB"],
+        password=app.config["CACHE_REDIS_PASSWORD"],
+    )
+    return RedisBus(client, app.config.get("CACHE_INVALIDATION_CHANNEL", "studytrack:cache:invalidate"))
@@ -0,0 +1,41 @@
+from datetime import timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from flask import has_request_context
+from flask_jwt_extended import get_current_user
+
+DEFAULT_TIMEZONE = "UTC"
+
+
+@lru_cache(maxsize=1024)
+def get_zone(name):
+    """ZoneInfo of an IANA name, raises ValueError for unknown names"""
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError) as e:
+        raise ValueError(f"Unknown timezone: {name}") from e
+
+
+def is_valid_timezone(name):
+    try:
+        get_zone(name)
+    except ValueError:
+        return False
+    return True
+
+
+def current_zone():
+    """Zone of the user of the current request, UTC outside of protected requests"""
+    if has_request_context():
+        try:
+            user = get_current_user()
+        except RuntimeError:
+            user = None
+        if user is not None:
+            return get_zone(user.timezone)
+    return get_zone(DEFAULT_TIMEZONE)
+
+
+def to_utc(value):
+    """Naive UTC datetime of an aware one, as stored in the DateTime columns"""
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
@@ -0,0 +1,47 @@
+import os
+import shutil
+
+# Prometheus multiprocess mode: every worker writes its samples to this
+# directory and /metrics aggregates them. It must be set before the app
+# (and prometheus_client) is imported, and be emptied between runs.
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/studytrack-prometheus")
+
+# Import the app once in the master, workers fork with it already loaded.
+# Safe because create_app opens no database connection in production
+# (AUTO_CREATE_TABLES=False), post_fork drops any that would be inherited.
+preload_app = os.environ.get("GUNICORN_PRELOAD_APP", "True") == "True"
+
+
+def on_starting(server):
+    path = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def post_fork(server, worker):
+    """With preload_app the app is built in the master: drop any connection
+    it inherited so each worker opens its own pool"""
+    if not server.cfg.preload_app:
+        return
+    from app import db
+    from app.utils.pool_metrics import pool_stats
+    flask_app = server.app.wsgi()
+    with flask_app.app_context():
+        db.engine.dispose(close=False)
+    pool_stats.reset()
+
+
+def worker_exit(server, worker):
+    """Push the rate limit hits a batched storage has not synced yet"""
+    from app.utils.limiters import limiter
+    flush = getattr(limiter.storage, "flush", None)
+    if flush:
+        try:
+            flush()
+        except Exception:
+            pass
@@ -0,0 +1,94 @@
+"""database timestamp defaults
+
+subject.created_at/updated_at and study_sessions.start_time used a Python
+default evaluated once at import, so every row a worker inserted got that
+worker's boot time. The columns now default to the database's UTC clock.
+
+Backfill: the real creation times of boot-stamped subjects are lost, but
+their insertion order is not (ids are sequential). Subjects sharing a
+created_at value get that value plus their rank by id in microseconds, so
+ordering and cursors on (created_at, id) follow creation again; an
+updated_at still equal to the old stamp follows it. Sessions always had an
+explicit start_time, nothing to backfill there.
+
+Revision ID: 055be97327cc
+Revises: 7b67b21ece07
+Create Date: 2026-10-18 09:20:41.104466
+
+"""
+from datetime import timedelta
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '055be97327cc'
+down_revision = '7b67b21ece07'
+branch_labels = None
+depends_on = None
+
+UTC_NOW = {
+    "sqlite": "(STRFTIME('%Y-%m-%d %H:%M:%f', 'now') || '000')",
+    "postgresql": "TIMEZONE('utc', CLOCK_TIMESTAMP())",
+}
+
+subject = sa.table(
+    'subject',
+    sa.column('id', sa.Integer),
+    sa.column('created_at', sa.DateTime),
+    sa.column('updated_at', sa.DateTime),
+)
+
+
+def _utc_now():
+    return sa.text(UTC_NOW.get(op.get_bind().dialect.name, "CURRENT_TIMESTAMP"))
+
+
+def _backfill_subjects():
+    bind = op.get_bind()
+    stamps = sa.select(subject.c.created_at).group_by(subject.c.created_at).having(sa.func.count() > 1)
+    rows = bind.execute(
+        sa.select(subject.c.id, subject.c.created_at, subject.c.updated_at)
+        .where(subject.c.created_at.in_(stamps))
+        .order_by(subject.c.created_at, subject.c.id)
+    ).all()
+    updates = []
+    rank = 0
+    previous = None
+    for id, created_at, updated_at in rows:
+        rank = rank + 1 if created_at == previous else 0
+        previous = created_at
+        if rank:
+            new_created_at = created_at + timedelta(microseconds=rank)
+            updates.append({
+                "row_id": id,
+                "created_at": new_created_at,
+                "updated_at": new_created_at if updated_at == created_at else updated_at,
+            })
+    if updates:
+        bind.execute(
+            sa.update(subject)
+            .where(subject.c.id == sa.bindparam("row_id"))
+            .values(created_at=sa.bindparam("created_at"), updated_at=sa.bindparam("updated_at")),
+            updates,
+        )
+
+
+def upgrade():
+    with op.batch_alter_table('subject', schema=None) as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), server_default=_utc_now())
+        batch_op.alter_column('updated_at', existing_type=sa.DateTime(), server_default=_utc_now())
+
+    with op.batch_alter_table('study_sessions', schema=None) as batch_op:
+        batch_op.alter_column('start_time', existing_type=sa.DateTime(), server_default=_utc_now())
+
+    _backfill_subjects()
+
+
+def downgrade():
+    with op.batch_alter_table('study_sessions', schema=None) as batch_op:
+        batch_op.alter_column('start_time', existing_type=sa.DateTime(), server_default=None)
+
+    with op.batch_alter_table('subject', schema=None) as batch_op:
+        batch_op.alter_column('updated_at', existing_type=sa.DateTime(), server_default=None)
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), server_default=None)
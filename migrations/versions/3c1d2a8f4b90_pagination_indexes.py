@@ -0,0 +1,35 @@
+"""pagination indexes
+
+Composite indexes backing the (created_at, id) and (start_time, id)
+ordering of the subject and session lists.
+
+Revision ID: 3c1d2a8f4b90
+Revises: 7a9603fedc32
+Create Date: 2026-10-18 10:02:11.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c1d2a8f4b90'
+down_revision = '7a9603fedc32'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('subject', schema=None) as batch_op:
+        batch_op.create_index('idx_subject_user_created', ['user_id', 'created_at', 'id'], unique=False)
+
+    with op.batch_alter_table('study_sessions', schema=None) as batch_op:
+        batch_op.create_index('idx_session_subject_start', ['subject_id', 'start_time', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('study_sessions', schema=None) as batch_op:
+        batch_op.drop_index('idx_session_subject_start')
+
+    with op.batch_alter_table('subject', schema=None) as batch_op:
+        batch_op.drop_index('idx_subject_user_created')
@@ -0,0 +1,51 @@
+"""progress and rollup tables
+
+Per subject aggregates and per day study rollups. Fill them for existing
+sessions with `flask rebuild-progress` and `flask rebuild-stats`.
+
+Revision ID: 5e2b7c9d1a47
+Revises: 3c1d2a8f4b90
+Create Date: 2026-10-18 10:04:37.902561
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e2b7c9d1a47'
+down_revision = '3c1d2a8f4b90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('subject_progress',
+    sa.Column('subject_id', sa.Integer(), nullable=False),
+    sa.Column('total_minutes', sa.Integer(), nullable=False),
+    sa.Column('session_count', sa.Integer(), nullable=False),
+    sa.Column('first_session_at', sa.DateTime(), nullable=True),
+    sa.Column('last_session_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['subject_id'], ['subject.id'], ),
+    sa.PrimaryKeyConstraint('subject_id')
+    )
+    op.create_table('study_daily_rollup',
+    sa.Column('subject_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('minutes', sa.Integer(), nullable=False),
+    sa.Column('session_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['subject_id'], ['subject.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('subject_id', 'day')
+    )
+    with op.batch_alter_table('study_daily_rollup', schema=None) as batch_op:
+        batch_op.create_index('idx_rollup_user_day', ['user_id', 'day'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('study_daily_rollup', schema=None) as batch_op:
+        batch_op.drop_index('idx_rollup_user_day')
+
+    op.drop_table('study_daily_rollup')
+    op.drop_table('subject_progress')
@@ -0,0 +1,29 @@
+"""user timezone
+
+Existing users get UTC. Session times stored before this revision were in
+the server's local time; shift them to UTC by hand if that was not UTC.
+
+Revision ID: 7b67b21ece07
+Revises: 5e2b7c9d1a47
+Create Date: 2026-10-18 09:14:44.004740
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b67b21ece07'
+down_revision = '5e2b7c9d1a47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('timezone', sa.String(length=64), server_default='UTC', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('timezone')
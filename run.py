@@ -1,12 +1,9 @@
 import os
-from app import create_app, db
+from app import create_app
 
 env = os.environ.get("FLASK_ENV", "development")
 
 app = create_app(env)
 
-with app.app_context():
-    db.create_all()
-
 if __name__ == "__main__":
     app.run(debug=(env == "development"))
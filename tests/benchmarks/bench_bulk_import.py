@@ -0,0 +1,98 @@
+"""Importing sessions: one POST /sessions per item vs. POST /sessions/bulk.
+
+Imports SESSIONS sessions (10k by default) spread over 10 subjects into a
+throwaway SQLite database, once as a JSON array and once as NDJSON, and
+compares the throughput with individual POSTs on a sample.
+
+Run with: PYTHONPATH=. python tests/benchmarks/bench_bulk_import.py [SESSIONS]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+SESSIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+SUBJECTS = 10
+SINGLE_SAMPLE = 500
+
+db_file = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+os.environ["TEST_DATABASE_URL"] = f"sqlite:///{db_file.name}"
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+from app import create_app, db  # noqa: E402
+from app.utils.limiters import limiter  # noqa: E402
+from app.models import User, Subject, StudySessions, SubjectProgress, StudyDailyRollup  # noqa: E402
+
+
+def seed():
+    user = User(username="bench1", email="bench@example.com")
+    user.set_password("bench12345")
+    db.session.add(user)
+    db.session.flush()
+    db.session.execute(db.insert(Subject), [
+        {"name": f"Subject {i}", "description": "", "priority_level": "HIGH",
+         "status": "ACTIVE", "user_id": user.id}
+        for i in range(SUBJECTS)
+    ])
+    db.session.commit()
+    return user.id, db.session.scalars(db.select(Subject.id)).all()
+
+
+def payload(subject_ids, count):
+    start = datetime(2023, 1, 1, 8)
+    return [
+        {"subject_id": subject_ids[i % SUBJECTS],
+         "start_time": (start + timedelta(hours=i)).isoformat(),
+         "end_time": (start + timedelta(hours=i, minutes=45)).isoformat(),
+         "notes": f"Imported session {i}"}
+        for i in range(count)
+    ]
+
+
+def reset():
+    for model in (StudySessions, SubjectProgress, StudyDailyRollup):
+        db.session.execute(db.delete(model))
+    db.session.commit()
+
+
+def report(label, count, seconds):
+    print(f"{label:<26}{count:>8}{seconds:>10.2f}{count / seconds:>12.0f}")
+
+
+def main():
+    app = create_app("testing")
+    limiter.enabled = False
+    with app.app_context():
+        db.create_all()
+        user_id, subject_ids = seed()
+        headers = {"Authorization": f"Bearer {create_access_token(identity=str(user_id))}"}
+        client = app.test_client()
+        items = payload(subject_ids, SESSIONS)
+
+        print(f"{'path':<26}{'sessions':>8}{'s':>10}{'sessions/s':>12}")
+        start = time.perf_counter()
+        for item in items[:SINGLE_SAMPLE]:
+            assert client.post("/sessions", headers=headers, json=item).status_code == 201
+        report("POST /sessions (each)", SINGLE_SAMPLE, time.perf_counter() - start)
+        reset()
+
+        start = time.perf_counter()
+        res = client.post("/sessions/bulk", headers=headers, json=items)
+        report("bulk, JSON array", SESSIONS, time.perf_counter() - start)
+        assert res.get_json()["inserted"] == SESSIONS, res.get_json()
+        reset()
+
+        body = "\n".join(json.dumps(item) for item in items)
+        start = time.perf_counter()
+        res = client.post("/sessions/bulk", data=body,
+                          headers={**headers, "Content-Type": "application/x-ndjson"})
+        report("bulk, NDJSON", SESSIONS, time.perf_counter() - start)
+        assert res.get_json()["inserted"] == SESSIONS, res.get_json()
+
+    os.unlink(db_file.name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Redis operations issued per write: legacy delete loop vs. generation counter.
+
+Run with: PYTHONPATH=. python tests/benchmarks/bench_cache_invalidation.py
+"""
+import os
+import tempfile
+import time
+
+db_file = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+os.environ["TEST_DATABASE_URL"] = f"sqlite:///{db_file.name}"
+
+from flask_jwt_extended import create_access_token, verify_jwt_in_request  # noqa: E402
+from app import create_app, cache, db  # noqa: E402
+from app.models import User  # noqa: E402
+from app.utils.cache_utils import invalidate_user_subjects_cache  # noqa: E402
+
+WRITES = 1000
+
+
+class CountingBackend:
+    """Proxy that counts every call made to the cache backend"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.ops = 0
+
+    def __getattr__(self, name):
+        attr = getattr(self.backend, name)
+        if not callable(attr):
+            return attr
+
+        def counted(*args, **kwargs):
+            self.ops += 1
+            return attr(*args, **kwargs)
+        return counted
+
+
+def legacy_invalidate(backend, user_id):
+    for page in range(1, 11):
+        for per_page in [10, 20, 50]:
+            backend.delete(f"user:{user_id}:subjects:page:{page}:per_page:{per_page}")
+
+
+def main():
+    app = create_app("testing")
+    with app.app_context():
+        # Tokens only resolve for existing users
+        db.create_all()
+        user = User(username="bench1", email="bench@example.com")
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+        token = create_access_token(identity=str(user_id))
+
+    with app.test_request_context(headers={"Authorization": f"Bearer {token}"}):
+        verify_jwt_in_request()
+        counting = CountingBackend(cache.cache)
+        app.extensions["cache"][cache.backend] = counting
+
+        start = time.perf_counter()
+        for _ in range(WRITES):
+            legacy_invalidate(counting, user_id)
+        legacy_time = time.perf_counter() - start
+        legacy_ops = counting.ops
+
+        counting.ops = 0
+        start = time.perf_counter()
+        for _ in range(WRITES):
+            invalidate_user_subjects_cache()
+        generation_time = time.perf_counter() - start
+        generation_ops = counting.ops
+
+    print(f"{'strategy':<12}{'ops/write':>10}{'us/write':>10}")
+    print(f"{'legacy':<12}{legacy_ops / WRITES:>10.1f}{legacy_time / WRITES * 1e6:>10.1f}")
+    print(f"{'generation':<12}{generation_ops / WRITES:>10.1f}{generation_time / WRITES * 1e6:>10.1f}")
+    os.unlink(db_file.name)
+
+
+if __name__ == "__main__":
+    main()
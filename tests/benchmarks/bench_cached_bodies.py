@@ -0,0 +1,86 @@
+"""Cache hits: pickled dicts re-encoded by Flask vs. pre-encoded JSON bytes.
+
+Reports the bytes stored per key and p50/p99 hit latency for a page of
+subjects. The L1 tier is disabled so every hit goes through the L2
+serializer, as it would with Redis.
+
+Run with: PYTHONPATH=. python tests/benchmarks/bench_cached_bodies.py
+"""
+import os
+import pickle
+import tempfile
+import time
+
+RUNS = 2000
+
+db_file = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+os.environ["TEST_DATABASE_URL"] = f"sqlite:///{db_file.name}"
+os.environ["CACHE_L1_ENABLED"] = "False"
+
+from flask_jwt_extended import create_access_token, jwt_required, verify_jwt_in_request  # noqa: E402
+from app import create_app, db, cache  # noqa: E402
+from app.utils.limiters import limiter  # noqa: E402
+from app.models import User, Subject  # noqa: E402
+from app.utils.cache_utils import encode_body, cache_key_user_subjects  # noqa: E402
+from app.utils.serializers import subject_serializer  # noqa: E402
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return samples[len(samples) // 2], samples[int(len(samples) * 0.99)]
+
+
+def timed(client, url, headers):
+    samples = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        client.get(url, headers=headers)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return percentiles(samples)
+
+
+def main():
+    app = create_app("testing")
+    limiter.enabled = False
+
+    @app.route("/legacy-hit/<int:per_page>")
+    @jwt_required()
+    def legacy_hit(per_page):
+        return cache.get(cache_key_user_subjects(1, per_page, None, True) + ":legacy"), 200
+
+    with app.app_context():
+        db.create_all()
+        user = User(username="bench1", email="bench@example.com")
+        db.session.add(user)
+        db.session.flush()
+        db.session.execute(db.insert(Subject), [
+            {"name": f"Subject {i}", "description": "An introductory course " * 4, "total_hours_goal": 10,
+             "total_hours_completed": 0, "priority_level": "HIGH", "status": "ACTIVE", "user_id": user.id}
+            for i in range(100)
+        ])
+        db.session.commit()
+        headers = {"Authorization": f"Bearer {create_access_token(identity=str(user.id))}"}
+        client = app.test_client()
+
+        print(f"{'per_page':<10}{'format':<14}{'bytes/key':>10}{'p50 us':>9}{'p99 us':>9}")
+        for per_page in (10, 100):
+            rows = db.session.execute(subject_serializer.select().limit(per_page)).all()
+            result = {"subjects": [subject_serializer(row) for row in rows], "total": 100, "page": 1, "pages": 1}
+            with app.test_request_context(headers=headers):
+                verify_jwt_in_request()
+                cache.set(cache_key_user_subjects(1, per_page, None, True) + ":legacy", result)
+            p50, p99 = timed(client, f"/legacy-hit/{per_page}", headers)
+            print(f"{per_page:<10}{'pickled dict':<14}{len(pickle.dumps(result)):>10}{p50:>9.0f}{p99:>9.0f}")
+
+            url = f"/subjects?per_page={per_page}"
+            client.get(url, headers=headers)
+            body = encode_body(result)
+            for name, accept in (("json bytes", "identity"), ("brotli bytes", "br")):
+                p50, p99 = timed(client, url, {**headers, "Accept-Encoding": accept})
+                print(f"{per_page:<10}{name:<14}{len(pickle.dumps(body)):>10}{p50:>9.0f}{p99:>9.0f}")
+
+    os.unlink(db_file.name)
+
+
+if __name__ == "__main__":
+    main()
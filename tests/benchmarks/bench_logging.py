@@ -0,0 +1,112 @@
+"""Request throughput with logging on: synchronous handlers vs the log queue.
+
+"sync handlers" is the old debug setup, a text FileHandler plus a
+StreamHandler called on the request thread with every cache HIT line
+written. The queue rows are configure_logging(): JSON lines formatted and
+written by the listener thread, once with every cache line and once
+sampled at the production LOG_CACHE_SAMPLE_RATE. All serve cached
+GET /subjects from a throwaway SQLite file, the log files go to a temp dir
+and the console stream to /dev/null. The setups take turns for ROUNDS
+rounds so drift hits all of them; the median and the spread are printed.
+
+On one CPU the listener thread formats on the same core as the requests,
+so the queue alone does not pay off there (1 CPU, two runs of 5 rounds:
+sync 1287/1315, queue with every line 1221/1238, queue sampled 1365/1378
+median req/s, min to max within 4% in each row); the gain comes from the
+sampling, the queue keeps slow stderr/disk writes off the request threads
+when there are cores to spare.
+
+Run with: PYTHONPATH=. python tests/benchmarks/bench_logging.py
+"""
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+REQUESTS = 3000
+ROUNDS = 5
+
+tmp_dir = tempfile.mkdtemp()
+os.environ["TEST_DATABASE_URL"] = f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}"
+os.chdir(tmp_dir)
+sys.stderr = open(os.devnull, "w")
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+from app import create_app, db  # noqa: E402
+from app.utils.limiters import limiter  # noqa: E402
+from app.config import Config  # noqa: E402
+from app.utils.logging_setup import CACHE_LOGGER, SamplingFilter, configure_logging  # noqa: E402
+from app.utils import logging_setup  # noqa: E402
+from app.models import User, Subject  # noqa: E402
+
+
+def sync_logging():
+    logging.basicConfig(
+        level=logging.DEBUG,
+        format='%(asctime)s %(levelname)s in %(module)s: %(message)s',
+        handlers=[logging.FileHandler("sync.log"), logging.StreamHandler()],
+        force=True,
+    )
+    logging.getLogger(CACHE_LOGGER).filters = []
+
+
+def queued_logging(app, sample_rate):
+    app.config.update(TESTING=False, DEBUG=True, LOG_LEVEL="DEBUG", LOG_CACHE_SAMPLE_RATE=sample_rate)
+    if logging_setup._queue_handler is None:
+        logging.getLogger().handlers = []
+        configure_logging(app)
+    else:
+        # The listener is set up once per process, only swap the handlers back
+        logging.getLogger().handlers = [logging_setup._queue_handler]
+        logging.getLogger(CACHE_LOGGER).filters = [SamplingFilter(sample_rate)]
+
+
+def requests_per_second(client, headers):
+    client.get("/subjects", headers=headers)
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        client.get("/subjects", headers=headers)
+    return REQUESTS / (time.perf_counter() - start)
+
+
+def main():
+    app = create_app("testing")
+    limiter.enabled = False
+    with app.app_context():
+        db.create_all()
+        user = User(username="bench1", email="bench@example.com")
+        user.set_password("bench12345")
+        db.session.add(user)
+        db.session.flush()
+        for n in range(20):
+            db.session.add(Subject(name=f"Subject {n}", description="", priority_level="HIGH",
+                                   status="ACTIVE", user_id=user.id))
+        db.session.commit()
+        headers = {"Authorization": f"Bearer {create_access_token(identity=str(user.id))}"}
+        client = app.test_client()
+
+        setups = {
+            "sync handlers": sync_logging,
+            "queue, every cache line": lambda: queued_logging(app, 1.0),
+            "queue + sampled cache lines": lambda: queued_logging(app, Config.LOG_CACHE_SAMPLE_RATE),
+        }
+        results = {name: [] for name in setups}
+        for _ in range(ROUNDS):
+            for name, setup in setups.items():
+                setup()
+                results[name].append(requests_per_second(client, headers))
+
+    print(f"cached GET /subjects, {REQUESTS} requests x {ROUNDS} rounds, {os.cpu_count()} CPU(s), req/s",
+          file=sys.__stdout__)
+    print(f"{'':<30}{'median':>8}{'min':>8}{'max':>8}", file=sys.__stdout__)
+    baseline = statistics.median(results["sync handlers"])
+    for name, values in results.items():
+        median = statistics.median(values)
+        print(f"{name:<30}{median:>8.0f}{min(values):>8.0f}{max(values):>8.0f}  {median / baseline:.2f}x",
+              file=sys.__stdout__)
+
+
+if __name__ == "__main__":
+    main()
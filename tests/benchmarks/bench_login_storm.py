@@ -0,0 +1,104 @@
+"""Login throughput, and latency of other requests during a login storm.
+
+Starts gunicorn (gthread) on a throwaway SQLite file, then runs LOGIN_THREADS
+threads posting /auth/login while one probe thread requests a cached
+GET /subjects. Compares inline hashing with PASSWORD_HASH_WORKERS=1 (the
+pool leaves the other cores to the workers; size it to the cores that can
+go to hashing).
+
+Run with: PYTHONPATH=. python tests/benchmarks/bench_login_storm.py
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import requests
+
+PORT = 8799
+URL = f"http://127.0.0.1:{PORT}"
+HEADERS = {"Host": "localhost"}
+DURATION = 15  # seconds per mode
+LOGIN_THREADS = 8
+CREDENTIALS = {"username": "bench1", "password": "bench12345"}
+
+
+def start_server(database_url, hash_workers):
+    env = dict(
+        os.environ,
+        FLASK_ENV="development",
+        DEBUG="False",
+        DEV_DATABASE_URL=database_url,
+        RATELIMIT_ENABLED="False",
+        METRICS_ENABLED="False",
+        LOG_LEVEL="WARNING",
+        PASSWORD_HASH_WORKERS=str(hash_workers),
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-k", "gthread", "-w", "2", "--threads", "8",
+         "-b", f"127.0.0.1:{PORT}", "app:create_app()"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    for _ in range(100):
+        try:
+            requests.get(f"{URL}/subjects", headers=HEADERS, timeout=1)
+            return server
+        except requests.ConnectionError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("gunicorn did not start")
+
+
+def run(database_url, hash_workers):
+    server = start_server(database_url, hash_workers)
+    try:
+        requests.post(f"{URL}/auth/register", headers=HEADERS, json={
+            **CREDENTIALS, "email": "bench@example.com", "confirm_password": CREDENTIALS["password"],
+        })
+        token = requests.post(f"{URL}/auth/login", headers=HEADERS, json=CREDENTIALS).json()["access_token"]
+        probe_headers = {**HEADERS, "Authorization": f"Bearer {token}"}
+        requests.get(f"{URL}/subjects", headers=probe_headers)
+
+        stop = time.perf_counter() + DURATION
+        logins = []
+        probes = []
+
+        def login_storm():
+            with requests.Session() as session:
+                while time.perf_counter() < stop:
+                    if session.post(f"{URL}/auth/login", headers=HEADERS, json=CREDENTIALS).ok:
+                        logins.append(1)
+
+        def probe():
+            with requests.Session() as session:
+                while time.perf_counter() < stop:
+                    start = time.perf_counter()
+                    session.get(f"{URL}/subjects", headers=probe_headers)
+                    probes.append((time.perf_counter() - start) * 1000)
+                    time.sleep(0.01)
+
+        threads = [threading.Thread(target=login_storm) for _ in range(LOGIN_THREADS)]
+        threads.append(threading.Thread(target=probe))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        server.terminate()
+        server.wait()
+    return len(logins) / DURATION, statistics.median(probes), statistics.quantiles(probes, n=100)[98]
+
+
+def main():
+    print(f"{LOGIN_THREADS} login threads for {DURATION}s, {os.cpu_count()} CPU(s)")
+    print(f"{'hashing':<16}{'logins/s':>10}{'GET p50 ms':>12}{'GET p99 ms':>12}")
+    for label, hash_workers in [("inline", 0), ("process pool", 1)]:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            logins, p50, p99 = run(f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}", hash_workers)
+        print(f"{label:<16}{logins:>10.1f}{p50:>12.1f}{p99:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Per-request cost of the Prometheus instrumentation (METRICS_ENABLED).
+
+Times cached GET /subjects hits and uncached GET /subjects/{id} misses on
+two apps that only differ by METRICS_ENABLED, in a throwaway SQLite file.
+
+Run with: PYTHONPATH=. python tests/benchmarks/bench_metrics_overhead.py
+"""
+import os
+import statistics
+import tempfile
+import time
+
+RUNS = 2000
+
+db_file = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+os.environ["TEST_DATABASE_URL"] = f"sqlite:///{db_file.name}"
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+from app import create_app, db, cache  # noqa: E402
+from app.config import TestConfig  # noqa: E402
+from app.utils.limiters import limiter  # noqa: E402
+from app.models import User, Subject  # noqa: E402
+
+
+def median_us(fn, before=None):
+    samples = []
+    for _ in range(RUNS):
+        if before:
+            before()
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1_000_000)
+    return statistics.median(samples)
+
+
+def measure(metrics_enabled):
+    TestConfig.METRICS_ENABLED = metrics_enabled
+    app = create_app("testing")
+    limiter.enabled = False
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        user = User(username="bench1", email="bench@example.com")
+        user.set_password("bench12345")
+        db.session.add(user)
+        db.session.flush()
+        subject = Subject(name="Math", description="", priority_level="HIGH", status="ACTIVE", user_id=user.id)
+        db.session.add(subject)
+        db.session.commit()
+        headers = {"Authorization": f"Bearer {create_access_token(identity=str(user.id))}"}
+        client = app.test_client()
+        client.get("/subjects", headers=headers)
+        hit = median_us(lambda: client.get("/subjects", headers=headers))
+        miss = median_us(lambda: client.get(f"/subjects/{subject.id}", headers=headers), before=cache.clear)
+    return hit, miss
+
+
+def main():
+    off = measure(False)
+    on = measure(True)
+    print(f"median of {RUNS} requests, µs")
+    print(f"{'path':<24}{'metrics off':>12}{'metrics on':>12}{'overhead':>10}")
+    for label, a, b in [("cached GET /subjects", off[0], on[0]), ("miss GET /subjects/id", off[1], on[1])]:
+        print(f"{label:<24}{a:>12.0f}{b:>12.0f}{b - a:>10.0f}")
+    os.unlink(db_file.name)
+
+
+if __name__ == "__main__":
+    main()
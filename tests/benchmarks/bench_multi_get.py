@@ -0,0 +1,78 @@
+"""50 sequential GET /subjects/{id} against one GET /subjects?ids= of the same 50.
+
+Warm: every item already cached. Cold: the cache is cleared before each
+round, so the sequential requests run 50 queries and the batch one IN query.
+Uses the testing config (SimpleCache, no L1 tier): with Redis each sequential
+request also pays its own cache round trip, the batch a single MGET.
+
+Run with: PYTHONPATH=. python tests/benchmarks/bench_multi_get.py
+"""
+import os
+import statistics
+import tempfile
+import time
+
+RUNS = 200
+BATCH = 50
+
+db_file = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+os.environ["TEST_DATABASE_URL"] = f"sqlite:///{db_file.name}"
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+from app import create_app, db, cache  # noqa: E402
+from app.utils.limiters import limiter  # noqa: E402
+from app.models import User, Subject  # noqa: E402
+
+
+def median_ms(fn, before=None):
+    samples = []
+    for _ in range(RUNS):
+        if before:
+            before()
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    app = create_app("testing")
+    limiter.enabled = False
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        user = User(username="bench1", email="bench@example.com")
+        user.set_password("bench12345")
+        db.session.add(user)
+        db.session.flush()
+        subjects = [Subject(name=f"Subject {i}", description="Course", priority_level="HIGH", status="ACTIVE",
+                            user_id=user.id) for i in range(BATCH)]
+        db.session.add_all(subjects)
+        db.session.commit()
+        ids = [subject.id for subject in subjects]
+        headers = {"Authorization": f"Bearer {create_access_token(identity=str(user.id))}"}
+        client = app.test_client()
+        batch_url = "/subjects?ids=" + ",".join(map(str, ids))
+
+        def sequential():
+            for id in ids:
+                client.get(f"/subjects/{id}", headers=headers)
+
+        def batch():
+            client.get(batch_url, headers=headers)
+
+        def clear():
+            cache.clear()
+            client.get("/auth/timezone", headers=headers)  # keep the identity cached
+
+        sequential()
+        batch()
+        print(f"{BATCH} subjects, median of {RUNS} rounds")
+        print(f"{'':<12}{'sequential ms':>15}{'batch ms':>10}")
+        print(f"{'warm':<12}{median_ms(sequential):>15.2f}{median_ms(batch):>10.2f}")
+        print(f"{'cold':<12}{median_ms(sequential, clear):>15.2f}{median_ms(batch, clear):>10.2f}")
+    os.unlink(db_file.name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Latency of GET /sessions page 500: OFFSET pagination vs. cursor pagination.
+
+Seeds 100k sessions for a single user in a throwaway SQLite database and
+times cache misses only.
+
+Run with: PYTHONPATH=. python tests/benchmarks/bench_pagination.py
+"""
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+SESSIONS = 100_000
+PER_PAGE = 10
+PAGE = 500
+RUNS = 20
+
+db_file = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+os.environ["TEST_DATABASE_URL"] = f"sqlite:///{db_file.name}"
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+from app import create_app, db, cache  # noqa: E402
+from app.utils.limiters import limiter  # noqa: E402
+from app.models import User, Subject, StudySessions  # noqa: E402
+from app.utils.pagination import encode_cursor  # noqa: E402
+
+
+def seed():
+    user = User(username="bench1", email="bench@example.com")
+    user.set_password("bench12345")
+    db.session.add(user)
+    db.session.flush()
+    subject = Subject(name="Bench", description="", priority_level="HIGH", status="ACTIVE", user_id=user.id)
+    db.session.add(subject)
+    db.session.flush()
+    start = datetime(2020, 1, 1)
+    rows = [
+        {
+            "subject_id": subject.id,
+            "start_time": start + timedelta(minutes=30 * i),
+            "end_time": start + timedelta(minutes=30 * i + 25),
+            "duration_minutes": 25,
+            "notes": "",
+        }
+        for i in range(SESSIONS)
+    ]
+    db.session.execute(db.insert(StudySessions), rows)
+    db.session.commit()
+    return user.id
+
+
+def timed(client, url, headers):
+    samples = []
+    for _ in range(RUNS):
+        cache.clear()
+        start = time.perf_counter()
+        res = client.get(url, headers=headers)
+        samples.append((time.perf_counter() - start) * 1000)
+        assert res.status_code == 200, res.get_json()
+    return statistics.median(samples)
+
+
+def main():
+    app = create_app("testing")
+    limiter.enabled = False
+    with app.app_context():
+        db.create_all()
+        user_id = seed()
+        headers = {"Authorization": f"Bearer {create_access_token(identity=str(user_id))}"}
+        after = db.session.execute(
+            db.select(StudySessions.start_time, StudySessions.id)
+            .order_by(StudySessions.start_time, StudySessions.id)
+            .offset((PAGE - 1) * PER_PAGE - 1)
+            .limit(1)
+        ).one()
+        cursor = encode_cursor(after.start_time, after.id)
+
+        client = app.test_client()
+        modes = {
+            "offset": f"/sessions?page={PAGE}&per_page={PER_PAGE}",
+            "offset, no total": f"/sessions?page={PAGE}&per_page={PER_PAGE}&with_total=false",
+            "cursor": f"/sessions?per_page={PER_PAGE}&cursor={cursor}",
+            "cursor, no total": f"/sessions?per_page={PER_PAGE}&cursor={cursor}&with_total=false",
+        }
+        print(f"{SESSIONS} sessions, page {PAGE}, per_page {PER_PAGE} (median of {RUNS} misses)")
+        for name, url in modes.items():
+            print(f"{name:<18}{timed(client, url, headers):>8.2f} ms")
+
+    os.unlink(db_file.name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""load() throughput of the request schemas, plain and HTML-bearing payloads.
+
+Each run loads a fresh copy of the payload (pre_load hooks edit it in place)
+with one schema instance, as the routes do.
+
+Run with: PYTHONPATH=. python tests/benchmarks/bench_schemas.py
+"""
+import time
+from app.schemas.study_sessions_schema import EditStudySessionsSchema, StudySessionsSchema
+from app.schemas.subject_schema import EditSubjectSchema, SubjectSchema
+from app.schemas.user_schema import LoginSchema, RegisterSchema
+
+RUNS = 20_000
+
+SUBJECT = {
+    "name": "Mathematics",
+    "description": "Advanced calculus and linear algebra",
+    "total_hours_goal": 100,
+    "total_hours_completed": 5,
+    "priority_level": "high",
+    "status": "active",
+}
+SESSION = {"subject_id": 1, "start_time": "03:00PM", "end_time": "16:30", "notes": "Derivatives, chapter 4"}
+SESSION_ISO = {"subject_id": 1, "start_time": "2026-01-05T15:00:00", "end_time": "2026-01-05T16:30:00", "notes": ""}
+REGISTER = {"username": "john123", "email": "john@example.com", "password": "secure1234", "confirm_password": "secure1234"}
+
+CASES = [
+    ("SubjectSchema", SubjectSchema(), SUBJECT),
+    ("SubjectSchema, html", SubjectSchema(), {**SUBJECT, "description": "<b>Advanced</b> calculus & algebra"}),
+    ("EditSubjectSchema", EditSubjectSchema(), SUBJECT),
+    ("StudySessionsSchema", StudySessionsSchema(), SESSION),
+    ("StudySessionsSchema, ISO", StudySessionsSchema(), SESSION_ISO),
+    ("StudySessionsSchema, html", StudySessionsSchema(), {**SESSION, "notes": "<i>Derivatives</i> & limits"}),
+    ("EditStudySessionsSchema", EditStudySessionsSchema(), SESSION),
+    ("RegisterSchema", RegisterSchema(), REGISTER),
+    ("LoginSchema", LoginSchema(), {"username": "john123", "password": "secure1234"}),
+]
+
+
+def loads_per_second(schema, payload):
+    start = time.perf_counter()
+    for _ in range(RUNS):
+        schema.load(dict(payload))
+    return RUNS / (time.perf_counter() - start)
+
+
+def main():
+    print(f"{RUNS} loads per schema")
+    print(f"{'schema':<30}{'loads/s':>10}")
+    for label, schema, payload in CASES:
+        print(f"{label:<30}{loads_per_second(schema, payload):>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Load + serialize 10k subjects: ORM hydration vs. column projection.
+
+Run with: PYTHONPATH=. python tests/benchmarks/bench_serialization.py
+"""
+import os
+import statistics
+import tempfile
+import time
+
+SUBJECTS = 10_000
+RUNS = 10
+
+db_file = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+os.environ["TEST_DATABASE_URL"] = f"sqlite:///{db_file.name}"
+
+from app import create_app, db  # noqa: E402
+from app.models import User, Subject  # noqa: E402
+from app.utils.serializers import subject_serializer  # noqa: E402
+
+
+def orm_path():
+    return [
+        {
+            "id": s.id,
+            "name": s.name,
+            "description": s.description,
+            "total_hours_goal": s.total_hours_goal,
+            "total_hours_completed": s.total_hours_completed,
+            "priority_level": s.priority_level.value,
+            "status": s.status.value,
+            "created_at": s.created_at.isoformat() if s.created_at else None,
+            "updated_at": s.updated_at.isoformat() if s.updated_at else None,
+        }
+        for s in Subject.query.all()
+    ]
+
+
+def projected_path():
+    return [subject_serializer(row) for row in db.session.execute(subject_serializer.select())]
+
+
+def measure(fn):
+    samples = []
+    for _ in range(RUNS):
+        db.session.expunge_all()
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    app = create_app("testing")
+    with app.app_context():
+        db.create_all()
+        user = User(username="bench1", email="bench@example.com")
+        db.session.add(user)
+        db.session.flush()
+        db.session.execute(db.insert(Subject), [
+            {"name": f"Subject {i}", "description": "Course", "total_hours_goal": 10,
+             "total_hours_completed": 0, "priority_level": "HIGH", "status": "ACTIVE", "user_id": user.id}
+            for i in range(SUBJECTS)
+        ])
+        db.session.commit()
+
+        assert orm_path() == projected_path()
+        print(f"{SUBJECTS} subjects (median of {RUNS} runs)")
+        print(f"{'orm':<12}{measure(orm_path):>8.1f} ms")
+        print(f"{'projected':<12}{measure(projected_path):>8.1f} ms")
+
+    os.unlink(db_file.name)
+
+
+if __name__ == "__main__":
+    main()
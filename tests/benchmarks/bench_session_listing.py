@@ -0,0 +1,113 @@
+"""GET /sessions miss path: legacy two-query listing vs. the single indexed join.
+
+Seeds a user with 500 subjects and 20 sessions each in a throwaway SQLite
+database. The legacy path is reproduced here as it was before the change.
+
+Run with: PYTHONPATH=. python tests/benchmarks/bench_session_listing.py
+"""
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+SUBJECTS = 500
+SESSIONS_PER_SUBJECT = 20
+PER_PAGE = 10
+RUNS = 50
+
+db_file = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+os.environ["TEST_DATABASE_URL"] = f"sqlite:///{db_file.name}"
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+from sqlalchemy.orm import joinedload  # noqa: E402
+from app import create_app, db, cache  # noqa: E402
+from app.utils.limiters import limiter  # noqa: E402
+from app.models import User, Subject, StudySessions  # noqa: E402
+
+
+def seed():
+    user = User(username="bench1", email="bench@example.com")
+    user.set_password("bench12345")
+    db.session.add(user)
+    db.session.flush()
+    db.session.execute(db.insert(Subject), [
+        {"name": f"Subject {i}", "description": "", "priority_level": "HIGH",
+         "status": "ACTIVE", "user_id": user.id}
+        for i in range(SUBJECTS)
+    ])
+    subject_ids = db.session.scalars(db.select(Subject.id)).all()
+    start = datetime(2020, 1, 1)
+    db.session.execute(db.insert(StudySessions), [
+        {"subject_id": subject_id, "start_time": start + timedelta(hours=i),
+         "end_time": start + timedelta(hours=i, minutes=50), "duration_minutes": 50, "notes": ""}
+        for subject_id in subject_ids
+        for i in range(SESSIONS_PER_SUBJECT)
+    ])
+    db.session.commit()
+    return user.id
+
+
+def legacy_listing(user_id):
+    user_subjects = Subject.query.filter_by(user_id=user_id).all()
+    subject_ids = [s.id for s in user_subjects]
+    sessions = (
+        db.session.query(StudySessions)
+        .options(joinedload(StudySessions.subject))
+        .filter(StudySessions.subject_id.in_(subject_ids))
+        .paginate(page=1, per_page=PER_PAGE, error_out=False)
+    )
+    return [
+        {
+            "session_id": ses.id,
+            "subject_id": ses.subject_id,
+            "subject_name": ses.subject.name,
+            "start_time": ses.start_time.isoformat() if ses.start_time else None,
+            "end_time": ses.end_time.isoformat() if ses.end_time else None,
+            "duration_minutes": ses.duration_minutes,
+            "notes": ses.notes
+        }
+        for ses in sessions.items
+    ]
+
+
+def measure(fn):
+    statements = []
+    def count(*args):
+        statements.append(args[2])
+    event.listen(db.engine, "before_cursor_execute", count)
+    samples = []
+    for _ in range(RUNS):
+        db.session.expunge_all()
+        cache.clear()
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    event.remove(db.engine, "before_cursor_execute", count)
+    return statistics.median(samples), len(statements) / RUNS
+
+
+def main():
+    app = create_app("testing")
+    limiter.enabled = False
+    with app.app_context():
+        db.create_all()
+        user_id = seed()
+        headers = {"Authorization": f"Bearer {create_access_token(identity=str(user_id))}"}
+        client = app.test_client()
+
+        print(f"{SUBJECTS} subjects x {SESSIONS_PER_SUBJECT} sessions, page 1 (median of {RUNS} misses)")
+        print(f"{'path':<28}{'ms':>8}{'queries':>9}")
+        legacy = measure(lambda: legacy_listing(user_id))
+        print(f"{'legacy (query only)':<28}{legacy[0]:>8.2f}{legacy[1]:>9.1f}")
+        joined = measure(lambda: client.get(f"/sessions?per_page={PER_PAGE}", headers=headers))
+        print(f"{'join (full request)':<28}{joined[0]:>8.2f}{joined[1]:>9.1f}")
+        joined = measure(lambda: client.get(f"/sessions?per_page={PER_PAGE}&with_total=false", headers=headers))
+        print(f"{'join, no total (full req.)':<28}{joined[0]:>8.2f}{joined[1]:>9.1f}")
+
+    os.unlink(db_file.name)
+
+
+if __name__ == "__main__":
+    main()
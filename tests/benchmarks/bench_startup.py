@@ -0,0 +1,63 @@
+"""Worker startup time: `import app`, create_app() and the first request.
+
+Every sample is a fresh interpreter (a cold worker) booting the production
+config against a throwaway SQLite file that already holds the schema, with
+AUTO_CREATE_TABLES on (the old boot path, create_all in every worker) and
+off (migrations). Also reports the connections opened before the first
+request, the ones a preforked worker would inherit.
+
+Run with: PYTHONPATH=. python tests/benchmarks/bench_startup.py
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+RUNS = 10
+
+CHILD = """
+import json, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+from app import create_app
+from app.utils.pool_metrics import pool_stats
+flask_app = create_app("production")
+created = time.perf_counter()
+connects = pool_stats.connects
+flask_app.test_client().get("/subjects")
+first_request = time.perf_counter()
+print(json.dumps({
+    "import": imported - start,
+    "create_app": created - imported,
+    "first_request": first_request - start,
+    "connects": connects,
+}))
+"""
+
+
+def sample(auto_create, database_url):
+    env = dict(os.environ, AUTO_CREATE_TABLES=str(auto_create), DATABASE_URL=database_url, METRICS_ENABLED="False")
+    output = subprocess.run([sys.executable, "-c", CHILD], env=env, capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main():
+    db_file = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    database_url = f"sqlite:///{db_file.name}"
+    sample(True, database_url)  # creates the schema
+
+    print(f"median of {RUNS} cold starts, ms")
+    print(f"{'boot path':<22}{'import':>10}{'create_app':>12}{'1st request':>13}{'boot conns':>12}")
+    for label, auto_create in [("create_all on boot", True), ("migrations", False)]:
+        runs = [sample(auto_create, database_url) for _ in range(RUNS)]
+        median = {name: statistics.median(run[name] for run in runs) for name in runs[0]}
+        print(f"{label:<22}{median['import'] * 1000:>10.0f}{median['create_app'] * 1000:>12.0f}"
+              f"{median['first_request'] * 1000:>13.0f}{median['connects']:>12.0f}")
+    os.unlink(db_file.name)
+
+
+if __name__ == "__main__":
+    main()
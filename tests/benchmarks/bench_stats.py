@@ -0,0 +1,90 @@
+"""GET /stats?range=365d served from the daily rollups, against a latency budget.
+
+Seeds a user with SESSIONS synthetic sessions (1M by default) spread over
+20 subjects and ~3 years in a throwaway SQLite database, backfills the
+rollups with rebuild_rollups() and times cache-missing requests.
+
+Run with: PYTHONPATH=. python tests/benchmarks/bench_stats.py [SESSIONS]
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+SESSIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+SUBJECTS = 20
+DAYS = 3 * 365
+BATCH = 50_000
+RUNS = 30
+BUDGET_MS = 50
+
+db_file = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+os.environ["TEST_DATABASE_URL"] = f"sqlite:///{db_file.name}"
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+from app import create_app, db, cache  # noqa: E402
+from app.utils.limiters import limiter  # noqa: E402
+from app.utils.rollups import rebuild_rollups  # noqa: E402
+from app.models import User, Subject, StudySessions  # noqa: E402
+
+
+def seed():
+    user = User(username="bench1", email="bench@example.com")
+    user.set_password("bench12345")
+    db.session.add(user)
+    db.session.flush()
+    db.session.execute(db.insert(Subject), [
+        {"name": f"Subject {i}", "description": "", "priority_level": "HIGH",
+         "status": "ACTIVE", "user_id": user.id}
+        for i in range(SUBJECTS)
+    ])
+    subject_ids = db.session.scalars(db.select(Subject.id)).all()
+    first_day = datetime.now(timezone.utc).replace(hour=8, minute=0, second=0, microsecond=0,
+                                                   tzinfo=None) - timedelta(days=DAYS - 1)
+    for offset in range(0, SESSIONS, BATCH):
+        db.session.execute(db.insert(StudySessions), [
+            {"subject_id": subject_ids[i % SUBJECTS],
+             "start_time": first_day + timedelta(days=i % DAYS, minutes=i % 600),
+             "end_time": first_day + timedelta(days=i % DAYS, minutes=i % 600 + 45),
+             "duration_minutes": 45, "notes": ""}
+            for i in range(offset, min(offset + BATCH, SESSIONS))
+        ])
+    db.session.commit()
+    return user.id
+
+
+def main():
+    app = create_app("testing")
+    limiter.enabled = False
+    with app.app_context():
+        db.create_all()
+        start = time.perf_counter()
+        user_id = seed()
+        print(f"seeded {SESSIONS} sessions in {time.perf_counter() - start:.1f}s")
+        start = time.perf_counter()
+        buckets = rebuild_rollups()
+        print(f"backfilled {buckets} daily rollups in {time.perf_counter() - start:.1f}s")
+
+        headers = {"Authorization": f"Bearer {create_access_token(identity=str(user_id))}"}
+        client = app.test_client()
+        samples = []
+        for _ in range(RUNS):
+            cache.clear()
+            start = time.perf_counter()
+            res = client.get("/stats?range=365d", headers=headers)
+            samples.append((time.perf_counter() - start) * 1000)
+            assert res.status_code == 200
+        body = res.get_json()
+        p50 = statistics.median(samples)
+        p95 = sorted(samples)[int(len(samples) * 0.95) - 1]
+        print(f"range=365d: {body['session_count']} sessions in {len(body['daily'])} days")
+        print(f"p50 {p50:.2f} ms, p95 {p95:.2f} ms (budget {BUDGET_MS} ms): "
+              f"{'PASS' if p95 <= BUDGET_MS else 'FAIL'}")
+
+    os.unlink(db_file.name)
+
+
+if __name__ == "__main__":
+    main()
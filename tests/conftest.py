@@ -1,8 +1,19 @@
 # conftest.py
+from contextlib import contextmanager
 import pytest
 from app import create_app, db
 from app.models import User
 from flask_jwt_extended import create_access_token
+from app.utils.sql_profiler import capture_queries
+
+SUBJECT = {
+    "name": "Math",
+    "description": "Course",
+    "total_hours_goal": 10,
+    "total_hours_completed": 0,
+    "priority_level": "HIGH",
+    "status": "ACTIVE",
+}
 
 @pytest.fixture
 def app():
@@ -48,3 +59,49 @@ def access_token(test_user, app):
 @pytest.fixture
 def auth_headers(access_token):
     return {"Authorization": f"Bearer {access_token}"}
+
+
+@pytest.fixture
+def subject_payload():
+    """A valid POST /subjects body, a fresh copy per test"""
+    return dict(SUBJECT)
+
+
+@pytest.fixture
+def create_subject(client, auth_headers, subject_payload):
+    """Create a subject through the API and return its id.
+
+        subject_id = create_subject("Physics", priority_level="LOW")
+    """
+    def create(name="Math", headers=None, **fields):
+        res = client.post("/subjects", headers=headers or auth_headers,
+                          json={**subject_payload, "name": name, **fields})
+        assert res.status_code == 201, res.get_json()
+        return res.get_json()["id"]
+    return create
+
+
+@pytest.fixture
+def create_session(client, auth_headers):
+    """Create a study session through the API and return its id"""
+    def create(subject_id, start_time="09:00", end_time="10:00", headers=None, **fields):
+        res = client.post("/sessions", headers=headers or auth_headers, json={
+            "subject_id": subject_id, "start_time": start_time, "end_time": end_time, **fields})
+        assert res.status_code == 201, res.get_json()
+        return res.get_json()["id"]
+    return create
+
+
+@pytest.fixture
+def max_queries(app):
+    """Fail when the block runs more SQL statements than allowed.
+
+        with max_queries(1) as profile:
+            client.get("/sessions", headers=auth_headers)
+    """
+    @contextmanager
+    def assert_max_queries(limit):
+        with capture_queries(db.engine) as profile:
+            yield profile
+        assert profile.count <= limit, f"{profile.count} queries, expected at most {limit}:\n{profile.report()}"
+    return assert_max_queries
@@ -0,0 +1,83 @@
+"""Requests/sec per worker: sync gunicorn vs. the ASGI mode, same locust scenario.
+
+Starts one worker of each mode in turn, runs tests/load/locustfile.py
+headless against it and prints the aggregated throughput and latencies.
+Uses the environment's database and cache (FLASK_ENV, DATABASE_URL,
+REDIS_HOST...), compare on PostgreSQL and Redis: SQLite serializes the
+writes of the scenario. Rate limiting is switched off for the run.
+
+Run with: python tests/load/compare_serving_modes.py --users 200 --run-time 60s
+"""
+import argparse
+import csv
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+LOCUSTFILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "locustfile.py")
+
+MODES = {
+    "sync (gunicorn)": ["gunicorn", "--workers", "1", "--bind", "127.0.0.1:{port}", "app:create_app()"],
+    "async (uvicorn)": ["uvicorn", "--factory", "app.asgi:create_asgi_app", "--workers", "1",
+                        "--host", "127.0.0.1", "--port", "{port}", "--log-level", "warning"],
+}
+
+
+def wait_until_up(url, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=1)
+            return
+        except urllib.error.HTTPError:
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not start")
+
+
+def run_locust(host, args, prefix):
+    subprocess.run([
+        "locust", "-f", LOCUSTFILE, "--headless", "--host", host,
+        "--users", str(args.users), "--spawn-rate", str(args.spawn_rate),
+        "--run-time", args.run_time, "--csv", prefix, "--only-summary",
+    ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)  # exits with 1 when any request failed
+    with open(f"{prefix}_stats.csv") as stats:
+        return next(row for row in csv.DictReader(stats) if row["Name"] == "Aggregated")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--spawn-rate", type=int, default=20)
+    parser.add_argument("--run-time", default="60s")
+    parser.add_argument("--port", type=int, default=5055)
+    args = parser.parse_args()
+
+    env = {**os.environ, "RATELIMIT_ENABLED": "False"}
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode, command in MODES.items():
+            server = subprocess.Popen(
+                [part.format(port=args.port) for part in command], env=env, stdout=subprocess.DEVNULL
+            )
+            try:
+                host = f"http://127.0.0.1:{args.port}"
+                wait_until_up(f"{host}/subjects")
+                results[mode] = run_locust(host, args, os.path.join(tmp, mode.split()[0]))
+            finally:
+                server.terminate()
+                server.wait()
+
+    print(f"{args.users} users, {args.run_time}, 1 worker per mode")
+    print(f"{'mode':<18}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'failures':>10}")
+    for mode, row in results.items():
+        print(f"{mode:<18}{float(row['Requests/s']):>10.1f}{row['50%']:>10}{row['95%']:>10}{row['Failure Count']:>10}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
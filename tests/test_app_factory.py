@@ -0,0 +1,42 @@
+import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from flask_migrate import upgrade
+from sqlalchemy import inspect
+from app import create_app, db
+from app.config import ProdConfig
+from app.utils.pool_metrics import pool_stats
+
+
+@pytest.fixture
+def prod_database(tmp_path, monkeypatch):
+    monkeypatch.setattr(ProdConfig, "SQLALCHEMY_DATABASE_URI", f"sqlite:///{tmp_path / 'prod.db'}")
+
+
+def test_production_boot_opens_no_connection(prod_database):
+    pool_stats.reset()
+    app = create_app("production")
+    assert pool_stats.connects == 0
+    with app.app_context():
+        assert inspect(db.engine).get_table_names() == []
+
+
+def test_auto_create_tables_creates_schema(prod_database, monkeypatch):
+    monkeypatch.setattr(ProdConfig, "AUTO_CREATE_TABLES", True)
+    app = create_app("production")
+    with app.app_context():
+        # Disposed after create_all, nothing is left for the workers to inherit
+        assert db.engine.pool.checkedin() == 0
+        assert "study_sessions" in inspect(db.engine).get_table_names()
+
+
+def test_migrations_upgrade_the_baseline_schema(prod_database):
+    app = create_app("production")
+    with app.app_context():
+        # The schema create_all built before migrations existed
+        upgrade(revision="7a9603fedc32")
+        assert "subject_progress" not in inspect(db.engine).get_table_names()
+        upgrade()
+        with db.engine.connect() as connection:
+            assert compare_metadata(MigrationContext.configure(connection), db.metadata) == []
+        assert "timezone" in {column["name"] for column in inspect(db.engine).get_columns("user")}
@@ -0,0 +1,156 @@
+import asyncio
+import json
+import pytest
+from app import cache, db
+from limits.aio.storage import MemoryStorage, RedisStorage
+from app.asgi import StudyTrackASGI
+from app.models import User
+from app.utils.identity import identity_key
+
+
+async def call(asgi, path, headers=None, query="", method="GET", body=b""):
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(b"host", b"localhost"), (b"content-length", str(len(body)).encode())] + [
+            (name.lower().encode(), value.encode()) for name, value in (headers or {}).items()
+        ],
+        "client": ("127.0.0.1", 5000),
+        "server": ("localhost", 80),
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await asgi(scope, receive, send)
+    start = messages[0]
+    response_headers = {name.decode(): value.decode() for name, value in start["headers"]}
+    return start["status"], response_headers, b"".join(m.get("body", b"") for m in messages[1:])
+
+
+def native_only(asgi):
+    """Make any request that reaches the WSGI fallback fail the test"""
+    async def fallback(scope, receive, send):
+        raise AssertionError(f"{scope['method']} {scope['path']} was not served natively")
+    asgi.wsgi = fallback
+
+
+def run(asgi, scenario):
+    async def main():
+        try:
+            await scenario()
+        finally:
+            await asgi.aclose()
+    asyncio.run(main())
+
+
+@pytest.fixture
+def asgi(app):
+    return StudyTrackASGI(app)
+
+
+def test_native_lists_match_the_wsgi_app(asgi, client, auth_headers, create_subject, create_session):
+    subject_id = create_subject()
+    create_session(subject_id)
+    native_only(asgi)
+
+    async def scenario():
+        for path in ["/subjects", "/sessions"]:
+            status, headers, body = await call(asgi, path, auth_headers, "per_page=5")
+            assert status == 200
+            # Same cache key, so the sync app answers from the entry written natively
+            res = client.get(f"{path}?per_page=5", headers=auth_headers)
+            assert json.loads(body) == res.get_json()
+            assert headers["etag"] == res.headers["ETag"]
+    run(asgi, scenario)
+
+
+def test_native_reads_follow_wsgi_writes(asgi, client, auth_headers, create_subject, subject_payload):
+    subject_id = create_subject()
+
+    async def scenario():
+        _, _, body = await call(asgi, "/subjects", auth_headers)
+        assert json.loads(body)["total"] == 1
+        _, headers, _ = await call(asgi, f"/subjects/{subject_id}", auth_headers)
+        etag = headers["etag"]
+        status, _, _ = await call(asgi, f"/subjects/{subject_id}", {**auth_headers, "If-None-Match": etag})
+        assert status == 304
+
+        # Writes still go through Flask, through the ASGI wrapper too
+        status, _, _ = await call(
+            asgi, f"/subjects/{subject_id}", {**auth_headers, "Content-Type": "application/json"}, method="PUT",
+            body=json.dumps({**subject_payload, "name": "Algebra", "priority_level": "LOW"}).encode())
+        assert status == 200
+        create_subject("Physics")
+
+        _, _, body = await call(asgi, "/subjects", auth_headers)
+        assert json.loads(body)["total"] == 2
+        status, _, body = await call(asgi, f"/subjects/{subject_id}", {**auth_headers, "If-None-Match": etag})
+        assert status == 200
+        assert json.loads(body)["name"] == "Algebra"
+    run(asgi, scenario)
+
+
+def test_native_errors(asgi, client, auth_headers):
+    native_only(asgi)
+
+    async def scenario():
+        status, _, body = await call(asgi, "/sessions/999", auth_headers)
+        assert (status, json.loads(body)) == (404, {"error": "Study session not found"})
+        status, _, _ = await call(asgi, "/sessions", auth_headers, "cursor=not-a-cursor")
+        assert status == 400
+    run(asgi, scenario)
+
+
+def test_tokens_of_deleted_users_are_rejected(asgi, client, auth_headers, test_user, create_subject):
+    create_subject()
+    client.get("/subjects", headers=auth_headers)  # cached list
+    db.session.delete(db.session.get(User, test_user))
+    db.session.commit()
+    cache.delete(identity_key(test_user))
+
+    async def scenario():
+        for path in ["/subjects", "/subjects/1"]:
+            status, _, _ = await call(asgi, path, auth_headers)
+            assert status == 401
+    run(asgi, scenario)
+
+
+def test_other_requests_use_the_wsgi_app(asgi, client, auth_headers, create_subject):
+    subject_id = create_subject()
+
+    async def scenario():
+        status, _, body = await call(asgi, "/subjects", auth_headers, f"ids={subject_id},999")
+        assert status == 200
+        assert json.loads(body)["missing"] == [999]
+        status, _, body = await call(asgi, "/subjects")
+        assert status == 401
+        status, _, _ = await call(asgi, "/sessions/export", auth_headers)
+        assert status == 200
+        status, headers, _ = await call(asgi, "/subjects", {**auth_headers, "Origin": "https://studytrack.com"})
+        assert status == 200
+        assert headers["access-control-allow-origin"] == "https://studytrack.com"
+    run(asgi, scenario)
+
+
+@pytest.mark.parametrize("uri,storage", [
+    ("batched+redis://localhost:6379/1", RedisStorage),
+    ("redis://localhost:6379/1", RedisStorage),
+    ("memory://", MemoryStorage),
+])
+def test_rate_limit_storage(app, uri, storage):
+    # The production default is batched+redis://, no connection is opened here
+    app.config["RATELIMIT_STORAGE_URI"] = uri
+    limiter = StudyTrackASGI(app).rate_limiter
+    assert isinstance(limiter.storage, storage)
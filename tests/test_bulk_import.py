@@ -0,0 +1,93 @@
+import json
+from app import cache
+
+
+def session(subject_id, hour, minutes=30):
+    return {
+        "subject_id": subject_id,
+        "start_time": f"2025-01-20T{hour:02d}:00:00",
+        "end_time": f"2025-01-20T{hour:02d}:{minutes:02d}:00",
+        "notes": "<b>imported</b>"}
+
+
+def test_bulk_import_json_array(app, client, auth_headers, create_subject):
+    app.config["BULK_IMPORT_CHUNK_SIZE"] = 3
+    subject_id = create_subject()
+    payload = [session(subject_id, hour) for hour in range(8)]
+
+    res = client.post("/sessions/bulk", headers=auth_headers, json=payload)
+    assert res.status_code == 201
+    assert res.get_json() == {"message": "Sessions imported", "inserted": 8, "failed": 0, "errors": []}
+
+    listing = client.get("/sessions?per_page=100", headers=auth_headers).get_json()
+    assert listing["total"] == 8
+    assert listing["sessions"][0]["notes"] == "imported"
+    progress = client.get(f"/subjects/{subject_id}/progress", headers=auth_headers).get_json()
+    assert progress["total_minutes"] == 240
+    assert progress["session_count"] == 8
+
+
+def test_bulk_import_reports_item_errors(client, auth_headers, create_subject):
+    subject_id = create_subject()
+    payload = [
+        session(subject_id, 9),
+        {**session(subject_id, 10), "end_time": "2025-01-20T09:00:00"},
+        session(999, 11),
+        "not an object",
+        {"subject_id": subject_id},
+        session(subject_id, 12),
+    ]
+
+    res = client.post("/sessions/bulk", headers=auth_headers, json=payload)
+    assert res.status_code == 207
+    data = res.get_json()
+    assert data["inserted"] == 2
+    assert [error["index"] for error in data["errors"]] == [1, 2, 3, 4]
+    assert "end_time" in data["errors"][0]["errors"]
+    assert data["errors"][1]["errors"] == {"subject_id": ["Subject not found or unauthorized"]}
+
+
+def test_overlong_notes_do_not_fail_their_chunk(app, client, auth_headers, create_subject):
+    app.config["BULK_IMPORT_CHUNK_SIZE"] = 500
+    subject_id = create_subject()
+    payload = [session(subject_id, hour) for hour in range(3)]
+    payload[1]["notes"] = "x" * 2049
+
+    res = client.post("/sessions/bulk", headers=auth_headers, json=payload)
+    assert res.status_code == 207
+    data = res.get_json()
+    assert data["inserted"] == 2
+    assert data["errors"] == [{"index": 1, "errors": {"notes": ["Notes must be at most 2048 characters long."]}}]
+
+
+def test_bulk_import_ndjson(client, auth_headers, create_subject):
+    subject_id = create_subject()
+    lines = [json.dumps(session(subject_id, hour)) for hour in range(3)]
+    body = "\n".join(lines[:2] + ["{broken", "", lines[2]]) + "\n"
+
+    res = client.post("/sessions/bulk", data=body, headers={**auth_headers, "Content-Type": "application/x-ndjson"})
+    assert res.status_code == 207
+    data = res.get_json()
+    assert data["inserted"] == 3
+    assert data["errors"] == [{"index": 2, "errors": {"_schema": ["Expected a JSON object"]}}]
+
+
+def test_bulk_import_invalidates_once(client, auth_headers, monkeypatch, create_subject):
+    subject_id = create_subject()
+    calls = []
+    original_inc = cache.cache.inc
+    monkeypatch.setattr(cache.cache, "inc", lambda *a, **k: calls.append(a) or original_inc(*a, **k))
+
+    res = client.post("/sessions/bulk", headers=auth_headers, json=[session(subject_id, h) for h in range(5)])
+    assert res.status_code == 201
+    assert len(calls) == 1
+
+
+def test_bulk_import_limits(app, client, auth_headers, create_subject):
+    app.config["BULK_IMPORT_MAX_ITEMS"] = 2
+    subject_id = create_subject()
+    res = client.post("/sessions/bulk", headers=auth_headers, json=[session(subject_id, h) for h in range(3)])
+    assert res.status_code == 413
+
+    res = client.post("/sessions/bulk", headers=auth_headers, json={"subject_id": subject_id})
+    assert res.status_code == 400
@@ -0,0 +1,177 @@
+import time
+import pytest
+from app import cache
+from app.utils.cache_utils import generation_key
+
+
+@pytest.mark.parametrize("page,per_page", [(1, 7), (15, 3), (2, 33), (40, 1)])
+def test_subject_write_invalidates_any_page_size(client, auth_headers, page, per_page, create_subject):
+    create_subject()
+    url = f"/subjects?page={page}&per_page={per_page}"
+
+    first = client.get(url, headers=auth_headers).get_json()
+    assert first["total"] == 1
+
+    create_subject("Physics")
+
+    second = client.get(url, headers=auth_headers).get_json()
+    assert second["total"] == 2
+
+
+def test_session_write_invalidates_any_page_size(client, auth_headers, create_subject, create_session):
+    subject_id = create_subject()
+    url = "/sessions?page=12&per_page=13"
+
+    assert client.get(url, headers=auth_headers).get_json()["total"] == 0
+
+    create_session(subject_id, "03:00PM", "04:00PM")
+
+    assert client.get(url, headers=auth_headers).get_json()["total"] == 1
+
+
+def test_invalidation_is_a_single_increment(client, auth_headers, monkeypatch, create_subject):
+    create_subject()
+    calls = []
+    monkeypatch.setattr(cache.cache, "delete", lambda *a, **k: calls.append(("delete", a)))
+    original_inc = cache.cache.inc
+    monkeypatch.setattr(cache.cache, "inc", lambda *a, **k: calls.append(("inc", a)) or original_inc(*a, **k))
+
+    create_subject("Physics")
+
+    assert [name for name, _ in calls] == ["inc"]
+
+
+def test_evicted_generation_is_reseeded_before_the_bump(client, auth_headers, test_user, create_subject):
+    before = time.time_ns() // 1000
+    key = generation_key(test_user, "subjects")
+    client.get("/subjects", headers=auth_headers)
+    cache.delete(key)  # evicted
+
+    create_subject()
+
+    # Not 1: keys of an old counter that started at 1 could be current again
+    assert cache.get(key) > before
+    assert client.get("/subjects", headers=auth_headers).get_json()["total"] == 1
+
+
+def test_subject_update_writes_through_detail_key(client, auth_headers, create_subject):
+    subject_id = create_subject()
+    assert client.get(f"/subjects/{subject_id}", headers=auth_headers).get_json()["name"] == "Math"
+
+    res = client.put(f"/subjects/{subject_id}", headers=auth_headers, json={
+        "name": "Algebra",
+        "description": "Course",
+        "total_hours_goal": 10,
+        "total_hours_completed": 2,
+        "priority_level": "LOW",
+        "status": "ACTIVE"})
+    assert res.status_code == 200
+
+    misses = cache.stats()["misses"]
+    data = client.get(f"/subjects/{subject_id}", headers=auth_headers).get_json()
+    assert data["name"] == "Algebra"
+    assert data["total_hours_completed"] == 2
+    assert cache.stats()["misses"] == misses
+
+
+def test_subject_delete_evicts_detail_keys_of_its_sessions(client, auth_headers, create_subject, create_session):
+    subject_id = create_subject()
+    session_id = create_session(subject_id, "03:00PM", "04:00PM")
+    assert client.get(f"/subjects/{subject_id}", headers=auth_headers).status_code == 200
+    assert client.get(f"/sessions/{session_id}", headers=auth_headers).status_code == 200
+
+    assert client.delete(f"/subjects/{subject_id}", headers=auth_headers).status_code == 200
+
+    assert client.get(f"/subjects/{subject_id}", headers=auth_headers).status_code == 404
+    assert client.get(f"/sessions/{session_id}", headers=auth_headers).status_code == 404
+
+
+def test_session_update_writes_through_detail_key(client, auth_headers, create_subject, create_session):
+    subject_id = create_subject()
+    session_id = create_session(subject_id, "03:00PM", "04:00PM")
+    client.get(f"/sessions/{session_id}", headers=auth_headers)
+
+    client.put(f"/sessions/{session_id}", headers=auth_headers, json={
+        "subject_id": subject_id,
+        "start_time": "05:00PM",
+        "end_time": "07:00PM",
+        "notes": "Updated"})
+
+    misses = cache.stats()["misses"]
+    data = client.get(f"/sessions/{session_id}", headers=auth_headers).get_json()
+    assert data["duration_minutes"] == 120
+    assert data["notes"] == "Updated"
+    assert cache.stats()["misses"] == misses
+
+    assert client.delete(f"/sessions/{session_id}", headers=auth_headers).status_code == 200
+    assert client.get(f"/sessions/{session_id}", headers=auth_headers).status_code == 404
+
+
+def test_hits_serve_cached_json_bytes(app, client, auth_headers, create_subject):
+    app.config["CACHE_COMPRESSION_MIN_BYTES"] = 0
+    create_subject()
+    miss = client.get("/subjects", headers=auth_headers)
+    hit = client.get("/subjects", headers=auth_headers)
+
+    assert hit.content_type == "application/json"
+    assert "Content-Encoding" not in hit.headers
+    assert hit.get_json() == miss.get_json()
+    assert hit.get_json()["subjects"][0]["name"] == "Math"
+
+
+def test_brotli_bodies_are_sent_as_is(app, client, auth_headers, create_subject):
+    import brotli
+    import json
+    app.config["CACHE_COMPRESSION_MIN_BYTES"] = 0
+    create_subject()
+    headers = {**auth_headers, "Accept-Encoding": "gzip, br"}
+    client.get("/subjects", headers=headers)
+    hit = client.get("/subjects", headers=headers)
+
+    assert hit.headers["Content-Encoding"] == "br"
+    assert "Accept-Encoding" in hit.headers["Vary"]
+    assert json.loads(brotli.decompress(hit.data))["subjects"][0]["name"] == "Math"
+
+
+def test_conditional_get_on_lists(client, auth_headers, create_subject):
+    create_subject()
+    first = client.get("/subjects", headers=auth_headers)
+    etag = first.headers["ETag"]
+
+    again = client.get("/subjects", headers={**auth_headers, "If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.data == b""
+    assert again.headers["ETag"] == etag
+
+    create_subject("Physics")
+    changed = client.get("/subjects", headers={**auth_headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.get_json()["total"] == 2
+
+
+def test_conditional_get_on_single_items(client, auth_headers, create_subject, create_session):
+    subject_id = create_subject()
+    session_id = create_session(subject_id, "03:00PM", "04:00PM")
+    etag = client.get(f"/sessions/{session_id}", headers=auth_headers).headers["ETag"]
+    conditional = {**auth_headers, "If-None-Match": etag}
+    assert client.get(f"/sessions/{session_id}", headers=conditional).status_code == 304
+
+    # Renaming the subject changes the embedded subject_name
+    client.put(f"/subjects/{subject_id}", headers=auth_headers, json={
+        "name": "Algebra",
+        "description": "Course",
+        "total_hours_goal": 10,
+        "total_hours_completed": 0,
+        "priority_level": "LOW",
+        "status": "ACTIVE"})
+    res = client.get(f"/sessions/{session_id}", headers=conditional)
+    assert res.status_code == 200
+    assert res.get_json()["subject_name"] == "Algebra"
+
+
+def test_etag_depends_on_content_encoding(client, auth_headers, create_subject):
+    create_subject()
+    plain = client.get("/subjects", headers=auth_headers).headers["ETag"]
+    br = client.get("/subjects", headers={**auth_headers, "Accept-Encoding": "br"}).headers["ETag"]
+    assert plain != br
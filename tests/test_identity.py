@@ -0,0 +1,75 @@
+from flask_jwt_extended import create_access_token
+from app import cache, db
+from app.models import User
+from app.utils.identity import UserIdentity, identity_key
+
+
+def other_user_headers():
+    user = User(username="intruder", email="intruder@example.com")
+    user.set_password("intruder123")
+    db.session.add(user)
+    db.session.commit()
+    return {"Authorization": f"Bearer {create_access_token(identity=str(user.id))}"}
+
+
+def test_identity_is_cached(client, auth_headers, test_user, max_queries):
+    cache.clear()
+    with max_queries(3) as profile:
+        client.get("/subjects", headers=auth_headers)
+    assert any("FROM user" in statement for statement in profile.statements)
+    assert cache.get(identity_key(test_user)) == UserIdentity(test_user, "tester")
+
+    cache.delete(f"user:{test_user}:subjects:gen")
+    with max_queries(2) as profile:
+        client.get("/subjects", headers=auth_headers)
+    assert not any("FROM user" in statement for statement in profile.statements)
+
+
+def test_token_of_deleted_user_is_rejected(client, auth_headers, test_user):
+    db.session.delete(db.session.get(User, test_user))
+    db.session.commit()
+    cache.clear()
+    assert client.get("/subjects", headers=auth_headers).status_code == 401
+
+
+def test_session_ownership_in_one_query(client, auth_headers, max_queries, create_subject, create_session):
+    session_id = create_session(create_subject())
+    headers = other_user_headers()
+    client.get("/subjects", headers=headers)  # caches the intruder's identity
+    with max_queries(1):
+        assert client.delete(f"/sessions/{session_id}", headers=headers).status_code == 403
+    with max_queries(1):
+        assert client.delete("/sessions/999", headers=headers).status_code == 404
+
+
+def test_mutating_endpoint_query_budgets(client, auth_headers, max_queries, create_subject, create_session, subject_payload):
+    client.get("/subjects", headers=auth_headers)  # caches the identity
+
+    with max_queries(1):
+        subject_id = create_subject()
+    with max_queries(4):
+        assert client.put(f"/subjects/{subject_id}", headers=auth_headers, json=subject_payload).status_code == 200
+    with max_queries(4):
+        session_id = create_session(subject_id)
+    with max_queries(10):
+        res = client.put(f"/sessions/{session_id}", headers=auth_headers,
+                         json={"subject_id": subject_id, "start_time": "09:00", "end_time": "11:00"})
+        assert res.status_code == 200
+    with max_queries(7):
+        assert client.delete(f"/sessions/{session_id}", headers=auth_headers).status_code == 200
+    with max_queries(6):
+        res = client.post("/sessions/bulk", headers=auth_headers,
+                          json=[{"subject_id": subject_id, "start_time": "09:00", "end_time": "10:00"}] * 3)
+        assert res.status_code == 201
+    with max_queries(9):
+        assert client.delete(f"/subjects/{subject_id}", headers=auth_headers).status_code == 200
+
+
+def test_auth_endpoint_query_budgets(client, max_queries):
+    credentials = {"username": "budget1", "password": "budget12345"}
+    with max_queries(2):
+        res = client.post("/auth/register", json={
+            **credentials, "email": "budget@example.com", "confirm_password": credentials["password"]})
+        assert res.status_code == 201
+    with max_queries(1):
+        assert client.post("/auth/login", json=credentials).status_code == 200
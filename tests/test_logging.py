@@ -0,0 +1,82 @@
+import json
+import logging
+import os
+import queue
+import sys
+from types import SimpleNamespace
+from app.utils import logging_setup
+from app.utils.logging_setup import JsonFormatter, LazyQueueHandler, SamplingFilter, configure_logging
+
+
+def make_record(msg, *args, level=logging.INFO, **extra):
+    record = logging.LogRecord("studytrack.cache", level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_json_formatter_outputs_one_object_with_extras():
+    line = JsonFormatter().format(make_record("Cache HIT for %s (user %s)", "subjects", 1, request_id="abc"))
+    data = json.loads(line)
+    assert data["message"] == "Cache HIT for subjects (user 1)"
+    assert data["level"] == "INFO"
+    assert data["logger"] == "studytrack.cache"
+    assert data["request_id"] == "abc"
+    assert "args" not in data
+
+
+def test_queue_handler_defers_formatting():
+    log_queue = queue.SimpleQueue()
+    record = make_record("Cache HIT for %s", "subjects")
+    LazyQueueHandler(log_queue).handle(record)
+    queued = log_queue.get_nowait()
+    assert queued is record
+    assert queued.args == ("subjects",)
+    assert not hasattr(queued, "message")
+
+
+def test_sampling_filter_keeps_rate_and_warnings():
+    drop_all = SamplingFilter(0.0)
+    assert not drop_all.filter(make_record("Cache HIT"))
+    assert drop_all.filter(make_record("Cache down", level=logging.WARNING))
+    assert SamplingFilter(1.0).filter(make_record("Cache HIT"))
+
+
+def test_cache_lines_are_sampled(app, client, auth_headers, caplog):
+    cache_logger = logging.getLogger("studytrack.cache")
+    cache_logger.filters = [SamplingFilter(0.0)]
+    try:
+        with caplog.at_level("INFO"):
+            client.get("/subjects", headers=auth_headers)
+    finally:
+        cache_logger.filters = [SamplingFilter(1.0)]
+    assert not any(record.message.startswith("Cache ") for record in caplog.records)
+
+    with caplog.at_level("INFO"):
+        client.get("/subjects", headers=auth_headers)
+    assert any(record.message.startswith("Cache HIT for subjects") for record in caplog.records)
+
+
+def test_listener_runs_again_in_forked_workers(tmp_path, monkeypatch):
+    log_file = open(tmp_path / "stderr.log", "w")
+    monkeypatch.setattr(sys, "stderr", log_file)
+    # Another test may already have configured this process
+    monkeypatch.setattr(logging_setup, "_listener", None)
+    monkeypatch.setattr(logging_setup, "_queue_handler", None)
+    app = SimpleNamespace(config={"LOG_LEVEL": "INFO"}, testing=False, debug=False)
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    configure_logging(app)
+    try:
+        pid = os.fork()  # what gunicorn does after a preloaded create_app
+        if pid == 0:
+            alive = logging_setup._listener._thread.is_alive()
+            logging.getLogger("worker").info("logged from the worker")
+            logging_setup._stop_listener()
+            os._exit(0 if alive else 1)
+        _, status = os.waitpid(pid, 0)
+        assert os.waitstatus_to_exitcode(status) == 0
+    finally:
+        logging_setup._stop_listener()
+        root.handlers, root.level = handlers, level
+        log_file.close()
+    assert "logged from the worker" in (tmp_path / "stderr.log").read_text()
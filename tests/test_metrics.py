@@ -0,0 +1,60 @@
+from prometheus_client import REGISTRY
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_requests_are_timed_and_counted(client, auth_headers):
+    labels = {"method": "GET", "endpoint": "/subjects"}
+    requests = sample("studytrack_requests_total", status="200", **labels)
+    timed = sample("studytrack_request_duration_seconds_count", **labels)
+
+    client.get("/subjects", headers=auth_headers)
+
+    assert sample("studytrack_requests_total", status="200", **labels) == requests + 1
+    assert sample("studytrack_request_duration_seconds_count", **labels) == timed + 1
+
+
+def test_db_queries_per_request(client, auth_headers):
+    labels = {"endpoint": "/sessions"}
+    client.get("/subjects", headers=auth_headers)  # caches the user's identity
+    queries = sample("studytrack_db_queries_per_request_sum", **labels)
+
+    client.get("/sessions?with_total=false", headers=auth_headers)
+    # Cache hit, no SQL at all
+    client.get("/sessions?with_total=false", headers=auth_headers)
+
+    assert sample("studytrack_db_queries_per_request_sum", **labels) == queries + 1
+    assert sample("studytrack_db_time_per_request_seconds_count", **labels) >= 2
+
+
+def test_cache_events_per_resource(client, auth_headers, create_subject):
+    def events(event):
+        return sample("studytrack_cache_events_total", resource="subjects", event=event)
+    hits, misses, invalidations = events("hit"), events("miss"), events("invalidation")
+
+    client.get("/subjects", headers=auth_headers)
+    client.get("/subjects", headers=auth_headers)
+    create_subject()
+
+    assert (events("hit"), events("miss"), events("invalidation")) == (hits + 1, misses + 1, invalidations + 1)
+
+
+def test_metrics_endpoint(client):
+    res = client.get("/metrics")
+    assert res.status_code == 200
+    assert res.mimetype == "text/plain"
+    assert b"studytrack_request_duration_seconds_bucket" in res.data
+
+
+def test_metrics_need_the_token_unless_public(app, client):
+    app.config.update(METRICS_PUBLIC=False, METRICS_TOKEN=None)
+    for path in ["/metrics", "/metrics/cache", "/metrics/pool"]:
+        assert client.get(path).status_code == 401
+        assert client.get(path, headers={"Authorization": "Bearer guess"}).status_code == 401
+
+    app.config["METRICS_TOKEN"] = "scrape-secret"
+    for path in ["/metrics", "/metrics/cache", "/metrics/pool"]:
+        assert client.get(path, headers={"Authorization": "Bearer wrong"}).status_code == 401
+        assert client.get(path, headers={"Authorization": "Bearer scrape-secret"}).status_code == 200
@@ -1,7 +1,8 @@
 # tests/test_models.py
 from app import db
 from app.models import User, Subject, StudySessions
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+import time
 
 
 def test_create_subject(app):
@@ -56,4 +57,45 @@ def test_create_study_session(app):
         )
 
         db.session.add(study_session)
-        db.session.commit()
\ No newline at end of file
+        db.session.commit()
+
+
+def make_subject(user_id, name="Math"):
+    return Subject(
+        name=name,
+        description="Calculus",
+        total_hours_goal=10,
+        total_hours_completed=0,
+        priority_level="HIGH",
+        status="ACTIVE",
+        user_id=user_id
+    )
+
+
+def test_timestamps_are_set_per_row_by_the_database(app, max_queries):
+    user = User(username="tomi", email="a@a.com")
+    db.session.add(user)
+    db.session.commit()
+
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    first = make_subject(user.id, "First")
+    with max_queries(1):
+        db.session.add(first)
+        db.session.flush()
+        # Fetched with RETURNING along with the id
+        created_at = first.created_at
+    assert abs(created_at - now) < timedelta(seconds=5)
+    assert first.updated_at == created_at
+    db.session.commit()
+
+    time.sleep(0.01)
+    second = make_subject(user.id, "Second")
+    db.session.add(second)
+    db.session.commit()
+    assert second.created_at > first.created_at
+
+    time.sleep(0.01)
+    first.name = "Renamed"
+    db.session.commit()
+    assert first.updated_at > first.created_at
+    assert first.created_at == created_at
@@ -0,0 +1,63 @@
+from flask_jwt_extended import create_access_token
+from app import cache, db
+from app.models import User
+from app.utils.cache_utils import item_key
+
+
+def test_subjects_in_request_order(client, auth_headers, max_queries, create_subject):
+    first, second, third = [create_subject(f"Subject {i}") for i in range(3)]
+    client.get(f"/subjects/{second}", headers=auth_headers)  # one cached item
+
+    with max_queries(1):
+        data = client.get(f"/subjects?ids={third},{first},999,{second},{third}", headers=auth_headers).get_json()
+    assert [subject["id"] for subject in data["subjects"]] == [third, first, second]
+    assert data["subjects"][0]["name"] == "Subject 2"
+    assert data["missing"] == [999]
+
+    # The misses were written back: everything comes from the cache now
+    with max_queries(0):
+        again = client.get(f"/subjects?ids={third},{first},{second}", headers=auth_headers).get_json()
+    assert again == {"subjects": data["subjects"], "missing": []}
+
+
+def test_items_are_shared_with_the_single_item_endpoint(client, auth_headers, test_user, max_queries, create_subject, create_session):
+    subject_id = create_subject()
+    session_ids = [create_session(subject_id, f"0{i}:00", f"0{i}:30") for i in range(3)]
+
+    data = client.get(f"/sessions?ids={','.join(map(str, session_ids))}", headers=auth_headers).get_json()
+    assert [session["session_id"] for session in data["sessions"]] == session_ids
+    assert cache.get(item_key(test_user, "session", session_ids[0])) is not None
+    with max_queries(0):
+        single = client.get(f"/sessions/{session_ids[0]}", headers=auth_headers).get_json()
+    assert single == data["sessions"][0]
+
+
+def test_other_users_items_are_missing(client, auth_headers, create_subject):
+    subject_id = create_subject()
+    intruder = User(username="intruder1", email="intruder@example.com")
+    intruder.set_password("intruder123")
+    db.session.add(intruder)
+    db.session.commit()
+    headers = {"Authorization": f"Bearer {create_access_token(identity=str(intruder.id))}"}
+
+    data = client.get(f"/subjects?ids={subject_id}", headers=headers).get_json()
+    assert data == {"subjects": [], "missing": [subject_id]}
+
+
+def test_multi_get_etag(client, auth_headers, create_subject, subject_payload):
+    ids = [create_subject(f"Subject {i}") for i in range(2)]
+    url = f"/subjects?ids={ids[0]},{ids[1]}"
+    etag = client.get(url, headers=auth_headers).headers["ETag"]
+    assert client.get(url, headers={**auth_headers, "If-None-Match": etag}).status_code == 304
+
+    client.put(f"/subjects/{ids[0]}", headers=auth_headers, json={**subject_payload, "name": "Renamed"})
+    res = client.get(url, headers={**auth_headers, "If-None-Match": etag})
+    assert res.status_code == 200
+    assert res.get_json()["subjects"][0]["name"] == "Renamed"
+
+
+def test_invalid_ids(client, auth_headers, app):
+    app.config["MULTI_GET_MAX_IDS"] = 3
+    for ids in ["", "1,x", "1,2,3,4", "1,,2"]:
+        assert client.get(f"/sessions?ids={ids}", headers=auth_headers).status_code == 400
+    assert client.get("/sessions?ids=1,1,1,1", headers=auth_headers).status_code == 200
@@ -0,0 +1,73 @@
+from app.utils.pagination import encode_cursor, decode_cursor
+from datetime import datetime
+import time
+
+
+def walk(client, auth_headers, url, key, id_field):
+    seen, cursor = [], ""
+    while cursor is not None:
+        data = client.get(f"{url}&cursor={cursor}", headers=auth_headers).get_json()
+        seen.extend(item[id_field] for item in data[key])
+        cursor = data["next_cursor"]
+    return seen
+
+
+def test_cursor_roundtrip():
+    value = datetime(2025, 1, 2, 3, 4, 5)
+    assert decode_cursor(encode_cursor(value, 42)) == (value, 42)
+
+
+def test_subjects_cursor_walks_every_row_once(client, auth_headers, create_subject):
+    ids = [create_subject(f"Subject {i}") for i in range(7)]
+    assert walk(client, auth_headers, "/subjects?per_page=3", "subjects", "id") == ids
+
+
+def test_subjects_are_ordered_by_creation_time(client, auth_headers, create_subject):
+    ids = []
+    for _ in range(3):
+        ids.append(create_subject())
+        time.sleep(0.01)
+    subjects = client.get("/subjects?per_page=10", headers=auth_headers).get_json()["subjects"]
+    created = [subject["created_at"] for subject in subjects]
+    assert [subject["id"] for subject in subjects] == ids
+    assert created == sorted(created) and len(set(created)) == len(created)
+
+
+def test_sessions_cursor_walks_every_row_once(client, auth_headers, create_subject, create_session):
+    subject_id = create_subject()
+    ids = [create_session(subject_id, f"{hour:02d}:00", f"{hour:02d}:30") for hour in range(1, 6)]
+
+    assert walk(client, auth_headers, "/sessions?per_page=2", "sessions", "session_id") == ids
+
+
+def test_offset_page_links_into_cursor_mode(client, auth_headers, create_subject):
+    ids = [create_subject(f"Subject {i}") for i in range(5)]
+    first = client.get("/subjects?per_page=2", headers=auth_headers).get_json()
+    second = client.get(f"/subjects?per_page=2&cursor={first['next_cursor']}", headers=auth_headers).get_json()
+    assert [s["id"] for s in second["subjects"]] == ids[2:4]
+
+
+def test_total_is_optional(client, auth_headers, create_subject):
+    create_subject()
+    create_subject("Physics")
+    data = client.get("/subjects?with_total=false&cursor=", headers=auth_headers).get_json()
+    assert "total" not in data
+    data = client.get("/subjects?with_total=false", headers=auth_headers).get_json()
+    assert data["total"] is None
+    assert len(data["subjects"]) == 2
+
+
+def test_page_below_one_is_the_first_page(client, auth_headers, create_subject):
+    create_subject()
+    first = client.get("/subjects?page=1&per_page=5", headers=auth_headers)
+    for page in ["0", "-3"]:
+        res = client.get(f"/subjects?page={page}&per_page=5", headers=auth_headers)
+        assert res.get_json() == first.get_json()
+        assert res.get_json()["page"] == 1
+        # Same cache entry as page 1
+        assert res.headers["ETag"] == first.headers["ETag"]
+
+
+def test_invalid_cursor(client, auth_headers):
+    res = client.get("/subjects?cursor=not-a-cursor", headers=auth_headers)
+    assert res.status_code == 400
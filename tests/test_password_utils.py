@@ -1,6 +1,55 @@
+from app import db
+from app.models import User
+from app.utils.passwords import hash_password, needs_rehash, shutdown_pool, verify_password
+
+
 def test_check_hashing(user):
     password = "securepassword"
     user.set_password(password)
     assert user.check_password(password) is True
     assert user.check_password("wrongpassword") is False
 
+
+
+def test_hash_uses_configured_method(app, user):
+    app.config["PASSWORD_HASH_METHOD"] = "pbkdf2:sha256:1000"
+    user.set_password("securepassword")
+    assert user.password_hash.startswith("pbkdf2:sha256:1000$")
+    assert not needs_rehash(user.password_hash)
+    app.config["PASSWORD_HASH_METHOD"] = "pbkdf2:sha256:2000"
+    assert needs_rehash(user.password_hash)
+
+
+def test_login_rehashes_with_new_parameters(app, client, test_user):
+    app.config["PASSWORD_HASH_METHOD"] = "pbkdf2:sha256:1000"
+    res = client.post("/auth/login", json={"username": "tester", "password": "thomas12345"})
+    assert res.status_code == 200
+    stored = db.session.get(User, test_user).password_hash
+    assert stored.startswith("pbkdf2:sha256:1000$")
+
+    res = client.post("/auth/login", json={"username": "tester", "password": "thomas12345"})
+    assert res.status_code == 200
+    assert db.session.get(User, test_user).password_hash == stored
+
+
+def test_short_method_names_do_not_rehash_every_login(app, client, test_user):
+    # werkzeug stores "pbkdf2:sha256" with its default iteration count
+    app.config["PASSWORD_HASH_METHOD"] = "pbkdf2:sha256"
+    client.post("/auth/login", json={"username": "tester", "password": "thomas12345"})
+    stored = db.session.get(User, test_user).password_hash
+    assert stored.split("$", 1)[0] != "pbkdf2:sha256"
+    assert not needs_rehash(stored)
+
+    res = client.post("/auth/login", json={"username": "tester", "password": "thomas12345"})
+    assert res.status_code == 200
+    assert db.session.get(User, test_user).password_hash == stored
+
+
+def test_verify_in_process_pool(app):
+    app.config["PASSWORD_HASH_WORKERS"] = 1
+    password_hash = hash_password("securepassword")
+    try:
+        assert verify_password(password_hash, "securepassword") is True
+        assert verify_password(password_hash, "wrongpassword") is False
+    finally:
+        shutdown_pool()
@@ -0,0 +1,41 @@
+import pytest
+import sqlalchemy as sa
+from app import db
+from app.utils.pool_metrics import InstrumentedQueuePool, pool_stats
+
+
+def test_app_engine_uses_configured_pool(app):
+    pool = db.engine.pool
+    assert isinstance(pool, InstrumentedQueuePool)
+    assert pool.size() == app.config["SQLALCHEMY_ENGINE_OPTIONS"]["pool_size"]
+
+
+def test_pool_metrics_endpoint_counts_checkouts(client, auth_headers):
+    before = client.get("/metrics/pool").get_json()
+    client.get("/subjects", headers=auth_headers)
+    after = client.get("/metrics/pool").get_json()
+
+    assert after["pool"] == "InstrumentedQueuePool"
+    assert after["checkouts"] > before["checkouts"]
+    assert after["checked_out"] <= after["size"] + after["max_overflow"]
+
+
+def test_exhausted_pool_records_timeouts(tmp_path):
+    engine = sa.create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=1, pool_timeout=0.05,
+    )
+    timeouts = pool_stats.timeouts
+    held = [engine.connect(), engine.connect()]
+    assert pool_stats.as_dict(engine.pool)["overflow"] == 1
+
+    with pytest.raises(sa.exc.TimeoutError):
+        engine.connect()
+    stats = pool_stats.as_dict(engine.pool)
+    assert stats["timeouts"] == timeouts + 1
+    assert stats["wait_ms_max"] >= 50
+    assert stats["overflow_max"] >= 1
+
+    for connection in held:
+        connection.close()
+    engine.dispose()
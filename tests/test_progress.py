@@ -0,0 +1,63 @@
+from app import db
+
+
+def get_progress(client, auth_headers, subject_id):
+    res = client.get(f"/subjects/{subject_id}/progress", headers=auth_headers)
+    assert res.status_code == 200
+    return res.get_json()
+
+
+def test_progress_without_sessions(client, auth_headers, create_subject):
+    subject_id = create_subject()
+    progress = get_progress(client, auth_headers, subject_id)
+    assert progress["total_minutes"] == 0
+    assert progress["session_count"] == 0
+    assert progress["first_session_at"] is None
+
+
+def test_progress_follows_session_writes(client, auth_headers, create_subject, create_session):
+    subject_id = create_subject()
+    first = create_session(subject_id, "09:00", "10:00")
+    create_session(subject_id, "11:00", "11:30")
+    last = create_session(subject_id, "14:00", "16:00")
+
+    progress = get_progress(client, auth_headers, subject_id)
+    assert progress["total_minutes"] == 210
+    assert progress["session_count"] == 3
+    assert progress["first_session_at"].endswith("09:00:00")
+    assert progress["last_session_at"].endswith("16:00:00")
+    assert progress["goal_completion"] == 0.35
+
+    client.put(f"/sessions/{first}", headers=auth_headers, json={
+        "subject_id": subject_id,
+        "start_time": "10:00",
+        "end_time": "10:15"})
+    progress = get_progress(client, auth_headers, subject_id)
+    assert progress["total_minutes"] == 165
+    assert progress["first_session_at"].endswith("10:00:00")
+
+    client.delete(f"/sessions/{last}", headers=auth_headers)
+    progress = get_progress(client, auth_headers, subject_id)
+    assert progress["total_minutes"] == 45
+    assert progress["session_count"] == 2
+    assert progress["last_session_at"].endswith("11:30:00")
+
+
+def test_rebuild_matches_incremental_aggregates(app, client, auth_headers, create_subject, create_session):
+    subject_id = create_subject()
+    create_session(subject_id, "09:00", "10:00")
+    session_id = create_session(subject_id, "11:00", "12:30")
+    client.delete(f"/sessions/{session_id}", headers=auth_headers)
+    incremental = get_progress(client, auth_headers, subject_id)
+
+    db.session.execute(db.text("DELETE FROM subject_progress"))
+    db.session.commit()
+    result = app.test_cli_runner().invoke(args=["rebuild-progress"])
+    assert "Rebuilt progress for 1 subject(s)." in result.output
+
+    assert get_progress(client, auth_headers, subject_id) == incremental
+
+
+def test_progress_of_another_users_subject(client, auth_headers):
+    res = client.get("/subjects/999/progress", headers=auth_headers)
+    assert res.status_code == 404
@@ -0,0 +1,81 @@
+from flask_jwt_extended import create_access_token
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import SlidingWindowCounterRateLimiter
+from app import create_app, db
+from app.config import TestConfig
+from app.models import User
+from app.utils.limiters import BatchedStorage, rate_limit_key
+
+
+def make_storage(batch_size=5, sync_interval=60):
+    storage = storage_from_string("batched+memory://", batch_size=batch_size, sync_interval=sync_interval)
+    assert isinstance(storage, BatchedStorage)
+    return storage
+
+
+def test_batched_storage_syncs_in_batches():
+    storage = make_storage()
+    assert storage.incr("k", 60) == 1  # first hit reads the shared count
+    assert storage.shared.get("k") == 1
+    for _ in range(4):
+        storage.incr("k", 60)
+    assert storage.get("k") == 5
+    assert storage.shared.get("k") == 1
+    assert storage.incr("k", 60) == 6  # fifth pending hit
+    assert storage.shared.get("k") == 6
+
+
+def test_batched_storage_sees_other_workers():
+    first, second = make_storage(batch_size=1), make_storage(batch_size=1)
+    second.shared = first.shared
+    first.incr("k", 60)
+    first.incr("k", 60)
+    assert second.incr("k", 60) == 3
+
+
+def test_flush_pushes_pending_hits():
+    storage = make_storage()
+    for _ in range(3):
+        storage.incr("k", 60)
+    storage.flush()
+    assert storage.shared.get("k") == 3
+
+
+def test_sliding_window_counter_on_batched_storage():
+    limiter = SlidingWindowCounterRateLimiter(make_storage())
+    limit = parse("3/minute")
+    assert all(limiter.hit(limit, "user:1") for _ in range(3))
+    assert not limiter.hit(limit, "user:1")
+    assert limiter.hit(limit, "user:2")
+
+
+def test_key_is_jwt_identity_or_address(app, access_token, test_user):
+    with app.test_request_context(headers={"Authorization": f"Bearer {access_token}"}):
+        assert rate_limit_key() == f"user:{test_user}"
+    with app.test_request_context(environ_base={"REMOTE_ADDR": "10.0.0.7"}):
+        assert rate_limit_key() == "ip:10.0.0.7"
+    with app.test_request_context(headers={"Authorization": "Bearer not-a-token"}, environ_base={"REMOTE_ADDR": "10.0.0.7"}):
+        assert rate_limit_key() == "ip:10.0.0.7"
+
+
+def test_limits_are_per_user_behind_one_address(app, client):
+    headers = []
+    for n in (1, 2):
+        user = User(username=f"limited{n}", email=f"limited{n}@example.com")
+        user.set_password("limited12345")
+        db.session.add(user)
+        db.session.commit()
+        headers.append({"Authorization": f"Bearer {create_access_token(identity=str(user.id))}"})
+    for _ in range(100):
+        client.get("/subjects", headers=headers[0])
+    assert client.get("/subjects", headers=headers[0]).status_code == 429
+    assert client.get("/subjects", headers=headers[1]).status_code == 200
+
+
+def test_falls_back_to_memory_when_redis_is_down(monkeypatch):
+    monkeypatch.setattr(TestConfig, "RATELIMIT_STORAGE_URI", "batched+redis://127.0.0.1:1/0")
+    monkeypatch.setattr(TestConfig, "RATELIMIT_STORAGE_OPTIONS", {"batch_size": 1})
+    app = create_app("testing")
+    response = app.test_client().post("/auth/login", json={"username": "nobody", "password": "wrong-password"})
+    assert response.status_code == 401
@@ -0,0 +1,55 @@
+import bleach
+import pytest
+from datetime import time
+from marshmallow import ValidationError
+from app.schemas.base import clean_text, parse_clock
+from app.schemas.study_sessions_schema import EditStudySessionsSchema, StudySessionsSchema
+from app.schemas.subject_schema import SubjectSchema
+
+
+@pytest.mark.parametrize("value", [
+    "Plain notes, chapter 4",
+    "<b>bold</b> & <script>alert(1)</script>",
+    "a < b > c",
+    "tab\tnew\nline",
+    "bell\x07 and \x1f",
+    "café ünïcode",
+])
+def test_clean_text_matches_bleach(value):
+    assert clean_text(value) == bleach.clean(value, tags=[], strip=True)
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("03:00PM", time(15, 0)),
+    ("12:15am", time(0, 15)),
+    ("12:30PM", time(12, 30)),
+    ("9:5", time(9, 5)),
+    ("23:59", time(23, 59)),
+])
+def test_parse_clock(value, expected):
+    assert parse_clock(value) == expected
+
+
+@pytest.mark.parametrize("value", ["13:00PM", "00:30AM", "24:00", "10:60", "10:00 PM", "noon"])
+def test_parse_clock_rejects(value):
+    with pytest.raises(ValueError):
+        parse_clock(value)
+
+
+def test_session_schemas_share_parsing():
+    payload = {"subject_id": 1, "start_time": "2026-01-05T15:00:00", "end_time": "2026-01-05T16:30:00",
+               "notes": " <i>hi</i> "}
+    for schema in (StudySessionsSchema(), EditStudySessionsSchema()):
+        assert schema.load(dict(payload))["notes"] == "hi"
+    with pytest.raises(ValidationError) as error:
+        StudySessionsSchema().load(dict(payload, start_time="25:00"))
+    assert error.value.messages == {"start_time": "Invalid time format"}
+
+
+def test_subject_schema_strips_markup():
+    data = SubjectSchema().load({
+        "name": " <b>Math</b> ", "description": "Algebra", "total_hours_goal": 10,
+        "priority_level": "HIGH", "status": "ACTIVE",
+    })
+    assert data["name"] == "Math"
+    assert data["total_hours_completed"] == 0
@@ -102,3 +102,34 @@ def test_delete_study_sessions(client, auth_headers):
     assert delete_res.status_code == 200
     delete_data = delete_res.get_json()
     assert delete_data["message"] == "Session deleted" 
+
+
+def test_list_sessions_runs_a_single_join(client, auth_headers, max_queries):
+    for name in ["Physics", "Math", "History"]:
+        subject_id = client.post("/subjects", headers=auth_headers, json={
+            "name": name,
+            "description": "Course",
+            "total_hours_goal": 50,
+            "total_hours_completed": 0,
+            "priority_level": "MEDIUM",
+            "status": "ACTIVE"}).get_json()["id"]
+        client.post("/sessions", headers=auth_headers, json={
+            "subject_id": subject_id,
+            "start_time": "03:00PM",
+            "end_time": "04:00PM"})
+
+    with max_queries(1) as profile:
+        res = client.get("/sessions?with_total=false", headers=auth_headers)
+
+    assert res.status_code == 200
+    assert len(res.get_json()["sessions"]) == 3
+    assert "JOIN subject" in profile.statements[0]
+
+
+def test_non_object_bodies_are_rejected(client, auth_headers, create_subject, create_session):
+    session_id = create_session(create_subject())
+    for method, url in [("post", "/sessions"), ("put", f"/sessions/{session_id}")]:
+        for body in [[1, 2], "09:00", 5]:
+            res = getattr(client, method)(url, headers=auth_headers, json=body)
+            assert res.status_code == 422, (method, body)
+            assert res.get_json()["errors"]["json"] == {"_schema": ["Invalid input type."]}
@@ -0,0 +1,52 @@
+from app import db
+from app.utils.sql_profiler import QueryProfile, normalize
+
+
+def test_normalize_groups_identical_statements():
+    assert normalize("SELECT *  FROM t\nWHERE id = 12 AND name = 'it''s'") == "SELECT * FROM t WHERE id = ? AND name = ?"
+    assert normalize("SELECT * FROM t WHERE id IN (?, ?, ?)") == normalize("SELECT * FROM t WHERE id IN (?)")
+
+
+def test_profile_flags_repeated_statements():
+    profile = QueryProfile()
+    for id in range(4):
+        profile.record(f"SELECT * FROM subject WHERE id = {id}", 0.001)
+    profile.record("SELECT count(*) FROM subject", 0.002)
+
+    assert profile.count == 5
+    assert profile.repeated(3) == [("SELECT * FROM subject WHERE id = ?", 4)]
+    assert 'n-plus-one;desc="4x SELECT * FROM subject' in profile.server_timing(3)
+
+
+def test_profile_header_adds_server_timing(client, auth_headers):
+    assert "Server-Timing" not in client.get("/subjects", headers=auth_headers).headers
+
+    res = client.get("/subjects?page=2", headers={**auth_headers, "X-SQL-Profile": "1"})
+    assert res.headers["Server-Timing"].startswith('db;dur=')
+    assert 'desc="2 queries"' in res.headers["Server-Timing"]
+
+
+def test_n_plus_one_is_reported(app, client, caplog):
+    def loop():
+        for _ in range(4):
+            db.session.execute(db.text("SELECT 1"))
+        return {}
+    app.add_url_rule("/n-plus-one", view_func=loop)
+
+    with caplog.at_level("INFO"):
+        res = client.get("/n-plus-one", headers={"X-SQL-Profile": "1"})
+
+    assert "n-plus-one" in res.headers["Server-Timing"]
+    assert any("Possible N+1 queries in GET /n-plus-one" in record.message for record in caplog.records)
+
+
+def test_query_budgets(client, auth_headers, max_queries, create_subject, create_session):
+    subject_id = create_subject()
+    with max_queries(2):
+        client.get("/subjects", headers=auth_headers)
+    with max_queries(1):
+        client.get(f"/subjects/{subject_id}", headers=auth_headers)
+    with max_queries(4):
+        create_session(subject_id)
+    with max_queries(2):
+        client.get("/stats", headers=auth_headers)
@@ -0,0 +1,100 @@
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+from app import db, cache
+from app.models import StudyDailyRollup
+from app.routes.stats_routes import streaks
+
+
+def get_stats(client, auth_headers, range="30d"):
+    res = client.get(f"/stats?range={range}", headers=auth_headers)
+    assert res.status_code == 200
+    return res.get_json()
+
+
+def test_stats_follow_session_writes(client, auth_headers, create_subject, create_session):
+    math = create_subject()
+    physics = create_subject("Physics")
+    first = create_session(math, "09:00", "10:00")
+    create_session(physics, "11:00", "11:30")
+    last = create_session(math, "14:00", "16:00")
+
+    stats = get_stats(client, auth_headers)
+    assert stats["total_minutes"] == 210
+    assert stats["session_count"] == 3
+    assert len(stats["daily"]) == 1
+    assert stats["subjects"][0] == {"subject_id": math, "subject_name": "Math", "minutes": 180, "sessions": 2}
+    assert stats["streak"] == {"current": 1, "longest": 1}
+
+    client.put(f"/sessions/{first}", headers=auth_headers, json={
+        "subject_id": math,
+        "start_time": "10:00",
+        "end_time": "10:15"})
+    client.delete(f"/sessions/{last}", headers=auth_headers)
+
+    stats = get_stats(client, auth_headers)
+    assert stats["total_minutes"] == 45
+    assert stats["session_count"] == 2
+    assert stats["weekly"][0]["minutes"] == 45
+
+
+def test_rebuild_matches_incremental_rollups(app, client, auth_headers, create_subject, create_session):
+    subject_id = create_subject()
+    create_session(subject_id, "09:00", "10:00")
+    session_id = create_session(subject_id, "11:00", "12:30")
+    client.delete(f"/sessions/{session_id}", headers=auth_headers)
+    incremental = get_stats(client, auth_headers)
+
+    db.session.execute(db.text("DELETE FROM study_daily_rollup"))
+    db.session.commit()
+    result = app.test_cli_runner().invoke(args=["rebuild-stats"])
+    assert "Rebuilt 1 daily rollup(s)." in result.output
+
+    # No session was written, so the cached response has to be dropped by hand
+    cache.clear()
+    assert get_stats(client, auth_headers) == incremental
+
+
+def test_streaks_over_rollup_days(client, auth_headers, test_user, create_subject):
+    subject_id = create_subject()
+    today = datetime.now(timezone.utc).date()
+    for offset in [1, 2, 3, 6, 7]:
+        db.session.add(StudyDailyRollup(
+            subject_id=subject_id, user_id=test_user, day=today - timedelta(days=offset),
+            minutes=30, session_count=1))
+    db.session.commit()
+
+    stats = get_stats(client, auth_headers, "7d")
+    assert stats["range"]["days"] == 7
+    assert [day["date"] for day in stats["daily"]][0] == (today - timedelta(days=6)).isoformat()
+    assert stats["streak"] == {"current": 3, "longest": 3}
+    assert stats["total_minutes"] == 120
+
+
+def test_days_follow_the_user_timezone(client, auth_headers, create_subject, create_session):
+    subject_id = create_subject()
+    yesterday = datetime.now(timezone.utc).date() - timedelta(days=1)
+    session_id = create_session(subject_id,
+                                f"{yesterday}T20:00:00+00:00", f"{yesterday}T21:00:00+00:00")
+    assert get_stats(client, auth_headers)["daily"][0]["date"] == yesterday.isoformat()
+
+    # 05:00 the next morning in Tokyo, the rollups move with the zone
+    client.put("/auth/timezone", headers=auth_headers, json={"timezone": "Asia/Tokyo"})
+    stats = get_stats(client, auth_headers)
+    assert stats["daily"] == [{"date": (yesterday + timedelta(days=1)).isoformat(), "minutes": 60, "sessions": 1}]
+    assert stats["range"]["to"] == datetime.now(ZoneInfo("Asia/Tokyo")).date().isoformat()
+
+    client.delete(f"/sessions/{session_id}", headers=auth_headers)
+    assert db.session.scalar(db.select(db.func.count()).select_from(StudyDailyRollup)) == 0
+
+
+def test_streaks():
+    today = date(2024, 5, 10)
+    days = [date(2024, 5, d) for d in (1, 2, 3, 4, 8, 9)]
+    assert streaks(days, today) == (2, 4)
+    assert streaks(days, date(2024, 5, 11)) == (0, 4)
+    assert streaks([], today) == (0, 0)
+
+
+def test_invalid_range(client, auth_headers):
+    for value in ["0d", "abc", "30", "9999d"]:
+        assert client.get(f"/stats?range={value}", headers=auth_headers).status_code == 400
@@ -0,0 +1,141 @@
+import time
+from cachelib import SimpleCache
+from app import create_app, cache
+from app.utils.tiered_cache import LocalLRUCache, InMemoryBus, RedisBus
+
+
+def test_lru_is_bounded_by_bytes():
+    l1 = LocalLRUCache(max_bytes=100, ttl=30)
+    l1.set("a", b"x" * 40)
+    l1.set("b", b"x" * 40)
+    l1.get("a")  # "b" becomes the least recently used entry
+    l1.set("c", b"x" * 40)
+
+    assert l1.get("a") == (True, b"x" * 40)
+    assert l1.get("b") == (False, None)
+    assert l1.current_bytes == 80
+
+
+def test_lru_entries_expire():
+    l1 = LocalLRUCache(max_bytes=100, ttl=0.01)
+    l1.set("a", b"x")
+    time.sleep(0.02)
+    assert l1.get("a") == (False, None)
+    assert l1.current_bytes == 0
+
+
+def test_lru_skips_values_invalidated_while_loading():
+    l1 = LocalLRUCache(max_bytes=100, ttl=30)
+    epoch = l1.epoch
+    l1.invalidate("a")
+    assert l1.set("a", b"stale", epoch=epoch) is False
+    assert l1.get("a") == (False, None)
+
+
+def test_hits_are_served_from_l1(app):
+    cache.set("key", {"value": 1})
+    cache.get("key")
+    cache.get("key")
+
+    stats = cache.stats()
+    assert stats["l1_hits"] == 2
+    assert stats["l2_hits"] == 0
+
+
+def test_writes_invalidate_other_workers():
+    shared_l2 = SimpleCache()
+    shared_bus = InMemoryBus()
+    workers = []
+    for _ in range(2):
+        worker = create_app("testing")
+        worker.extensions["cache"][cache.backend] = shared_l2
+        state = worker.extensions["tiered_cache"]
+        state.bus = shared_bus
+        shared_bus.subscribe(state.l1.invalidate)
+        workers.append(worker)
+    first, second = workers
+
+    with first.app_context():
+        cache.set("key", "old")
+    with second.app_context():
+        assert cache.get("key") == "old"
+        assert cache.stats()["l2_hits"] == 1
+        assert cache.get("key") == "old"
+        assert cache.stats()["l1_hits"] == 1
+
+    with first.app_context():
+        cache.set("key", "new")
+    with second.app_context():
+        assert cache.get("key") == "new"
+
+
+def test_get_many_reads_l1_then_l2(app):
+    cache.set("a", "1")
+    cache.backend.set("b", "2")  # L2 only
+
+    assert cache.get_many("a", "b", "c") == ["1", "2", None]
+    stats = cache.stats()
+    assert (stats["l1_hits"], stats["l2_hits"], stats["misses"]) == (1, 1, 1)
+
+    assert cache.get_many("b") == ["2"]
+    assert cache.stats()["l1_hits"] == 2
+
+
+def test_set_many_writes_through_and_invalidates(app):
+    cache.set("a", "old")
+    cache.set_many({"a": "new", "b": "2"}, timeout=60)
+
+    assert cache.backend.get_many("a", "b") == ["new", "2"]
+    assert cache.get_many("a", "b") == ["new", "2"]
+
+
+class FakePubSub:
+    def __init__(self, threads):
+        self.threads = threads
+
+    def subscribe(self, **handlers):
+        pass
+
+    def run_in_thread(self, sleep_time, daemon, exception_handler):
+        thread = FakeThread(exception_handler)
+        self.threads.append(thread)
+        return thread
+
+
+class FakeThread:
+    def __init__(self, exception_handler):
+        self.exception_handler = exception_handler
+        self.alive = True
+
+    def is_alive(self):
+        return self.alive
+
+
+class FakeRedis:
+    def __init__(self):
+        self.threads = []
+
+    def pubsub(self, ignore_subscribe_messages):
+        return FakePubSub(self.threads)
+
+
+def test_redis_bus_survives_connection_errors(monkeypatch):
+    monkeypatch.setattr(time, "sleep", lambda seconds: None)
+    client = FakeRedis()
+    bus = RedisBus(client, "channel")
+    l1 = LocalLRUCache(max_bytes=100, ttl=30)
+    l1.set("gen", 1)
+    bus.on_gap(l1.clear)
+
+    bus.start()
+    bus.start()
+    assert len(client.threads) == 1
+
+    # Invalidations may have been missed while disconnected: L1 is dropped
+    client.threads[0].exception_handler(ConnectionError("reset"), None, client.threads[0])
+    assert l1.get("gen") == (False, None)
+
+    # A listener that died anyway is started again
+    client.threads[0].alive = False
+    bus.start()
+    assert len(client.threads) == 2
@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+import pytest
+from marshmallow import ValidationError
+from app import db
+from app.models import User
+from app.schemas.study_sessions_schema import StudySessionsSchema
+
+
+def get_session(client, headers, session_id):
+    return client.get(f"/sessions/{session_id}", headers=headers).get_json()
+
+
+def test_set_timezone(client, auth_headers, test_user):
+    assert client.get("/auth/timezone", headers=auth_headers).get_json() == {"timezone": "UTC"}
+    assert client.put("/auth/timezone", headers=auth_headers, json={"timezone": "Mars/Olympus"}).status_code == 422
+
+    res = client.put("/auth/timezone", headers=auth_headers, json={"timezone": "Asia/Tokyo"})
+    assert res.status_code == 200
+    assert db.session.get(User, test_user).timezone == "Asia/Tokyo"
+    # The cached identity was dropped, the next request sees the new zone
+    assert client.get("/auth/timezone", headers=auth_headers).get_json() == {"timezone": "Asia/Tokyo"}
+
+
+def test_register_with_timezone(client):
+    res = client.post("/auth/register", json={
+        "username": "tokyo1", "email": "tokyo@example.com", "password": "tokyo12345",
+        "confirm_password": "tokyo12345", "timezone": "Asia/Tokyo",
+    })
+    assert res.status_code == 201
+    assert db.session.scalar(db.select(User.timezone).where(User.username == "tokyo1")) == "Asia/Tokyo"
+
+
+def test_session_times_are_stored_in_utc(client, auth_headers, create_subject, create_session):
+    client.put("/auth/timezone", headers=auth_headers, json={"timezone": "Asia/Tokyo"})
+    subject_id = create_subject()
+
+    session = get_session(client, auth_headers, create_session(subject_id, "2026-01-05T09:00:00", "2026-01-05T10:30:00"))
+    assert session["start_time"] == "2026-01-05T00:00:00"
+    assert session["end_time"] == "2026-01-05T01:30:00"
+
+    session = get_session(client, auth_headers, create_session(subject_id, "2026-01-05T09:00:00+02:00", "01:00"))
+    assert session["start_time"] == "2026-01-05T07:00:00"
+    # 01:00 in Tokyo, the day after the 16:00 (Tokyo) start
+    assert session["end_time"] == "2026-01-05T16:00:00"
+
+
+def test_short_times_resolve_in_the_user_zone(client, auth_headers, create_subject, create_session):
+    client.put("/auth/timezone", headers=auth_headers, json={"timezone": "America/New_York"})
+    zone = ZoneInfo("America/New_York")
+    today = datetime.now(zone).date()
+
+    session = get_session(client, auth_headers, create_session(create_subject(), "03:00PM", "16:30"))
+    expected = datetime.combine(today, datetime.min.time().replace(hour=15), zone).astimezone(ZoneInfo("UTC"))
+    assert session["start_time"] == expected.replace(tzinfo=None).isoformat()
+    assert session["duration_minutes"] == 90
+
+
+def test_session_crossing_midnight():
+    data = StudySessionsSchema().load({"subject_id": 1, "start_time": "11:00PM", "end_time": "01:15"})
+    assert data["end_time"] - data["start_time"] == timedelta(hours=2, minutes=15)
+    assert data["end_time"].date() == data["start_time"].date() + timedelta(days=1)
+
+
+def test_swapped_times_are_not_an_overnight_session(app):
+    for start, end in [("15:00", "14:00"), ("09:00", "09:00"), ("11:00PM", "11:30AM")]:
+        with pytest.raises(ValidationError) as error:
+            StudySessionsSchema().load({"subject_id": 1, "start_time": start, "end_time": end})
+        assert error.value.messages == {"end_time": "The end time must be later than the start time"}
+
+    app.config["SESSION_OVERNIGHT_MAX_HOURS"] = 24
+    data = StudySessionsSchema().load({"subject_id": 1, "start_time": "15:00", "end_time": "14:00"})
+    assert data["end_time"] - data["start_time"] == timedelta(hours=23)